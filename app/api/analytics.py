@@ -2,7 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.crud.crud import stats
-from app.schemas.schemas import StatsResponse
+from app.schemas.schemas import StatsResponse, MatchCacheStats
+from app.services.match_cache import match_cache
+from app.services.matchmaking import ai_engine
 
 router = APIRouter()
 
@@ -13,7 +15,17 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
     return stats.get_dashboard_stats(db)
 
 
+@router.get("/match-cache", response_model=MatchCacheStats)
+def get_match_cache_stats():
+    """Get hit/miss/eviction counters of the match result cache."""
+    return match_cache.stats()
+
+
 @router.get("/health")
 def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "message": "Talent Matchmaking Engine is running"}
+    return {
+        "status": "healthy",
+        "message": "Talent Matchmaking Engine is running",
+        "ai_model": ai_engine.model_status
+    }
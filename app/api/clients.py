@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from app.core.database import get_db
+from app.core.pagination import parse_cursor, set_next_cursor
 from app.crud.crud import client
 from app.schemas.schemas import ClientResponse, ClientCreate
 
@@ -26,12 +28,16 @@ def create_client(
 
 @router.get("/", response_model=List[ClientResponse])
 def get_clients(
+    response: Response,
     skip: int = 0,
     limit: int = Query(default=100, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
     db: Session = Depends(get_db)
 ):
-    """Get all clients with pagination."""
-    return client.get_multi(db, skip=skip, limit=limit)
+    """Get all clients, oldest first; the X-Next-Cursor header resumes after the page."""
+    clients = client.get_multi(db, skip=skip, limit=limit, after=parse_cursor(cursor, datetime, str))
+    set_next_cursor(response, clients, limit, client.sort_key)
+    return clients
 
 
 @router.get("/{client_id}", response_model=ClientResponse)
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Response
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.pagination import parse_cursor, set_next_cursor
 from app.crud.crud import gig
 from app.schemas.schemas import GigResponse, GigCreate, GigUpdate, GigSearchFilter
+from app.services.rematching import rematch_gig
 
 router = APIRouter()
 
@@ -19,12 +23,16 @@ def create_gig(
 
 @router.get("/", response_model=List[GigResponse])
 def get_gigs(
+    response: Response,
     skip: int = 0,
     limit: int = Query(default=100, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
     db: Session = Depends(get_db)
 ):
-    """Get all gigs with pagination."""
-    return gig.get_multi(db, skip=skip, limit=limit)
+    """Get all gigs, oldest first; the X-Next-Cursor header resumes after the page."""
+    gigs = gig.get_multi(db, skip=skip, limit=limit, profile="full", after=parse_cursor(cursor, datetime, str))
+    set_next_cursor(response, gigs, limit, gig.sort_key)
+    return gigs
 
 
 @router.get("/{gig_id}", response_model=GigResponse)
@@ -33,7 +41,7 @@ def get_gig(
     db: Session = Depends(get_db)
 ):
     """Get a specific gig by ID."""
-    db_gig = gig.get(db, gig_id)
+    db_gig = gig.get(db, gig_id, profile="full")
     if not db_gig:
         raise HTTPException(status_code=404, detail="Gig not found")
     return db_gig
@@ -43,6 +51,7 @@ def get_gig(
 def update_gig(
     gig_id: str,
     gig_update: GigUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Update a gig."""
@@ -50,7 +59,10 @@ def update_gig(
     if not db_gig:
         raise HTTPException(status_code=404, detail="Gig not found")
     
-    return gig.update(db, db_gig, gig_update)
+    db_gig = gig.update(db, db_gig, gig_update)
+    if settings.incremental_rematching:
+        background_tasks.add_task(rematch_gig, gig_id)
+    return db_gig
 
 
 @router.delete("/{gig_id}")
@@ -68,10 +80,22 @@ def delete_gig(
 @router.post("/search", response_model=List[GigResponse])
 def search_gigs(
     filters: GigSearchFilter,
+    response: Response,
     skip: int = 0,
     limit: int = Query(default=100, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
     db: Session = Depends(get_db)
 ):
-    """Search gigs with filters."""
-    return gig.search(db, filters, skip=skip, limit=limit)
+    """
+    Search gigs with filters; with ``text``, best full-text match first,
+    otherwise oldest first. The X-Next-Cursor header resumes after the page.
+    """
+    if filters.text:
+        gigs = gig.search(db, filters, skip=skip, limit=limit, profile="full", after=parse_cursor(cursor, float, str))
+        set_next_cursor(response, gigs, limit, gig.rank_key)
+        return gigs
+    
+    gigs = gig.search(db, filters, skip=skip, limit=limit, profile="full", after=parse_cursor(cursor, datetime, str))
+    set_next_cursor(response, gigs, limit, gig.sort_key)
+    return gigs
 
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import time
+from app.core.config import settings
 from app.core.database import get_db
-from app.crud.crud import gig, match_result, match_feedback
+from app.crud.crud import gig, talent, match_result, match_feedback
 from app.schemas.schemas import (
     MatchRequest, MatchResponse, MatchResultResponse, MatchScoreBreakdown,
-    MatchFeedbackCreate, MatchFeedbackResponse
+    MatchFeedbackCreate, MatchFeedbackResponse, MatchStats,
+    BatchMatchRequest, BatchMatchResponse, GigMatchResult,
+    TalentGigMatchResponse, ReverseMatchResponse
 )
 from app.services.matchmaking import rule_based_engine, ai_engine
 from app.models.models import MatchResult
@@ -14,6 +17,13 @@ from app.models.models import MatchResult
 router = APIRouter()
 
 
+def select_engine(use_ai: bool):
+    """Engine and algorithm label for a request; AI requests fall back to rules while the model is not ready."""
+    if use_ai and ai_engine.ensure_model(settings.ai_model_wait_seconds):
+        return ai_engine, "AI-Enhanced"
+    return rule_based_engine, "Rule-Based"
+
+
 def convert_match_result_to_response(match_result: MatchResult) -> MatchResultResponse:
     """Convert MatchResult model to MatchResultResponse schema."""
     score_breakdown = MatchScoreBreakdown(
@@ -48,17 +58,21 @@ def find_matches(
     start_time = time.time()
     
     # Get the gig
-    db_gig = gig.get(db, request.gig_id)
+    db_gig = gig.get(db, request.gig_id, profile="full")
     if not db_gig:
         raise HTTPException(status_code=404, detail="Gig not found")
     
     # Choose the appropriate engine
-    engine = ai_engine if request.use_ai else rule_based_engine
-    algorithm_used = "AI-Enhanced" if request.use_ai else "Rule-Based"
+    engine, algorithm_used = select_engine(request.use_ai)
     
     try:
         # Find matches
-        matches = engine.find_matches(db, request.gig_id, request.limit)
+        stats = MatchStats()
+        matches = engine.find_matches(
+            db, request.gig_id, request.limit,
+            require_skill_overlap=request.require_skill_overlap,
+            stats=stats
+        )
         
         # Convert to response format
         match_responses = [convert_match_result_to_response(match) for match in matches]
@@ -70,6 +84,54 @@ def find_matches(
             matches=match_responses,
             total_matches=len(matches),
             algorithm_used=algorithm_used,
+            processing_time_ms=processing_time,
+            stats=stats
+        )
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding matches: {str(e)}")
+
+
+@router.post("/find-matches/batch", response_model=BatchMatchResponse)
+def find_matches_batch(
+    request: BatchMatchRequest,
+    db: Session = Depends(get_db)
+):
+    """Find talent matches for many gigs (all open gigs by default) in one pass."""
+    start_time = time.time()
+    
+    if request.gig_ids is not None:
+        found = {g.id for g in gig.get_many(db, request.gig_ids)}
+        missing = [gig_id for gig_id in request.gig_ids if gig_id not in found]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Gigs not found: {', '.join(missing)}")
+    
+    # Choose the appropriate engine
+    engine, algorithm_used = select_engine(request.use_ai)
+    
+    try:
+        results = engine.find_matches_batch(
+            db, request.gig_ids, request.limit,
+            require_skill_overlap=request.require_skill_overlap
+        )
+        
+        gig_results = [
+            GigMatchResult(
+                gig_id=gig_obj.id,
+                matches=[convert_match_result_to_response(match) for match in matches],
+                total_matches=len(matches),
+                processing_time_ms=gig_time,
+                stats=stats
+            )
+            for gig_obj, matches, stats, gig_time in results
+        ]
+        
+        processing_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+        
+        return BatchMatchResponse(
+            results=gig_results,
+            total_gigs=len(gig_results),
+            algorithm_used=algorithm_used,
             processing_time_ms=processing_time
         )
         
@@ -87,7 +149,7 @@ def get_gig_matches(
     if not db_gig:
         raise HTTPException(status_code=404, detail="Gig not found")
     
-    matches = match_result.get_by_gig(db, gig_id)
+    matches = match_result.get_by_gig(db, gig_id, profile="with_talent")
     return [convert_match_result_to_response(match) for match in matches]
 
 
@@ -97,10 +159,62 @@ def get_talent_matches(
     db: Session = Depends(get_db)
 ):
     """Get matches for a specific talent."""
-    matches = match_result.get_by_talent(db, talent_id)
+    matches = match_result.get_by_talent(db, talent_id, profile="with_talent")
     return [convert_match_result_to_response(match) for match in matches]
 
 
+@router.get("/talent/{talent_id}/top-gigs", response_model=ReverseMatchResponse)
+def find_gigs_for_talent(
+    talent_id: str,
+    limit: int = Query(default=10, ge=1, le=50),
+    category: Optional[str] = None,
+    is_remote: Optional[bool] = None,
+    min_budget: Optional[float] = None,
+    require_skill_overlap: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Score a talent against all open gigs and return the best matches (nothing is stored)."""
+    start_time = time.time()
+    
+    db_talent = talent.get(db, talent_id)
+    if not db_talent:
+        raise HTTPException(status_code=404, detail="Talent not found")
+    
+    stats = MatchStats()
+    matches = rule_based_engine.find_gigs_for_talent(
+        db, talent_id, limit,
+        category=category,
+        is_remote=is_remote,
+        min_budget=min_budget,
+        require_skill_overlap=require_skill_overlap,
+        stats=stats
+    )
+    
+    # Load only the winning gigs for the response
+    gigs_by_id = {g.id: g for g in gig.get_many(db, [g.id for _, g, _ in matches], profile="full")}
+    match_responses = [
+        TalentGigMatchResponse(
+            gig=gigs_by_id[gig_obj.id],
+            match_score=match_score,
+            ranking=i + 1,
+            score_breakdown=score_breakdown,
+            match_explanation=rule_based_engine.generate_match_explanation(db_talent, gig_obj, score_breakdown)
+        )
+        for i, (match_score, gig_obj, score_breakdown) in enumerate(matches)
+        if gig_obj.id in gigs_by_id
+    ]
+    
+    processing_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+    
+    return ReverseMatchResponse(
+        talent_id=talent_id,
+        matches=match_responses,
+        total_matches=len(match_responses),
+        processing_time_ms=processing_time,
+        stats=stats
+    )
+
+
 @router.post("/feedback", response_model=MatchFeedbackResponse)
 def submit_feedback(
     feedback: MatchFeedbackCreate,
@@ -151,8 +265,8 @@ def rematch_gig(
         raise HTTPException(status_code=404, detail="Gig not found")
     
     def run_rematch():
-        engine = ai_engine if use_ai else rule_based_engine
-        engine.find_matches(db, gig_id, limit)
+        engine, _ = select_engine(use_ai)
+        engine.find_matches(db, gig_id, limit, use_cache=False)
     
     background_tasks.add_task(run_rematch)
     return {"message": "Rematch started in background"}
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from app.core.database import get_db
+from app.core.pagination import parse_cursor, set_next_cursor
 from app.crud.crud import skill
 from app.schemas.schemas import SkillResponse, SkillCreate
 
@@ -26,15 +28,23 @@ def create_skill(
 
 @router.get("/", response_model=List[SkillResponse])
 def get_skills(
+    response: Response,
     skip: int = 0,
     limit: int = Query(default=100, le=100),
     category: str = Query(None, description="Filter by category"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
     db: Session = Depends(get_db)
 ):
-    """Get all skills with optional category filter."""
+    """
+    Get all skills, oldest first, with optional category filter.
+
+    The X-Next-Cursor header resumes after the page.
+    """
     if category:
         return skill.get_by_category(db, category)
-    return skill.get_multi(db, skip=skip, limit=limit)
+    skills = skill.get_multi(db, skip=skip, limit=limit, after=parse_cursor(cursor, datetime, str))
+    set_next_cursor(response, skills, limit, skill.sort_key)
+    return skills
 
 
 @router.get("/{skill_id}", response_model=SkillResponse)
@@ -1,19 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Response
 from sqlalchemy.orm import Session
+from datetime import datetime
 from typing import List, Optional
+from app.core.config import settings
 from app.core.database import get_db
-from app.crud.crud import talent, portfolio_item
+from app.core.pagination import parse_cursor, set_next_cursor
+from app.crud.crud import talent, portfolio_item, match_result
 from app.schemas.schemas import (
     TalentResponse, TalentCreate, TalentUpdate, TalentSearchFilter,
     PortfolioItemResponse, PortfolioItemCreate
 )
+from app.services.rematching import rematch_talent
+from app.services.feature_store import talent_store
+from app.services.gazetteer import gazetteer
 
 router = APIRouter()
 
+# Talent ids checked against the other search filters per query in a radius search
+RADIUS_SEARCH_BATCH = 500
+
 
 @router.post("/", response_model=TalentResponse)
 def create_talent(
     talent_in: TalentCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Create a new talent profile."""
@@ -24,17 +34,24 @@ def create_talent(
             detail="Talent with this email already exists"
         )
     
-    return talent.create(db, talent_in)
+    db_talent = talent.create(db, talent_in)
+    if settings.incremental_rematching:
+        background_tasks.add_task(rematch_talent, db_talent.id)
+    return db_talent
 
 
 @router.get("/", response_model=List[TalentResponse])
 def get_talents(
+    response: Response,
     skip: int = 0,
     limit: int = Query(default=100, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
     db: Session = Depends(get_db)
 ):
-    """Get all talents with pagination."""
-    return talent.get_multi(db, skip=skip, limit=limit)
+    """Get all talents, oldest first; the X-Next-Cursor header resumes after the page."""
+    talents = talent.get_multi(db, skip=skip, limit=limit, profile="full", after=parse_cursor(cursor, datetime, str))
+    set_next_cursor(response, talents, limit, talent.sort_key)
+    return talents
 
 
 @router.get("/{talent_id}", response_model=TalentResponse)
@@ -43,7 +60,7 @@ def get_talent(
     db: Session = Depends(get_db)
 ):
     """Get a specific talent by ID."""
-    db_talent = talent.get(db, talent_id)
+    db_talent = talent.get(db, talent_id, profile="full")
     if not db_talent:
         raise HTTPException(status_code=404, detail="Talent not found")
     return db_talent
@@ -53,6 +70,7 @@ def get_talent(
 def update_talent(
     talent_id: str,
     talent_update: TalentUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Update a talent profile."""
@@ -60,36 +78,93 @@ def update_talent(
     if not db_talent:
         raise HTTPException(status_code=404, detail="Talent not found")
     
-    return talent.update(db, db_talent, talent_update)
+    db_talent = talent.update(db, db_talent, talent_update)
+    if settings.incremental_rematching:
+        background_tasks.add_task(rematch_talent, talent_id)
+    return db_talent
 
 
 @router.delete("/{talent_id}")
 def delete_talent(
     talent_id: str,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Delete a talent profile."""
+    # Its stored matches go with it; the gigs they belonged to get their slot refilled
+    gig_ids = [row.gig_id for row in match_result.get_by_talent(db, talent_id)]
     db_talent = talent.delete(db, talent_id)
     if not db_talent:
         raise HTTPException(status_code=404, detail="Talent not found")
+    if settings.incremental_rematching:
+        background_tasks.add_task(rematch_talent, talent_id, gig_ids)
     return {"message": "Talent deleted successfully"}
 
 
 @router.post("/search", response_model=List[TalentResponse])
 def search_talents(
     filters: TalentSearchFilter,
+    response: Response,
     skip: int = 0,
     limit: int = Query(default=100, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
     db: Session = Depends(get_db)
 ):
-    """Search talents with filters."""
-    return talent.search(db, filters, skip=skip, limit=limit)
+    """
+    Search talents with filters.
+
+    With ``radius_km`` and a center (``latitude``/``longitude`` or a place
+    name in ``near``), only talents within that distance are returned,
+    nearest first. With ``text``, only talents whose name, bio or portfolio
+    contain every word of it are returned, best match first (BM25).
+    Otherwise talents come oldest first. The X-Next-Cursor header resumes
+    after the page.
+    """
+    if filters.radius_km is None and filters.text:
+        talents = talent.search(db, filters, skip=skip, limit=limit, profile="full",
+                                after=parse_cursor(cursor, float, str))
+        set_next_cursor(response, talents, limit, talent.rank_key)
+        return talents
+    if filters.radius_km is None:
+        talents = talent.search(db, filters, skip=skip, limit=limit, profile="full",
+                                after=parse_cursor(cursor, datetime, str))
+        set_next_cursor(response, talents, limit, talent.sort_key)
+        return talents
+
+    if filters.latitude is not None and filters.longitude is not None:
+        latitude, longitude = filters.latitude, filters.longitude
+    elif filters.near:
+        place = gazetteer.resolve(filters.near)
+        if not place.is_known:
+            raise HTTPException(status_code=400, detail=f"Unknown location: {filters.near}")
+        latitude, longitude = place.latitude, place.longitude
+    else:
+        raise HTTPException(status_code=400, detail="radius_km needs latitude and longitude, or near")
+
+    # Walk the talents in (distance, id) order from the cursor on, keeping those
+    # matching the other filters, until the page is full
+    after = parse_cursor(cursor, float, str)
+    distances = {talent_id: km for talent_id, km in talent_store.nearby(db, latitude, longitude, filters.radius_km)}
+    nearby = sorted(distances, key=lambda talent_id: (distances[talent_id], talent_id))
+    if after is not None:
+        nearby = [talent_id for talent_id in nearby if (distances[talent_id], talent_id) > after]
+    matched = []
+    for start in range(0, len(nearby), RADIUS_SEARCH_BATCH):
+        batch = nearby[start:start + RADIUS_SEARCH_BATCH]
+        found = talent.search_ids(db, filters, batch)
+        matched.extend(talent_id for talent_id in batch if talent_id in found)
+        if len(matched) >= skip + limit:
+            break
+    talents = talent.get_many(db, matched[skip:skip + limit], profile="full")
+    set_next_cursor(response, talents, limit, lambda last: (distances[last.id], last.id))
+    return talents
 
 
 @router.post("/{talent_id}/portfolio", response_model=PortfolioItemResponse)
 def create_portfolio_item(
     talent_id: str,
     portfolio_item_in: PortfolioItemCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Add a portfolio item to a talent."""
@@ -97,7 +172,10 @@ def create_portfolio_item(
     if not db_talent:
         raise HTTPException(status_code=404, detail="Talent not found")
     
-    return portfolio_item.create(db, portfolio_item_in, talent_id)
+    db_item = portfolio_item.create(db, portfolio_item_in, talent_id)
+    if settings.incremental_rematching:
+        background_tasks.add_task(rematch_talent, talent_id)
+    return db_item
 
 
 @router.get("/{talent_id}/portfolio", response_model=List[PortfolioItemResponse])
@@ -116,10 +194,13 @@ def get_talent_portfolio(
 @router.delete("/portfolio/{portfolio_item_id}")
 def delete_portfolio_item(
     portfolio_item_id: str,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Delete a portfolio item."""
     db_item = portfolio_item.delete(db, portfolio_item_id)
     if not db_item:
         raise HTTPException(status_code=404, detail="Portfolio item not found")
+    if settings.incremental_rematching:
+        background_tasks.add_task(rematch_talent, db_item.talent_id)
     return {"message": "Portfolio item deleted successfully"}
@@ -19,6 +19,26 @@ class Settings(BaseSettings):
     # OpenAI
     openai_api_key: Optional[str] = None
     
+    # Matching
+    vectorized_scoring: bool = True  # score the talent pool with NumPy arrays
+    talent_feature_store: bool = True  # keep talent features resident in memory
+    gig_feature_store: bool = True  # keep open gigs resident and indexed for reverse matching
+    incremental_rematching: bool = False  # refresh stored matches in the background on talent/gig writes
+    match_cache_size: int = 256  # gigs whose current match results are remembered (LRU)
+    scoring_workers: int = 0  # processes for sharded scoring of large pools; 0 or 1 scores in-process
+    parallel_scoring_threshold: int = 50000  # talent pool size below which scoring stays in-process
+    ai_model_preload: bool = False  # load the sentence-transformers model in the background at startup
+    ai_model_wait_seconds: float = 0.0  # how long an AI request waits for the model before falling back to rules
+    rerank_shortlist_size: int = 100  # rule-based shortlist the AI engine reranks semantically
+    embedding_precision: str = "float32"  # in-memory embeddings: float32, float16 or int8 (one scale per vector)
+    semantic_aggregation: str = "mean"  # how a talent's portfolio item similarities combine: mean or max
+    semantic_candidate_count: int = 50  # talents the portfolio ANN index adds to the rerank shortlist; 0 disables
+    ann_index_path: str = "data/portfolio_ann.npz"  # persisted portfolio ANN index
+    ann_lists: int = 0  # IVF lists of the portfolio ANN index; 0 uses sqrt(number of items)
+    ann_probes: int = 8  # IVF lists scanned per ANN query
+    geo_cell_degrees: float = 0.5  # cell size of the talent spatial grid index used by radius search
+    location_half_life_km: float = 0.0  # distance at which location score decays halfway; 0 scores by city/region/country
+    
     # Environment
     environment: str = "development"
     
@@ -0,0 +1,248 @@
+"""
+Full-text search over talents (name, bio and portfolio items) and gigs (title,
+description, style preferences and deliverables).
+
+On SQLite the documents live in FTS5 virtual tables ranked with BM25; on
+PostgreSQL in tsvector tables with GIN indexes ranked with ts_rank_cd. Both
+are kept in sync by database triggers on the source tables, so every writer
+(the API, scripts, other workers) updates them in the same transaction.
+``setup_fulltext`` creates the tables and triggers and fills them the first
+time; ``talent_matches`` and ``gig_matches`` return the ranked matches of a
+search text as a subquery to join against.
+"""
+
+import re
+from typing import List, Optional
+from sqlalchemy import Float, String, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import Subquery
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Portfolio text of a talent, as one SQLite / PostgreSQL expression over portfolio_items p
+_SQLITE_PORTFOLIO = (
+    "(SELECT group_concat(coalesce(p.title, '') || ' ' || coalesce(p.description, '') || ' ' || "
+    "coalesce(p.tags, '') || ' ' || coalesce(p.style_keywords, ''), ' ') "
+    "FROM portfolio_items p WHERE p.talent_id = t.id)"
+)
+_POSTGRES_PORTFOLIO = (
+    "(SELECT string_agg(concat_ws(' ', p.title, p.description, p.tags, p.style_keywords), ' ') "
+    "FROM portfolio_items p WHERE p.talent_id = t.id)"
+)
+
+# SQLite: FTS5 tables keyed by the rowid of a mapping table, since the source
+# tables have string primary keys and their own rowids are not stable
+_SQLITE_REFRESH_TALENT = f"""
+    INSERT OR IGNORE INTO talent_search_rows (talent_id) VALUES ({{id}});
+    DELETE FROM talent_search WHERE rowid = (SELECT rowid FROM talent_search_rows WHERE talent_id = {{id}});
+    INSERT INTO talent_search (rowid, name, bio, portfolio)
+    SELECT r.rowid, t.name, t.bio, {_SQLITE_PORTFOLIO}
+    FROM talents t JOIN talent_search_rows r ON r.talent_id = t.id WHERE t.id = {{id}};
+"""
+_SQLITE_REFRESH_GIG = """
+    INSERT OR IGNORE INTO gig_search_rows (gig_id) VALUES ({id});
+    DELETE FROM gig_search WHERE rowid = (SELECT rowid FROM gig_search_rows WHERE gig_id = {id});
+    INSERT INTO gig_search (rowid, title, description, style_preferences, deliverables)
+    SELECT r.rowid, g.title, g.description, g.style_preferences, g.deliverables
+    FROM gigs g JOIN gig_search_rows r ON r.gig_id = g.id WHERE g.id = {id};
+"""
+_SQLITE_REMOVE = """
+    DELETE FROM {kind}_search WHERE rowid = (SELECT rowid FROM {kind}_search_rows WHERE {kind}_id = OLD.id);
+    DELETE FROM {kind}_search_rows WHERE {kind}_id = OLD.id;
+"""
+
+SQLITE_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS talent_search_rows (rowid INTEGER PRIMARY KEY, talent_id VARCHAR NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS talent_search USING fts5(name, bio, portfolio, tokenize='porter unicode61')",
+    "CREATE TABLE IF NOT EXISTS gig_search_rows (rowid INTEGER PRIMARY KEY, gig_id VARCHAR NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS gig_search USING fts5("
+    "title, description, style_preferences, deliverables, tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS talent_search_insert AFTER INSERT ON talents BEGIN "
+    + _SQLITE_REFRESH_TALENT.format(id="NEW.id") + " END",
+    "CREATE TRIGGER IF NOT EXISTS talent_search_update AFTER UPDATE OF name, bio ON talents BEGIN "
+    + _SQLITE_REFRESH_TALENT.format(id="NEW.id") + " END",
+    "CREATE TRIGGER IF NOT EXISTS talent_search_delete AFTER DELETE ON talents BEGIN "
+    + _SQLITE_REMOVE.format(kind="talent") + " END",
+    "CREATE TRIGGER IF NOT EXISTS talent_search_item_insert AFTER INSERT ON portfolio_items BEGIN "
+    + _SQLITE_REFRESH_TALENT.format(id="NEW.talent_id") + " END",
+    "CREATE TRIGGER IF NOT EXISTS talent_search_item_update AFTER UPDATE ON portfolio_items BEGIN "
+    + _SQLITE_REFRESH_TALENT.format(id="OLD.talent_id") + _SQLITE_REFRESH_TALENT.format(id="NEW.talent_id") + " END",
+    "CREATE TRIGGER IF NOT EXISTS talent_search_item_delete AFTER DELETE ON portfolio_items BEGIN "
+    + _SQLITE_REFRESH_TALENT.format(id="OLD.talent_id") + " END",
+    "CREATE TRIGGER IF NOT EXISTS gig_search_insert AFTER INSERT ON gigs BEGIN "
+    + _SQLITE_REFRESH_GIG.format(id="NEW.id") + " END",
+    "CREATE TRIGGER IF NOT EXISTS gig_search_update "
+    "AFTER UPDATE OF title, description, style_preferences, deliverables ON gigs BEGIN "
+    + _SQLITE_REFRESH_GIG.format(id="NEW.id") + " END",
+    "CREATE TRIGGER IF NOT EXISTS gig_search_delete AFTER DELETE ON gigs BEGIN "
+    + _SQLITE_REMOVE.format(kind="gig") + " END",
+]
+
+SQLITE_REBUILD = [
+    "DELETE FROM talent_search",
+    "DELETE FROM talent_search_rows",
+    "INSERT INTO talent_search_rows (talent_id) SELECT id FROM talents",
+    "INSERT INTO talent_search (rowid, name, bio, portfolio) "
+    f"SELECT r.rowid, t.name, t.bio, {_SQLITE_PORTFOLIO} FROM talents t JOIN talent_search_rows r ON r.talent_id = t.id",
+    "DELETE FROM gig_search",
+    "DELETE FROM gig_search_rows",
+    "INSERT INTO gig_search_rows (gig_id) SELECT id FROM gigs",
+    "INSERT INTO gig_search (rowid, title, description, style_preferences, deliverables) "
+    "SELECT r.rowid, g.title, g.description, g.style_preferences, g.deliverables "
+    "FROM gigs g JOIN gig_search_rows r ON r.gig_id = g.id",
+]
+
+# Talent name and gig title weigh more than the other fields
+SQLITE_TALENT_MATCHES = (
+    "SELECT r.talent_id AS talent_id, bm25(talent_search, 2.0, 1.0, 1.0) AS rank "
+    "FROM talent_search JOIN talent_search_rows r ON r.rowid = talent_search.rowid "
+    "WHERE talent_search MATCH :terms"
+)
+SQLITE_GIG_MATCHES = (
+    "SELECT r.gig_id AS gig_id, bm25(gig_search, 2.0, 1.0, 1.0, 1.0) AS rank "
+    "FROM gig_search JOIN gig_search_rows r ON r.rowid = gig_search.rowid "
+    "WHERE gig_search MATCH :terms"
+)
+
+# PostgreSQL: one tsvector per talent or gig, refreshed by PL/pgSQL triggers
+_POSTGRES_TALENT_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(t.name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(t.bio, '')), 'B') || "
+    f"setweight(to_tsvector('english', coalesce({_POSTGRES_PORTFOLIO}, '')), 'B')"
+)
+_POSTGRES_GIG_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(g.title, '')), 'A') || "
+    "setweight(to_tsvector('english', concat_ws(' ', g.description, g.style_preferences, g.deliverables)), 'B')"
+)
+
+POSTGRES_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS talent_search (talent_id VARCHAR PRIMARY KEY, document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_talent_search_document ON talent_search USING GIN (document)",
+    "CREATE TABLE IF NOT EXISTS gig_search (gig_id VARCHAR PRIMARY KEY, document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_gig_search_document ON gig_search USING GIN (document)",
+    f"""CREATE OR REPLACE FUNCTION talent_search_refresh(refresh_id VARCHAR) RETURNS void AS $$
+    BEGIN
+        DELETE FROM talent_search WHERE talent_id = refresh_id;
+        INSERT INTO talent_search (talent_id, document)
+        SELECT t.id, {_POSTGRES_TALENT_DOCUMENT} FROM talents t WHERE t.id = refresh_id;
+    END $$ LANGUAGE plpgsql""",
+    f"""CREATE OR REPLACE FUNCTION gig_search_refresh(refresh_id VARCHAR) RETURNS void AS $$
+    BEGIN
+        DELETE FROM gig_search WHERE gig_id = refresh_id;
+        INSERT INTO gig_search (gig_id, document)
+        SELECT g.id, {_POSTGRES_GIG_DOCUMENT} FROM gigs g WHERE g.id = refresh_id;
+    END $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION talent_search_talent_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM talent_search WHERE talent_id = OLD.id;
+        ELSE
+            PERFORM talent_search_refresh(NEW.id);
+        END IF;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION talent_search_item_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM talent_search_refresh(OLD.talent_id);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM talent_search_refresh(NEW.talent_id);
+        END IF;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION gig_search_gig_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM gig_search WHERE gig_id = OLD.id;
+        ELSE
+            PERFORM gig_search_refresh(NEW.id);
+        END IF;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS talent_search_talents ON talents",
+    "CREATE TRIGGER talent_search_talents AFTER INSERT OR UPDATE OR DELETE ON talents "
+    "FOR EACH ROW EXECUTE FUNCTION talent_search_talent_trigger()",
+    "DROP TRIGGER IF EXISTS talent_search_items ON portfolio_items",
+    "CREATE TRIGGER talent_search_items AFTER INSERT OR UPDATE OR DELETE ON portfolio_items "
+    "FOR EACH ROW EXECUTE FUNCTION talent_search_item_trigger()",
+    "DROP TRIGGER IF EXISTS gig_search_gigs ON gigs",
+    "CREATE TRIGGER gig_search_gigs AFTER INSERT OR UPDATE OR DELETE ON gigs "
+    "FOR EACH ROW EXECUTE FUNCTION gig_search_gig_trigger()",
+]
+
+POSTGRES_REBUILD = [
+    "DELETE FROM talent_search",
+    f"INSERT INTO talent_search (talent_id, document) SELECT t.id, {_POSTGRES_TALENT_DOCUMENT} FROM talents t",
+    "DELETE FROM gig_search",
+    f"INSERT INTO gig_search (gig_id, document) SELECT g.id, {_POSTGRES_GIG_DOCUMENT} FROM gigs g",
+]
+
+# Ranks are negated so that, as with bm25(), lower is better
+POSTGRES_TALENT_MATCHES = (
+    "SELECT talent_id, -ts_rank_cd(document, search_query) AS rank "
+    "FROM talent_search, plainto_tsquery('english', :terms) AS search_query WHERE document @@ search_query"
+)
+POSTGRES_GIG_MATCHES = (
+    "SELECT gig_id, -ts_rank_cd(document, search_query) AS rank "
+    "FROM gig_search, plainto_tsquery('english', :terms) AS search_query WHERE document @@ search_query"
+)
+
+
+def is_supported(engine: Engine) -> bool:
+    return engine.dialect.name in ('sqlite', 'postgresql')
+
+
+def search_terms(search_text: str) -> List[str]:
+    """Words of a search text; punctuation and FTS query operators are dropped"""
+    return re.findall(r"[^\W_]+", search_text)
+
+
+def setup_fulltext(engine: Engine) -> None:
+    """Create the search tables and their triggers, filling the tables when they are new"""
+    if not is_supported(engine):
+        logger.warning(f"Full-text search is not available on {engine.dialect.name}; text searches will scan")
+        return
+
+    is_new = not inspect(engine).has_table('talent_search')
+    schema = SQLITE_SCHEMA if engine.dialect.name == 'sqlite' else POSTGRES_SCHEMA
+    with engine.begin() as connection:
+        for statement in schema:
+            connection.exec_driver_sql(statement)
+    if is_new:
+        rebuild_fulltext(engine)
+
+
+def rebuild_fulltext(engine: Engine) -> None:
+    """Refill the search tables from the talent, portfolio item and gig tables"""
+    rebuild = SQLITE_REBUILD if engine.dialect.name == 'sqlite' else POSTGRES_REBUILD
+    with engine.begin() as connection:
+        for statement in rebuild:
+            connection.exec_driver_sql(statement)
+    logger.info("Full-text search tables rebuilt")
+
+
+def _matches(engine: Engine, search_text: str, sqlite_sql: str, postgres_sql: str, id_column: str) -> Optional[Subquery]:
+    terms = search_terms(search_text)
+    if not terms:
+        return None
+    if engine.dialect.name == 'sqlite':
+        # Every word must occur (implicit AND); quoting keeps words from being read as operators
+        sql, terms = sqlite_sql, ' '.join(f'"{term}"' for term in terms)
+    else:
+        sql, terms = postgres_sql, ' '.join(terms)
+    return text(sql).bindparams(terms=terms).columns(**{id_column: String, 'rank': Float}).subquery()
+
+
+def talent_matches(engine: Engine, search_text: str) -> Optional[Subquery]:
+    """
+    Talents matching every word of ``search_text`` as a subquery of
+    (talent_id, rank), lower rank first; None when the text has no words.
+    """
+    return _matches(engine, search_text, SQLITE_TALENT_MATCHES, POSTGRES_TALENT_MATCHES, 'talent_id')
+
+
+def gig_matches(engine: Engine, search_text: str) -> Optional[Subquery]:
+    """Gigs matching every word of ``search_text`` as a subquery of (gig_id, rank), lower rank first"""
+    return _matches(engine, search_text, SQLITE_GIG_MATCHES, POSTGRES_GIG_MATCHES, 'gig_id')
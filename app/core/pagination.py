@@ -0,0 +1,64 @@
+"""
+Cursor pagination for list and search endpoints.
+
+A cursor is the sort key of the last row of a page, e.g. (created_at, id),
+encoded as an opaque URL-safe token. The next page starts strictly after
+that key, so the database seeks to it through an index instead of skipping
+every earlier row as OFFSET does. Pages return the cursor of the next page
+in the ``X-Next-Cursor`` response header, leaving the JSON body a plain list
+for existing clients; the header is absent on the last page.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence, Tuple
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*key: Any) -> str:
+    values = [value.isoformat(sep=' ') if isinstance(value, datetime) else value for value in key]
+    token = base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode()).decode()
+    return token.rstrip('=')
+
+
+def _convert(value: Any, kind: type) -> Any:
+    if kind is datetime and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if kind is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if kind is int and isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+        return value
+    if kind is str and isinstance(value, str):
+        return value
+    raise ValueError(f"Expected {kind.__name__}, got {value!r}")
+
+
+def decode_cursor(cursor: str, *kinds: type) -> Tuple:
+    """Sort key of a cursor, checked against the types of the expected key; ValueError if it is not one"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(values, list) or len(values) != len(kinds):
+        raise ValueError("Cursor does not match this listing")
+    return tuple(_convert(value, kind) for value, kind in zip(values, kinds))
+
+
+def parse_cursor(cursor: Optional[str], *kinds: type) -> Optional[Tuple]:
+    """``decode_cursor`` for a request parameter: None without a cursor, 400 for an invalid one"""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, *kinds)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def set_next_cursor(response: Response, page: Sequence, limit: int, key: Callable[[Any], Tuple]) -> None:
+    """Send the cursor after the last row of a full page; ``key`` gives a row's sort key"""
+    if page and len(page) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(page[-1]))
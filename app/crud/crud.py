@@ -1,8 +1,8 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from typing import List, Optional, Dict, Any
+from sqlalchemy.orm import Session, selectinload, joinedload
+from sqlalchemy import and_, or_, func, insert, update, delete, false, literal, tuple_, type_coerce, String
+from typing import List, Optional, Dict, Any, Callable, Set, Tuple
 from app.models.models import (
-    Client, Talent, Skill, PortfolioItem, Gig, MatchResult, MatchFeedback,
+    Client, Talent, Skill, PortfolioItem, Gig, MatchResult, MatchRun, Embedding, MatchFeedback,
     talent_skills, gig_skills
 )
 from app.schemas.schemas import (
@@ -10,9 +10,85 @@ from app.schemas.schemas import (
     PortfolioItemCreate, GigCreate, GigUpdate, MatchFeedbackCreate,
     TalentSearchFilter, GigSearchFilter
 )
+from app.core import fulltext
+import logging
 
+logger = logging.getLogger(__name__)
+
+
+class CRUDListenerMixin:
+    """Lets services react to committed writes without crud importing them."""
+
+    def add_listener(self, listener: Callable[[str, Any], None]) -> None:
+        self.__dict__.setdefault('_listeners', []).append(listener)
+
+    def _notify(self, event: str, obj: Any) -> None:
+        for listener in self.__dict__.get('_listeners', []):
+            try:
+                listener(event, obj)
+            except Exception:
+                logger.exception(f"Listener failed on {event} of {type(obj).__name__}")
+
+
+class CRUDLoadProfileMixin:
+    """Named eager-loading option sets that callers opt into with ``profile=``.
+
+    Without a profile relationships load lazily, one query per row touched.
+    """
+    model = None
+    load_profiles: Dict[str, tuple] = {}
+
+    def query(self, db: Session, profile: Optional[str] = None):
+        query = db.query(self.model)
+        if profile:
+            query = query.options(*self.load_profiles[profile])
+        return query
+
+
+class CRUDKeysetMixin:
+    """Listing in (created_at, id) or (rank, id) order, resuming after the sort key of a previous page's last row."""
+
+    model = None
+
+    def keyset(self, db: Session, query, after: Optional[Tuple] = None):
+        query = query.order_by(self.model.created_at, self.model.id)
+        if after is None:
+            return query
+        
+        created_at, id = after
+        column = self.model.created_at
+        if db.get_bind().dialect.name == 'sqlite':
+            # SQLite keeps timestamps as text, with fractional seconds only when they were set
+            column, created_at = type_coerce(column, String), created_at.isoformat(sep=' ')
+        return query.filter(tuple_(column, self.model.id) > tuple_(created_at, id))
+
+    @staticmethod
+    def sort_key(obj) -> Tuple:
+        return obj.created_at, obj.id
+
+    def ranked(self, query, rank, after: Optional[Tuple] = None):
+        """Order by (rank, id) after ``after``, returning each row's rank as ``search_rank`` alongside it"""
+        query = query.add_columns(rank.label('search_rank')).order_by(rank, self.model.id)
+        if after is None:
+            return query
+        return query.filter(tuple_(rank, self.model.id) > tuple_(*after))
+
+    def ranked_all(self, query) -> List:
+        """Rows of a ``ranked`` query, each carrying its rank for ``rank_key``"""
+        objs = []
+        for obj, rank in query.all():
+            obj.search_rank = rank
+            objs.append(obj)
+        return objs
+
+    @staticmethod
+    def rank_key(obj) -> Tuple:
+        return obj.search_rank, obj.id
+
+
+class CRUDClient(CRUDKeysetMixin):
+    model = Client
 
-class CRUDClient:
     def create(self, db: Session, obj_in: ClientCreate) -> Client:
         db_obj = Client(**obj_in.dict())
         db.add(db_obj)
@@ -26,8 +102,9 @@ class CRUDClient:
     def get_by_email(self, db: Session, email: str) -> Optional[Client]:
         return db.query(Client).filter(Client.email == email).first()
 
-    def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[Client]:
-        return db.query(Client).offset(skip).limit(limit).all()
+    def get_multi(self, db: Session, skip: int = 0, limit: int = 100,
+                  after: Optional[Tuple] = None) -> List[Client]:
+        return self.keyset(db, db.query(Client), after).offset(skip).limit(limit).all()
 
     def update(self, db: Session, db_obj: Client, obj_in: dict) -> Client:
         for field, value in obj_in.items():
@@ -45,12 +122,15 @@ class CRUDClient:
         return obj
 
 
-class CRUDSkill:
+class CRUDSkill(CRUDKeysetMixin, CRUDListenerMixin):
+    model = Skill
+
     def create(self, db: Session, obj_in: SkillCreate) -> Skill:
         db_obj = Skill(**obj_in.dict())
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        self._notify("created", db_obj)
         return db_obj
 
     def get(self, db: Session, id: str) -> Optional[Skill]:
@@ -59,8 +139,9 @@ class CRUDSkill:
     def get_by_name(self, db: Session, name: str) -> Optional[Skill]:
         return db.query(Skill).filter(Skill.name == name).first()
 
-    def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[Skill]:
-        return db.query(Skill).offset(skip).limit(limit).all()
+    def get_multi(self, db: Session, skip: int = 0, limit: int = 100,
+                  after: Optional[Tuple] = None) -> List[Skill]:
+        return self.keyset(db, db.query(Skill), after).offset(skip).limit(limit).all()
 
     def get_by_category(self, db: Session, category: str) -> List[Skill]:
         return db.query(Skill).filter(Skill.category == category).all()
@@ -69,7 +150,15 @@ class CRUDSkill:
         return db.query(Skill).filter(Skill.id.in_(ids)).all()
 
 
-class CRUDTalent:
+class CRUDTalent(CRUDLoadProfileMixin, CRUDKeysetMixin, CRUDListenerMixin):
+    model = Talent
+    load_profiles = {
+        # Everything TalentResponse serializes
+        "full": (selectinload(Talent.skills), selectinload(Talent.portfolio_items)),
+        # Everything MatchmakingEngine scores on
+        "scoring": (selectinload(Talent.skills), selectinload(Talent.portfolio_items)),
+    }
+
     def create(self, db: Session, obj_in: TalentCreate) -> Talent:
         # Create talent without skills first
         talent_data = obj_in.dict()
@@ -87,20 +176,60 @@ class CRUDTalent:
             db.commit()
             db.refresh(db_obj)
         
+        self._notify("created", db_obj)
         return db_obj
 
-    def get(self, db: Session, id: str) -> Optional[Talent]:
-        return db.query(Talent).filter(Talent.id == id).first()
+    def get(self, db: Session, id: str, profile: Optional[str] = None) -> Optional[Talent]:
+        return self.query(db, profile).filter(Talent.id == id).first()
 
     def get_by_email(self, db: Session, email: str) -> Optional[Talent]:
         return db.query(Talent).filter(Talent.email == email).first()
 
-    def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[Talent]:
-        return db.query(Talent).offset(skip).limit(limit).all()
-
-    def search(self, db: Session, filters: TalentSearchFilter, skip: int = 0, limit: int = 100) -> List[Talent]:
-        query = db.query(Talent)
-        
+    def get_multi(self, db: Session, skip: int = 0, limit: int = 100,
+                  profile: Optional[str] = None, after: Optional[Tuple] = None) -> List[Talent]:
+        return self.keyset(db, self.query(db, profile), after).offset(skip).limit(limit).all()
+
+    def get_many(self, db: Session, ids: List[str], profile: Optional[str] = None) -> List[Talent]:
+        """Talents with the given ids, in the order the ids are given; unknown ids are skipped"""
+        by_id = {t.id: t for t in self.query(db, profile).filter(Talent.id.in_(ids)).all()}
+        return [by_id[id] for id in dict.fromkeys(ids) if id in by_id]
+
+    def get_locations(self, db: Session) -> List[Any]:
+        """(id, location) of every talent"""
+        return db.query(Talent.id, Talent.location).all()
+
+    def search(self, db: Session, filters: TalentSearchFilter, skip: int = 0, limit: int = 100,
+               profile: Optional[str] = None, after: Optional[Tuple] = None) -> List[Talent]:
+        """
+        Matching talents after ``after``: in (rank, id) order, best text match
+        first, with ``text``, else in (created_at, id) order.
+        """
+        query = self._filter(self.query(db, profile), filters)
+        if filters.text:
+            return self.ranked_all(self._match_text(db, query, filters.text, after).offset(skip).limit(limit))
+        return self.keyset(db, query, after).offset(skip).limit(limit).all()
+
+    def search_ids(self, db: Session, filters: TalentSearchFilter, ids: List[str]) -> Set[str]:
+        """Those of ``ids`` whose talents match ``filters``"""
+        query = self._filter(db.query(Talent.id), filters).filter(Talent.id.in_(ids))
+        if filters.text:
+            query = self._match_text(db, query, filters.text)
+        return {row.id for row in query}
+
+    def _match_text(self, db: Session, query, search_text: str, after: Optional[Tuple] = None):
+        """Restrict to talents whose name, bio or portfolio match ``search_text``, ranked best match first"""
+        engine = db.get_bind()
+        if not fulltext.is_supported(engine):
+            pattern = f"%{search_text}%"
+            query = query.filter(or_(Talent.name.ilike(pattern), Talent.bio.ilike(pattern)))
+            return self.ranked(query, literal(0.0), after)
+        
+        matches = fulltext.talent_matches(engine, search_text)
+        if matches is None:
+            return self.ranked(query.filter(false()), literal(0.0))
+        return self.ranked(query.join(matches, matches.c.talent_id == Talent.id), matches.c.rank, after)
+
+    def _filter(self, query, filters: TalentSearchFilter):
         if filters.location:
             query = query.filter(Talent.location.ilike(f"%{filters.location}%"))
         
@@ -140,7 +269,7 @@ class CRUDTalent:
         if filters.category:
             query = query.join(Talent.skills).filter(Skill.category == filters.category)
         
-        return query.offset(skip).limit(limit).all()
+        return query
 
     def update(self, db: Session, db_obj: Talent, obj_in: TalentUpdate) -> Talent:
         update_data = obj_in.dict(exclude_unset=True)
@@ -156,22 +285,27 @@ class CRUDTalent:
         
         db.commit()
         db.refresh(db_obj)
+        self._notify("updated", db_obj)
         return db_obj
 
     def delete(self, db: Session, id: str) -> Optional[Talent]:
         obj = db.query(Talent).filter(Talent.id == id).first()
         if obj:
+            # Its portfolio items go with it by cascade, and their embeddings with them
+            embedding.delete_by_owners(db, [item.id for item in obj.portfolio_items])
             db.delete(obj)
             db.commit()
+            self._notify("deleted", obj)
         return obj
 
 
-class CRUDPortfolioItem:
+class CRUDPortfolioItem(CRUDListenerMixin):
     def create(self, db: Session, obj_in: PortfolioItemCreate, talent_id: str) -> PortfolioItem:
         db_obj = PortfolioItem(**obj_in.dict(), talent_id=talent_id)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        self._notify("created", db_obj)
         return db_obj
 
     def get(self, db: Session, id: str) -> Optional[PortfolioItem]:
@@ -183,12 +317,22 @@ class CRUDPortfolioItem:
     def delete(self, db: Session, id: str) -> Optional[PortfolioItem]:
         obj = db.query(PortfolioItem).filter(PortfolioItem.id == id).first()
         if obj:
+            embedding.delete_by_owners(db, [obj.id])
             db.delete(obj)
             db.commit()
+            self._notify("deleted", obj)
         return obj
 
 
-class CRUDGig:
+class CRUDGig(CRUDLoadProfileMixin, CRUDKeysetMixin, CRUDListenerMixin):
+    model = Gig
+    load_profiles = {
+        # Everything GigResponse serializes
+        "full": (joinedload(Gig.client), selectinload(Gig.required_skills)),
+        # Everything MatchmakingEngine scores on
+        "scoring": (selectinload(Gig.required_skills),),
+    }
+
     def create(self, db: Session, obj_in: GigCreate) -> Gig:
         gig_data = obj_in.dict()
         skill_ids = gig_data.pop('required_skill_ids', [])
@@ -205,16 +349,28 @@ class CRUDGig:
             db.commit()
             db.refresh(db_obj)
         
+        self._notify("created", db_obj)
         return db_obj
 
-    def get(self, db: Session, id: str) -> Optional[Gig]:
-        return db.query(Gig).filter(Gig.id == id).first()
+    def get(self, db: Session, id: str, profile: Optional[str] = None) -> Optional[Gig]:
+        return self.query(db, profile).filter(Gig.id == id).first()
+
+    def get_multi(self, db: Session, skip: int = 0, limit: int = 100,
+                  profile: Optional[str] = None, after: Optional[Tuple] = None) -> List[Gig]:
+        return self.keyset(db, self.query(db, profile), after).offset(skip).limit(limit).all()
+
+    def get_many(self, db: Session, ids: List[str], profile: Optional[str] = None) -> List[Gig]:
+        """Gigs with the given ids, in the order the ids are given; unknown ids are skipped"""
+        by_id = {g.id: g for g in self.query(db, profile).filter(Gig.id.in_(ids)).all()}
+        return [by_id[id] for id in dict.fromkeys(ids) if id in by_id]
 
-    def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[Gig]:
-        return db.query(Gig).offset(skip).limit(limit).all()
+    def get_open(self, db: Session, profile: Optional[str] = None) -> List[Gig]:
+        return self.query(db, profile).filter(Gig.status == "open").order_by(Gig.created_at).all()
 
-    def search(self, db: Session, filters: GigSearchFilter, skip: int = 0, limit: int = 100) -> List[Gig]:
-        query = db.query(Gig)
+    def search(self, db: Session, filters: GigSearchFilter, skip: int = 0, limit: int = 100,
+               profile: Optional[str] = None, after: Optional[Tuple] = None) -> List[Gig]:
+        """Matching gigs, best text match first with ``text``, else in (created_at, id) order after ``after``"""
+        query = self.query(db, profile)
         
         if filters.category:
             query = query.filter(Gig.category == filters.category)
@@ -237,7 +393,22 @@ class CRUDGig:
         if filters.client_id:
             query = query.filter(Gig.client_id == filters.client_id)
         
-        return query.offset(skip).limit(limit).all()
+        if filters.text:
+            return self.ranked_all(self._match_text(db, query, filters.text, after).offset(skip).limit(limit))
+        return self.keyset(db, query, after).offset(skip).limit(limit).all()
+
+    def _match_text(self, db: Session, query, search_text: str, after: Optional[Tuple] = None):
+        """Restrict to gigs whose title, description, style preferences or deliverables match, ranked best first"""
+        engine = db.get_bind()
+        if not fulltext.is_supported(engine):
+            pattern = f"%{search_text}%"
+            query = query.filter(or_(Gig.title.ilike(pattern), Gig.description.ilike(pattern)))
+            return self.ranked(query, literal(0.0), after)
+        
+        matches = fulltext.gig_matches(engine, search_text)
+        if matches is None:
+            return self.ranked(query.filter(false()), literal(0.0))
+        return self.ranked(query.join(matches, matches.c.gig_id == Gig.id), matches.c.rank, after)
 
     def update(self, db: Session, db_obj: Gig, obj_in: GigUpdate) -> Gig:
         update_data = obj_in.dict(exclude_unset=True)
@@ -253,17 +424,29 @@ class CRUDGig:
         
         db.commit()
         db.refresh(db_obj)
+        self._notify("updated", db_obj)
         return db_obj
 
     def delete(self, db: Session, id: str) -> Optional[Gig]:
         obj = db.query(Gig).filter(Gig.id == id).first()
         if obj:
+            embedding.delete_by_owners(db, [obj.id])
             db.delete(obj)
             db.commit()
+            self._notify("deleted", obj)
         return obj
 
 
-class CRUDMatchResult:
+class CRUDMatchResult(CRUDLoadProfileMixin):
+    model = MatchResult
+    load_profiles = {
+        # Everything MatchResultResponse serializes
+        "with_talent": (
+            selectinload(MatchResult.talent).selectinload(Talent.skills),
+            selectinload(MatchResult.talent).selectinload(Talent.portfolio_items),
+        ),
+    }
+
     def create(self, db: Session, match_data: dict) -> MatchResult:
         db_obj = MatchResult(**match_data)
         db.add(db_obj)
@@ -271,11 +454,27 @@ class CRUDMatchResult:
         db.refresh(db_obj)
         return db_obj
 
-    def get_by_gig(self, db: Session, gig_id: str) -> List[MatchResult]:
-        return db.query(MatchResult).filter(MatchResult.gig_id == gig_id).order_by(MatchResult.ranking).all()
+    def get_by_gig(self, db: Session, gig_id: str, profile: Optional[str] = None) -> List[MatchResult]:
+        return self.query(db, profile).filter(MatchResult.gig_id == gig_id).order_by(MatchResult.ranking).all()
+
+    def get_by_gigs(self, db: Session, gig_ids: List[str],
+                    profile: Optional[str] = None) -> Dict[str, List[MatchResult]]:
+        """Match results of several gigs in one query, grouped by gig in ranking order"""
+        by_gig = {gig_id: [] for gig_id in gig_ids}
+        query = self.query(db, profile).filter(MatchResult.gig_id.in_(gig_ids))
+        for row in query.order_by(MatchResult.gig_id, MatchResult.ranking).all():
+            by_gig[row.gig_id].append(row)
+        return by_gig
+
+    def get_by_talent(self, db: Session, talent_id: str, profile: Optional[str] = None) -> List[MatchResult]:
+        return self.query(db, profile).filter(MatchResult.talent_id == talent_id).all()
 
-    def get_by_talent(self, db: Session, talent_id: str) -> List[MatchResult]:
-        return db.query(MatchResult).filter(MatchResult.talent_id == talent_id).all()
+    def summary_by_gig(self, db: Session, gig_ids: List[str]) -> Dict[str, Tuple[int, float]]:
+        """(row count, lowest match score) of each gig's stored results, in one grouped query"""
+        rows = db.query(
+            MatchResult.gig_id, func.count(MatchResult.id), func.min(MatchResult.match_score)
+        ).filter(MatchResult.gig_id.in_(gig_ids)).group_by(MatchResult.gig_id).all()
+        return {gig_id: (count, min_score) for gig_id, count, min_score in rows}
 
     def delete_by_gig(self, db: Session, gig_id: str) -> int:
         count = db.query(MatchResult).filter(MatchResult.gig_id == gig_id).count()
@@ -283,6 +482,99 @@ class CRUDMatchResult:
         db.commit()
         return count
 
+    def diff_for_gig(self, db: Session, gig_id: str, rows: List[dict]) -> Dict[str, int]:
+        """Stage the writes that bring a gig's stored match results in line with ``rows``.
+
+        Rows are matched on talent_id: only rows whose values differ are updated,
+        talents no longer matched are deleted and new ones inserted, so unchanged
+        rows keep their id and created_at. Nothing is committed. Returns the
+        added/changed/unchanged/removed counts.
+        """
+        existing = {}
+        stale_ids = []
+        for row in db.query(MatchResult).filter(MatchResult.gig_id == gig_id).all():
+            if row.talent_id in existing:
+                stale_ids.append(row.id)  # duplicate left by an older run
+            else:
+                existing[row.talent_id] = row
+
+        to_insert, to_update = [], []
+        unchanged = 0
+        for match_data in rows:
+            current = existing.pop(match_data['talent_id'], None)
+            if current is None:
+                to_insert.append(match_data)
+            elif any(getattr(current, field) != value for field, value in match_data.items()):
+                to_update.append({'id': current.id, **match_data})
+            else:
+                unchanged += 1
+        stale_ids.extend(row.id for row in existing.values())
+
+        if stale_ids:
+            db.execute(delete(MatchResult).where(MatchResult.id.in_(stale_ids)))
+        if to_update:
+            db.execute(update(MatchResult), to_update)
+        if to_insert:
+            db.execute(insert(MatchResult), to_insert)
+
+        return {
+            'added': len(to_insert),
+            'changed': len(to_update),
+            'unchanged': unchanged,
+            'removed': len(stale_ids)
+        }
+
+    def sync_for_gig(self, db: Session, gig_id: str, rows: List[dict]) -> Tuple[List[MatchResult], Dict[str, int]]:
+        """Apply diff_for_gig in one transaction and return the saved rows with their counts"""
+        counts = self.diff_for_gig(db, gig_id, rows)
+        db.commit()
+        return self.get_by_gig(db, gig_id, profile="with_talent"), counts
+
+    def sync_for_gigs(self, db: Session, rows_by_gig: Dict[str, List[dict]]
+                      ) -> Tuple[Dict[str, List[MatchResult]], Dict[str, Dict[str, int]]]:
+        """Apply diff_for_gig for several gigs in a single transaction"""
+        counts = {gig_id: self.diff_for_gig(db, gig_id, rows) for gig_id, rows in rows_by_gig.items()}
+        db.commit()
+        return self.get_by_gigs(db, list(rows_by_gig), profile="with_talent"), counts
+
+
+class CRUDMatchRun:
+    def get(self, db: Session, gig_id: str) -> Optional[MatchRun]:
+        return db.query(MatchRun).filter(MatchRun.gig_id == gig_id).first()
+
+    def get_all(self, db: Session) -> List[MatchRun]:
+        return db.query(MatchRun).all()
+
+    def stage(self, db: Session, gig_id: str, engine: str, match_limit: int, require_skill_overlap: bool) -> None:
+        """Record a gig's run parameters and engine; committed with the run's results"""
+        db.merge(MatchRun(gig_id=gig_id, engine=engine, match_limit=match_limit,
+                          require_skill_overlap=require_skill_overlap))
+
+
+class CRUDEmbedding:
+    def get_many(self, db: Session, owner_ids: List[str], model_name: str) -> List[Embedding]:
+        return db.query(Embedding).filter(
+            Embedding.owner_id.in_(owner_ids), Embedding.model_name == model_name
+        ).all()
+
+    def replace_many(self, db: Session, rows: List[dict]) -> None:
+        """Store embeddings, dropping each owner's rows for older content under the same model"""
+        owners_by_model = {}
+        for row in rows:
+            owners_by_model.setdefault(row['model_name'], []).append(row['owner_id'])
+        for model_name, owner_ids in owners_by_model.items():
+            db.query(Embedding).filter(
+                Embedding.owner_id.in_(owner_ids), Embedding.model_name == model_name
+            ).delete(synchronize_session=False)
+        if rows:
+            db.execute(insert(Embedding), rows)
+        db.commit()
+
+    def delete_by_owners(self, db: Session, owner_ids: List[str]) -> None:
+        """Stage the deletion of the owners' embeddings under every model; nothing is committed"""
+        if owner_ids:
+            db.query(Embedding).filter(Embedding.owner_id.in_(owner_ids)).delete(synchronize_session=False)
+
 
 class CRUDMatchFeedback:
     def create(self, db: Session, obj_in: MatchFeedbackCreate) -> MatchFeedback:
@@ -351,5 +643,7 @@ talent = CRUDTalent()
 portfolio_item = CRUDPortfolioItem()
 gig = CRUDGig()
 match_result = CRUDMatchResult()
+match_run = CRUDMatchRun()
+embedding = CRUDEmbedding()
 match_feedback = CRUDMatchFeedback()
 stats = CRUDStats()
@@ -2,8 +2,14 @@ from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, Base, SessionLocal, create_missing_indexes
+from app.core.fulltext import setup_fulltext
+from app.core.pagination import NEXT_CURSOR_HEADER
 from app.api import clients, talents, skills, gigs, matching, analytics
+from app.services.feature_store import talent_store, gig_store
+from app.services.parallel import scoring_pool
+from app.services.ann_index import portfolio_index
+from app.services.matchmaking import ai_engine
 import logging
 
 # Configure logging
@@ -12,6 +18,8 @@ logger = logging.getLogger(__name__)
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+create_missing_indexes(engine)
+setup_fulltext(engine)
 
 # Create FastAPI app
 app = FastAPI(
@@ -65,6 +73,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -151,12 +160,32 @@ async def startup_event():
     logger.info(f"Starting {settings.project_name} v{settings.version}")
     logger.info(f"Environment: {settings.environment}")
     logger.info(f"Database: {settings.database_url}")
+    
+    if settings.talent_feature_store:
+        db = SessionLocal()
+        try:
+            talent_store.build(db)
+        finally:
+            db.close()
+    
+    if settings.gig_feature_store:
+        db = SessionLocal()
+        try:
+            gig_store.build(db)
+        finally:
+            db.close()
+    
+    if settings.ai_model_preload:
+        ai_engine.start_loading()
 
 
 # Add shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info(f"Shutting down {settings.project_name}")
+    scoring_pool.shutdown()
+    if portfolio_index.is_loaded and portfolio_index.dirty:
+        portfolio_index.save()
 
 
 if __name__ == "__main__":
@@ -5,6 +5,8 @@ from .models import (
     PortfolioItem,
     Gig,
     MatchResult,
+    MatchRun,
+    Embedding,
     MatchFeedback,
     talent_skills,
     gig_skills
@@ -17,6 +19,8 @@ __all__ = [
     "PortfolioItem",
     "Gig",
     "MatchResult",
+    "MatchRun",
+    "Embedding",
     "MatchFeedback",
     "talent_skills",
     "gig_skills"
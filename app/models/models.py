@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Table, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -26,6 +26,9 @@ gig_skills = Table(
 
 class Client(Base):
     __tablename__ = "clients"
+    __table_args__ = (
+        Index("ix_clients_created_at_id", "created_at", "id"),  # keyset pagination order
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
@@ -43,6 +46,9 @@ class Client(Base):
 
 class Talent(Base):
     __tablename__ = "talents"
+    __table_args__ = (
+        Index("ix_talents_created_at_id", "created_at", "id"),  # keyset pagination order
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
@@ -69,13 +75,16 @@ class Talent(Base):
     
     # Relationships
     skills = relationship("Skill", secondary=talent_skills, back_populates="talents")
-    portfolio_items = relationship("PortfolioItem", back_populates="talent")
-    match_results = relationship("MatchResult", back_populates="talent")
+    portfolio_items = relationship("PortfolioItem", back_populates="talent", cascade="all, delete-orphan")
+    match_results = relationship("MatchResult", back_populates="talent", cascade="all, delete-orphan")
     match_feedback = relationship("MatchFeedback", back_populates="talent")
 
 
 class Skill(Base):
     __tablename__ = "skills"
+    __table_args__ = (
+        Index("ix_skills_created_at_id", "created_at", "id"),  # keyset pagination order
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, unique=True, nullable=False)
@@ -110,6 +119,9 @@ class PortfolioItem(Base):
 
 class Gig(Base):
     __tablename__ = "gigs"
+    __table_args__ = (
+        Index("ix_gigs_created_at_id", "created_at", "id"),  # keyset pagination order
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     client_id = Column(String, ForeignKey("clients.id"), nullable=False)
@@ -134,7 +146,8 @@ class Gig(Base):
     # Relationships
     client = relationship("Client", back_populates="gigs")
     required_skills = relationship("Skill", secondary=gig_skills, back_populates="gigs")
-    match_results = relationship("MatchResult", back_populates="gig")
+    match_results = relationship("MatchResult", back_populates="gig", cascade="all, delete-orphan")
+    match_run = relationship("MatchRun", uselist=False, cascade="all, delete-orphan")
 
 
 class MatchResult(Base):
@@ -164,6 +177,30 @@ class MatchResult(Base):
     talent = relationship("Talent", back_populates="match_results")
 
 
+class MatchRun(Base):
+    """Parameters of the last stored match run of a gig, so it can be maintained incrementally"""
+    __tablename__ = "match_runs"
+    
+    gig_id = Column(String, ForeignKey("gigs.id", ondelete="CASCADE"), primary_key=True)
+    engine = Column(String, nullable=False, default="MatchmakingEngine")  # class name of the engine that ran it
+    match_limit = Column(Integer, nullable=False)
+    require_skill_overlap = Column(Boolean, default=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class Embedding(Base):
+    """Text embedding of a portfolio item or gig description, keyed by row, content and model"""
+    __tablename__ = "embeddings"
+    
+    owner_id = Column(String, primary_key=True)
+    content_hash = Column(String, primary_key=True)  # sha256 of the embedded text
+    model_name = Column(String, primary_key=True)
+    owner_type = Column(String, nullable=False)  # portfolio_item, gig
+    dimensions = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)  # L2-normalized float32
+    created_at = Column(DateTime, server_default=func.now())
+
+
 class MatchFeedback(Base):
     __tablename__ = "match_feedback"
     
@@ -238,6 +238,25 @@ class MatchRequest(BaseModel):
     gig_id: str
     limit: int = Field(default=10, ge=1, le=50)
     use_ai: bool = False
+    require_skill_overlap: bool = False  # only consider talents sharing a required skill or category
+
+
+class MatchStats(BaseModel):
+    candidates_considered: int = 0
+    pruned_candidates: int = 0  # skipped by upper-bound pruning before costly components ran
+    rows_added: int = 0
+    rows_changed: int = 0
+    rows_unchanged: int = 0
+    rows_removed: int = 0
+    cache_hit: bool = False  # served from stored results without scoring or writes
+    # Retrieve-then-rerank (AI matching): talents scored by the rule-based
+    # first stage, talents added by the portfolio ANN index, talents
+    # reranked semantically, and time spent in each stage
+    retrieve_candidates: int = 0
+    semantic_candidates: int = 0
+    rerank_candidates: int = 0
+    retrieve_time_ms: float = 0.0
+    rerank_time_ms: float = 0.0
 
 
 class MatchResponse(BaseModel):
@@ -246,6 +265,55 @@ class MatchResponse(BaseModel):
     total_matches: int
     algorithm_used: str
     processing_time_ms: float
+    stats: MatchStats = Field(default_factory=MatchStats)
+
+
+class BatchMatchRequest(BaseModel):
+    gig_ids: Optional[List[str]] = None  # all open gigs when omitted
+    limit: int = Field(default=10, ge=1, le=50)
+    use_ai: bool = False
+    require_skill_overlap: bool = False
+
+
+class GigMatchResult(BaseModel):
+    gig_id: str
+    matches: List[MatchResultResponse]
+    total_matches: int
+    processing_time_ms: float  # scoring time for this gig; persistence is shared by the batch
+    stats: MatchStats = Field(default_factory=MatchStats)
+
+
+class BatchMatchResponse(BaseModel):
+    results: List[GigMatchResult]
+    total_gigs: int
+    algorithm_used: str
+    processing_time_ms: float
+
+
+class TalentGigMatchResponse(BaseModel):
+    gig: GigResponse
+    match_score: float
+    ranking: int
+    score_breakdown: MatchScoreBreakdown
+    match_explanation: str
+
+
+class ReverseMatchResponse(BaseModel):
+    talent_id: str
+    matches: List[TalentGigMatchResponse]
+    total_matches: int
+    processing_time_ms: float
+    stats: MatchStats = Field(default_factory=MatchStats)
+
+
+class MatchCacheStats(BaseModel):
+    size: int
+    max_size: int
+    pool_version: int
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
 
 
 class MatchFeedbackCreate(BaseModel):
@@ -281,6 +349,13 @@ class TalentSearchFilter(BaseModel):
     availability_status: Optional[AvailabilityStatus] = None
     skills: Optional[List[str]] = None
     min_rating: Optional[float] = None
+    # Radius search: center by coordinates or by a place name ("near"), results nearest first
+    near: Optional[str] = None
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
+    radius_km: Optional[float] = Field(default=None, gt=0)
+    # Full-text search over name, bio and portfolio; every word must match, best match first
+    text: Optional[str] = None
 
 
 class GigSearchFilter(BaseModel):
@@ -291,6 +366,8 @@ class GigSearchFilter(BaseModel):
     max_budget: Optional[float] = None
     status: Optional[GigStatus] = None
     client_id: Optional[str] = None
+    # Full-text search over title, description, style preferences and deliverables, best match first
+    text: Optional[str] = None
 
 
 class StatsResponse(BaseModel):
@@ -0,0 +1,383 @@
+import os
+import threading
+from itertools import chain
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import PortfolioItem
+from app.crud.crud import portfolio_item, talent
+from app.services.embeddings import content_hash, embedding_store, quantize, quantized_dot
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Items embedded per batch when building from the database
+BUILD_BATCH_SIZE = 1024
+
+# Vectors sampled to train the centroids, per list
+TRAINING_SAMPLE_PER_LIST = 256
+
+
+def train_centroids(vectors: np.ndarray, lists: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means: ``lists`` unit centroids of normalized ``vectors``"""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > lists * TRAINING_SAMPLE_PER_LIST:
+        vectors = vectors[rng.choice(len(vectors), lists * TRAINING_SAMPLE_PER_LIST, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # A list that lost all its vectors keeps its previous centroid
+        centroids = np.where(norms > 0, sums / np.where(norms == 0, 1.0, norms), centroids)
+    return centroids.astype(np.float32)
+
+
+class IVFFlatIndex:
+    """
+    Approximate nearest-neighbour index over normalized vectors (IVF-flat).
+
+    Vectors are partitioned into lists by their nearest k-means centroid. A
+    query ranks the centroids and scores exactly only the vectors of the
+    ``probes`` closest lists, so its cost is about probes / lists of a brute
+    force scan. Every vector belongs to an owner (for portfolio items, the
+    talent); ``nearest_owners`` returns the owners of the closest vectors.
+
+    Inserts go to the list of the nearest existing centroid and deletes free
+    the vector's slot for reuse; centroids are only retrained by ``build``.
+    Each vector may carry a version string (e.g. a hash of the embedded
+    text) so a loaded index can be checked against its source.
+    Vectors are held in ``precision`` (see embeddings.quantize); centroids
+    stay float32. The index is persisted to ``path`` as a single .npz file.
+    """
+
+    def __init__(self, path: Optional[str] = None, lists: int = 0, probes: int = 8, precision: str = 'float32'):
+        self.path = path
+        self.lists = lists
+        self.probes = probes
+        self.precision = precision
+        self.model_name: Optional[str] = None
+        self.is_loaded = False
+        self.dirty = False
+        self._lock = threading.RLock()
+        self._clear(0)
+
+    def _clear(self, dimensions: int) -> None:
+        self.centroids = np.zeros((0, dimensions), dtype=np.float32)
+        self._vectors, self._scales = quantize(np.zeros((0, dimensions)), self.precision)
+        self._list_of = np.zeros(0, dtype=np.int64)  # list of each slot, -1 when free
+        self._ids: List[str] = []
+        self._owners: List[str] = []
+        self._versions: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._members: List[Dict[int, None]] = []  # slots of each list, in insertion order
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def build(self, ids: Sequence[str], owners: Sequence[str], vectors: np.ndarray,
+              model_name: Optional[str] = None, versions: Optional[Sequence[str]] = None) -> None:
+        """Replace the index contents and retrain the centroids"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            self._clear(vectors.shape[1] if vectors.ndim == 2 else 0)
+            self.model_name = model_name
+            if len(ids):
+                lists = self.lists or int(round(np.sqrt(len(ids))))
+                self.centroids = train_centroids(vectors, max(1, min(lists, len(ids))))
+                self._members = [{} for _ in range(len(self.centroids))]
+                self._vectors, self._scales = quantize(vectors.copy(), self.precision)
+                self._list_of = np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int64)
+                self._ids = list(ids)
+                self._owners = list(owners)
+                self._versions = list(versions) if versions is not None else [""] * len(self._ids)
+                self._slots = {item_id: slot for slot, item_id in enumerate(self._ids)}
+                for slot, list_no in enumerate(self._list_of):
+                    self._members[list_no][slot] = None
+            self.is_loaded = True
+            self.dirty = True
+
+    def add(self, item_id: str, owner: str, vector: np.ndarray, version: str = "") -> None:
+        """Insert or replace one vector"""
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self.remove(item_id)
+            if not len(self.centroids):
+                # First vector of an empty index seeds its only list
+                self._clear(vector.shape[0])
+                self.centroids = vector[None, :].copy()
+                self._members = [{}]
+
+            list_no = int(np.argmax(self.centroids @ vector))
+            if self._free:
+                slot = self._free.pop()
+                self._ids[slot] = item_id
+                self._owners[slot] = owner
+                self._versions[slot] = version
+            else:
+                slot = len(self._ids)
+                if slot == len(self._vectors):
+                    self._grow(max(16, 2 * slot))
+                self._ids.append(item_id)
+                self._owners.append(owner)
+                self._versions.append(version)
+            self._vectors[slot], scale = quantize(vector, self.precision)
+            if self._scales is not None:
+                self._scales[slot] = scale
+            self._list_of[slot] = list_no
+            self._members[list_no][slot] = None
+            self._slots[item_id] = slot
+            self.dirty = True
+
+    def _grow(self, capacity: int) -> None:
+        vectors, scales = quantize(np.zeros((capacity, self.centroids.shape[1])), self.precision)
+        vectors[:len(self._vectors)] = self._vectors
+        if scales is not None:
+            scales[:len(self._scales)] = self._scales
+            self._scales = scales
+        list_of = np.full(capacity, -1, dtype=np.int64)
+        list_of[:len(self._list_of)] = self._list_of
+        self._vectors, self._list_of = vectors, list_of
+
+    def remove(self, item_id: str) -> None:
+        with self._lock:
+            slot = self._slots.pop(item_id, None)
+            if slot is None:
+                return
+            del self._members[self._list_of[slot]][slot]
+            self._list_of[slot] = -1
+            self._ids[slot] = self._owners[slot] = self._versions[slot] = ""
+            self._free.append(slot)
+            self.dirty = True
+
+    def entries(self) -> Dict[str, Tuple[str, str]]:
+        """(owner, version) of every indexed id"""
+        with self._lock:
+            return {item_id: (self._owners[slot], self._versions[slot]) for item_id, slot in self._slots.items()}
+
+    def remove_owner(self, owner: str) -> None:
+        with self._lock:
+            for item_id in [self._ids[slot] for slot in self._slots.values() if self._owners[slot] == owner]:
+                self.remove(item_id)
+
+    def _probe(self, vector: np.ndarray, probes: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Slots of the ``probes`` lists closest to ``vector`` and their similarities"""
+        if not len(self._slots):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        centroid_scores = self.centroids @ vector
+        probes = min(probes or self.probes, len(centroid_scores))
+        lists = np.argpartition(-centroid_scores, probes - 1)[:probes]
+        slots = np.fromiter(chain.from_iterable(self._members[i] for i in lists), dtype=np.int64)
+        scales = None if self._scales is None else self._scales[slots]
+        return slots, quantized_dot(self._vectors[slots], scales, vector)
+
+    def search(self, vector: np.ndarray, k: int, probes: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Approximate ``k`` most similar vectors as (id, similarity), best first"""
+        with self._lock:
+            slots, scores = self._probe(np.asarray(vector, dtype=np.float32), probes)
+            order = np.argsort(-scores, kind='stable')[:k]
+            return [(self._ids[slots[i]], float(scores[i])) for i in order]
+
+    def nearest_owners(self, vector: np.ndarray, n: int, probes: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Approximate ``n`` owners with the most similar vectors as (owner, best similarity), best first"""
+        with self._lock:
+            slots, scores = self._probe(np.asarray(vector, dtype=np.float32), probes)
+            owners, seen = [], set()
+            for i in np.argsort(-scores, kind='stable'):
+                owner = self._owners[slots[i]]
+                if owner not in seen:
+                    seen.add(owner)
+                    owners.append((owner, float(scores[i])))
+                    if len(owners) == n:
+                        break
+            return owners
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        with self._lock:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            size = len(self._ids)
+            tmp_path = f"{path}.tmp.npz"
+            np.savez(
+                tmp_path,
+                precision=np.array(self.precision),
+                centroids=self.centroids,
+                vectors=self._vectors[:size],
+                scales=self._scales[:size] if self._scales is not None else np.zeros(0, dtype=np.float32),
+                list_of=self._list_of[:size],
+                ids=np.array(self._ids, dtype=str),
+                owners=np.array(self._owners, dtype=str),
+                versions=np.array(self._versions, dtype=str),
+                model_name=np.array(self.model_name or ""),
+            )
+            os.replace(tmp_path, path)
+            self.dirty = False
+
+    def load(self, path: Optional[str] = None, model_name: Optional[str] = None) -> bool:
+        """Load a saved index; False when the file is missing or has another model or precision"""
+        path = path or self.path
+        if not path or not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            if model_name is not None and str(data['model_name']) != model_name:
+                return False
+            if str(data['precision']) != self.precision:
+                return False
+            with self._lock:
+                self._clear(data['centroids'].shape[1])
+                self.model_name = str(data['model_name']) or None
+                self.centroids = data['centroids']
+                self._vectors = data['vectors']
+                self._scales = data['scales'] if self.precision == 'int8' else None
+                self._list_of = data['list_of']
+                self._ids = data['ids'].tolist()
+                self._owners = data['owners'].tolist()
+                # Files saved before versions were kept read as unknown versions
+                self._versions = data['versions'].tolist() if 'versions' in data else [""] * len(self._ids)
+                self._members = [{} for _ in range(len(self.centroids))]
+                for slot, list_no in enumerate(self._list_of):
+                    if list_no < 0:
+                        self._free.append(slot)
+                    else:
+                        self._members[list_no][slot] = None
+                        self._slots[self._ids[slot]] = slot
+                self.is_loaded = True
+                self.dirty = False
+        return True
+
+
+class PortfolioIndex(IVFFlatIndex):
+    """
+    IVF-flat index over portfolio item embeddings, owned by talent.
+
+    Loaded from disk when the saved file matches the configured embedding
+    model, otherwise built from every portfolio item through the embedding
+    store. The file is only saved at build time and at shutdown, so a loaded
+    index is first synced with the portfolio_items table: every vector is
+    versioned by the hash of the description it embeds, and items written
+    since the save (by another worker, or before a crash) are re-embedded,
+    added or removed. Portfolio item and talent write listeners keep it
+    current once loaded; deletes committed while it loads are applied again
+    once loading finishes, since the rows it read may predate them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._build_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: Optional[List[Tuple[Callable[[str], None], str]]] = None  # removals seen while loading
+
+    def load_or_build(self, db: Optional[Session] = None) -> None:
+        """Load or build the index once; concurrent callers wait for the first"""
+        if not embedding_store.model_name:
+            return
+        with self._build_lock:
+            if self.is_loaded:
+                return
+            with self._pending_lock:
+                self._pending = []
+            own_session = db is None
+            if own_session:
+                db = SessionLocal()
+            try:
+                if self.load(model_name=embedding_store.model_name):
+                    counts = self.sync(db)
+                    logger.info(f"Portfolio ANN index loaded {len(self)} items from {self.path}, synced: {counts}")
+                else:
+                    self._build(db)
+            finally:
+                if own_session:
+                    db.close()
+                with self._pending_lock:
+                    pending, self._pending = self._pending, None
+                for remove, key in pending:
+                    remove(key)
+            if self.dirty:
+                self.save()
+
+    def _build(self, db: Session) -> None:
+        ids, owners, vectors, versions = [], [], [], []
+        offset = 0
+        while True:
+            rows = db.query(PortfolioItem.id, PortfolioItem.talent_id, PortfolioItem.description) \
+                .order_by(PortfolioItem.id).offset(offset).limit(BUILD_BATCH_SIZE).all()
+            if not rows:
+                break
+            embedded = embedding_store.vectors(db, "portfolio_item", [(r.id, r.description) for r in rows])
+            for r in rows:
+                if r.id in embedded:
+                    ids.append(r.id)
+                    owners.append(r.talent_id)
+                    vectors.append(embedded[r.id])
+                    versions.append(content_hash(r.description))
+            offset += len(rows)
+
+        self.build(ids, owners, np.array(vectors, dtype=np.float32).reshape(len(ids), -1),
+                   embedding_store.model_name, versions)
+        logger.info(f"Portfolio ANN index built over {len(ids)} items")
+
+    def sync(self, db: Session) -> Dict[str, int]:
+        """Add, re-embed or remove the items whose owner or description differ from the table"""
+        indexed = self.entries()
+        stale, seen = [], set()
+        for r in db.query(PortfolioItem.id, PortfolioItem.talent_id, PortfolioItem.description) \
+                .yield_per(BUILD_BATCH_SIZE):
+            if not r.description:
+                continue  # never embedded; dropped below if indexed
+            seen.add(r.id)
+            if indexed.get(r.id) != (r.talent_id, content_hash(r.description)):
+                stale.append(r)
+
+        counts = {'removed': 0, 'updated': 0}
+        for item_id in indexed.keys() - seen:
+            self.remove(item_id)
+            counts['removed'] += 1
+        for start in range(0, len(stale), BUILD_BATCH_SIZE):
+            rows = stale[start:start + BUILD_BATCH_SIZE]
+            embedded = embedding_store.vectors(db, "portfolio_item", [(r.id, r.description) for r in rows])
+            for r in rows:
+                if r.id in embedded:
+                    self.add(r.id, r.talent_id, embedded[r.id], content_hash(r.description))
+                    counts['updated'] += 1
+                else:
+                    self.remove(r.id)
+                    counts['removed'] += 1
+        return counts
+
+    def _apply_removal(self, remove: Callable[[str], None], key: str) -> None:
+        """Remove from the live index, and again after a load in progress"""
+        with self._pending_lock:
+            if self._pending is not None:
+                self._pending.append((remove, key))
+        remove(key)
+
+    def on_portfolio_item_write(self, event: str, item) -> None:
+        if event == "deleted":
+            self._apply_removal(self.remove, item.id)
+            return
+        if not self.is_loaded:
+            return
+        vector = embedding_store.vector(None, "portfolio_item", item.id, item.description)
+        if vector is not None:
+            self.add(item.id, item.talent_id, vector, content_hash(item.description))
+        else:
+            self.remove(item.id)
+
+    def on_talent_write(self, event: str, talent_obj) -> None:
+        # Deleting a talent cascades to its portfolio items without item events
+        if event == "deleted":
+            self._apply_removal(self.remove_owner, talent_obj.id)
+
+
+# Create instance
+portfolio_index = PortfolioIndex(
+    settings.ann_index_path, settings.ann_lists, settings.ann_probes, settings.embedding_precision
+)
+portfolio_item.add_listener(portfolio_index.on_portfolio_item_write)
+talent.add_listener(portfolio_index.on_talent_write)
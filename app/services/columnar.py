@@ -0,0 +1,236 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence
+from app.services.skill_index import SkillIndex
+from app.services.gig_index import GigIndex
+from app.services.gazetteer import place_of
+from app.services.term_index import PortfolioTermIndex
+
+
+# Availability status codes used by the columnar representation
+AVAILABLE, BUSY, UNAVAILABLE, OTHER = 0, 1, 2, 3
+AVAILABILITY_CODES = {'available': AVAILABLE, 'busy': BUSY, 'unavailable': UNAVAILABLE}
+
+# Only the first few portfolio items of a talent contribute to the portfolio score
+MAX_PORTFOLIO_ITEMS = 5
+
+# TalentColumns arrays with one entry per talent row
+TALENT_ROW_ARRAYS = (
+    'hourly_rate', 'daily_rate', 'project_rate_min', 'project_rate_max', 'experience_years',
+    'rating', 'success_rate', 'availability', 'city_code', 'region_code', 'country_code',
+    'latitude', 'longitude', 'index_rows', 'has_skills', 'portfolio_count'
+)
+
+
+def _float_or_nan(value) -> float:
+    return float(value) if value is not None else np.nan
+
+
+def _intern(vocab: Dict[str, int], key: str) -> int:
+    code = vocab.get(key)
+    if code is None:
+        code = vocab[key] = len(vocab)
+    return code
+
+
+def top_k_rows(scores: np.ndarray, eligible: np.ndarray, k: int) -> np.ndarray:
+    """
+    Rows of the ``k`` highest eligible scores, best first.
+
+    Equal scores keep row order, exactly like a stable descending sort of the
+    whole pool, but selection runs in O(n) with argpartition and only the
+    survivors are sorted.
+    """
+    rows = np.flatnonzero(eligible)
+    if len(rows) > k:
+        candidate_scores = scores[rows]
+        kth_score = candidate_scores[np.argpartition(-candidate_scores, k - 1)[k - 1]]
+        above = rows[candidate_scores > kth_score]
+        tied = rows[candidate_scores == kth_score][:k - len(above)]
+        rows = np.concatenate([above, tied])
+        rows.sort()
+    return rows[np.argsort(-scores[rows], kind='stable')]
+
+
+class TalentColumns:
+    """
+    Column-oriented snapshot of a talent pool.
+
+    Every scoring input of MatchmakingEngine is held as a NumPy array with one
+    row per talent, so a gig can be scored against the whole pool with a few
+    array operations instead of one Python call per talent. Nullable numeric
+    attributes are stored as NaN; strings are interned into integer codes and
+    locations are held as gazetteer codes.
+    Skills are looked up through a SkillIndex; ``index_rows`` maps each row to
+    its bit position in that index. Portfolio terms are looked up through a
+    PortfolioTermIndex; ``item_positions`` maps each flattened portfolio item
+    to its position in that index.
+    """
+
+    def __init__(self, talents: Sequence, skill_index: Optional[SkillIndex] = None,
+                 term_index: Optional[PortfolioTermIndex] = None):
+        n = len(talents)
+        self.size = n
+        self.talents = talents
+        self.ids: List[str] = [t.id for t in talents]
+        self._row_of: Optional[Dict[str, int]] = None
+
+        # Rates and profile attributes
+        self.hourly_rate = np.array([_float_or_nan(t.hourly_rate) for t in talents], dtype=np.float64)
+        self.daily_rate = np.array([_float_or_nan(t.daily_rate) for t in talents], dtype=np.float64)
+        self.project_rate_min = np.array([_float_or_nan(t.project_rate_min) for t in talents], dtype=np.float64)
+        self.project_rate_max = np.array([_float_or_nan(t.project_rate_max) for t in talents], dtype=np.float64)
+        self.experience_years = np.array([t.experience_years or 0 for t in talents], dtype=np.int64)
+        self.rating = np.array([t.rating or 0.0 for t in talents], dtype=np.float64)
+        self.success_rate = np.array([t.success_rate or 0.0 for t in talents], dtype=np.float64)
+        self.availability = np.array(
+            [AVAILABILITY_CODES.get(t.availability_status, OTHER) for t in talents],
+            dtype=np.int8
+        )
+
+        # Locations as resolved gazetteer codes (0 when unresolved) and coordinates
+        places = [place_of(t) for t in talents]
+        self.city_code = np.array([p.city_code for p in places], dtype=np.int32)
+        self.region_code = np.array([p.region_code for p in places], dtype=np.int32)
+        self.country_code = np.array([p.country_code for p in places], dtype=np.int32)
+        self.latitude = np.array([p.latitude for p in places], dtype=np.float64)
+        self.longitude = np.array([p.longitude for p in places], dtype=np.float64)
+
+        # Skills
+        if skill_index is None:
+            skill_index = SkillIndex.from_talents(talents)
+        self.skill_index = skill_index
+        self.index_rows = np.array([skill_index.position(t.id) for t in talents], dtype=np.int64)
+        self.has_skills = np.array([bool(t.skills) for t in talents], dtype=bool)
+
+        # Portfolio items, flattened: one entry per scored item, with its position in the term index
+        self.item_ids: List[str] = []
+        self.item_descriptions: List[Optional[str]] = []
+        item_talent = []
+        portfolio_count = np.zeros(n, dtype=np.int64)
+        for row, t in enumerate(talents):
+            items = t.portfolio_items[:MAX_PORTFOLIO_ITEMS]
+            portfolio_count[row] = len(items)
+            for item in items:
+                item_talent.append(row)
+                self.item_ids.append(item.id)
+                self.item_descriptions.append(item.description)
+        if term_index is None:
+            term_index = PortfolioTermIndex.from_items(item for t in talents for item in t.portfolio_items[:MAX_PORTFOLIO_ITEMS])
+        self.term_index = term_index
+        self.portfolio_count = portfolio_count
+        self.item_talent = np.array(item_talent, dtype=np.int64)
+        self.item_positions = np.array([term_index.position(item_id) for item_id in self.item_ids], dtype=np.int64)
+
+    @classmethod
+    def from_talents(cls, talents: Sequence, skill_index: Optional[SkillIndex] = None,
+                     term_index: Optional[PortfolioTermIndex] = None) -> "TalentColumns":
+        return cls(list(talents), skill_index, term_index)
+
+    def shard(self, start: int, stop: int) -> "TalentColumns":
+        """
+        Rows ``[start, stop)`` as a TalentColumns of their own.
+
+        Arrays are slices (views) of this snapshot's arrays; the skill and
+        term indexes are shared; flattened portfolio items are sliced to the
+        shard's rows and their indices rebased.
+        """
+        shard = TalentColumns.__new__(TalentColumns)
+        shard.__dict__.update(self.__dict__)
+        shard.size = stop - start
+        shard.talents = self.talents[start:stop]
+        shard.ids = self.ids[start:stop]
+        shard._row_of = None
+        for name in TALENT_ROW_ARRAYS:
+            setattr(shard, name, getattr(self, name)[start:stop])
+
+        # Items are flattened in row order
+        item_start, item_stop = np.searchsorted(self.item_talent, [start, stop])
+        shard.item_talent = self.item_talent[item_start:item_stop] - start
+        shard.item_positions = self.item_positions[item_start:item_stop]
+        shard.item_ids = self.item_ids[item_start:item_stop]
+        shard.item_descriptions = self.item_descriptions[item_start:item_stop]
+        return shard
+
+    def rows_of(self, ids: Iterable[str]) -> np.ndarray:
+        """Rows of the given talent ids, in order; ids not in the snapshot are skipped"""
+        if self._row_of is None:
+            self._row_of = {talent_id: row for row, talent_id in enumerate(self.ids)}
+        return np.array([self._row_of[i] for i in ids if i in self._row_of], dtype=np.int64)
+
+    def portfolio_hits(self, gig) -> Dict[str, np.ndarray]:
+        """Per portfolio field, a mask over the flattened items matching the gig, read off the term index"""
+        return {field: mask[self.item_positions] for field, mask in self.term_index.hit_masks(gig).items()}
+
+    def row_mask(self, bitset: int) -> np.ndarray:
+        """Boolean row mask for a bitset over skill index positions"""
+        return self.skill_index.count_bits([bitset])[self.index_rows] > 0
+
+
+class GigColumns:
+    """
+    Column-oriented snapshot of the open gigs, the gig-side counterpart of
+    TalentColumns used to score one talent against every gig at once.
+
+    Rows are GigIndex positions, so the index bitsets expand directly into
+    row masks; positions freed by removed gigs are inactive rows.
+    """
+
+    def __init__(self, gigs: Sequence, gig_index: Optional[GigIndex] = None):
+        if gig_index is None:
+            gig_index = GigIndex.from_gigs(gigs)
+        n = gig_index.size
+        self.size = n
+        self.gig_index = gig_index
+        self.gigs: List = [None] * n
+        self.active = np.zeros(n, dtype=bool)
+
+        self.budget_max = np.full(n, np.nan)
+        self.budget_avg = np.full(n, np.nan)  # NaN when the gig has no usable budget
+        self.duration_days = np.zeros(n, dtype=np.int64)
+        self.is_remote = np.zeros(n, dtype=bool)
+        self.required_skill_count = np.zeros(n, dtype=np.int64)
+        self.required_category_count = np.zeros(n, dtype=np.int64)
+
+        # Locations as resolved gazetteer codes; has_location is False when none is given
+        self.has_location = np.zeros(n, dtype=bool)
+        self.city_code = np.zeros(n, dtype=np.int32)
+        self.region_code = np.zeros(n, dtype=np.int32)
+        self.country_code = np.zeros(n, dtype=np.int32)
+        self.latitude = np.full(n, np.nan)
+        self.longitude = np.full(n, np.nan)
+
+        # Strings are interned; scoring maps each distinct value once
+        self.experience_vocab: Dict[str, int] = {}
+        self.experience_code = np.full(n, -1, dtype=np.int32)  # -1 when no requirement
+        self.priority_vocab: Dict[str, int] = {}
+        self.priority_code = np.zeros(n, dtype=np.int32)
+
+        for g in gigs:
+            row = gig_index.position(g.id)
+            self.gigs[row] = g
+            self.active[row] = True
+            self.budget_max[row] = _float_or_nan(g.budget_max)
+            if g.budget_min and g.budget_max:
+                self.budget_avg[row] = (g.budget_min + g.budget_max) / 2
+            self.duration_days[row] = g.duration_days or 0
+            self.is_remote[row] = bool(g.is_remote)
+            self.required_skill_count[row] = len({s.name.lower() for s in g.required_skills})
+            self.required_category_count[row] = len({s.category.lower() for s in g.required_skills})
+            place = place_of(g)
+            self.has_location[row] = bool(g.location)
+            self.city_code[row] = place.city_code
+            self.region_code[row] = place.region_code
+            self.country_code[row] = place.country_code
+            self.latitude[row] = place.latitude
+            self.longitude[row] = place.longitude
+            if g.experience_required:
+                self.experience_code[row] = _intern(self.experience_vocab, g.experience_required)
+            self.priority_code[row] = _intern(self.priority_vocab, g.priority)
+
+    @classmethod
+    def from_gigs(cls, gigs: Sequence, gig_index: Optional[GigIndex] = None) -> "GigColumns":
+        return cls(list(gigs), gig_index)
+
+    def row_mask(self, bitset: int) -> np.ndarray:
+        """Boolean row mask for a bitset over gig index positions"""
+        return self.gig_index.to_mask(bitset)
@@ -0,0 +1,205 @@
+import hashlib
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.crud.crud import embedding, gig, portfolio_item, talent
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# In-memory embedding formats; the embeddings table always holds float32
+PRECISIONS = ('float32', 'float16', 'int8')
+
+# Rows converted to float32 at a time when scoring a quantized matrix
+DOT_CHUNK_ROWS = 16384
+
+
+def quantize(vectors: np.ndarray, precision: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Vectors (last axis) in ``precision``, with the per-vector scale that restores them.
+
+    int8 maps each vector's largest absolute component to 127, so it keeps
+    about two significant digits per component at a quarter of the memory;
+    the float formats need no scale (None).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if precision == 'int8':
+        scale = np.abs(vectors).max(axis=-1, initial=0.0) / 127.0
+        scale = np.where(scale == 0, 1.0, scale).astype(np.float32)
+        return np.round(vectors / scale[..., None]).astype(np.int8), scale
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown embedding precision: {precision}")
+    return vectors.astype(precision, copy=False), None
+
+
+def dequantize(data: np.ndarray, scale: Optional[np.ndarray]) -> np.ndarray:
+    if scale is None:
+        return data.astype(np.float32, copy=False)
+    return data.astype(np.float32) * scale[..., None]
+
+
+def quantized_dot(data: np.ndarray, scale: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+    """
+    Similarity of every row of a (possibly quantized) matrix with a float32 query.
+
+    Quantized rows are widened to float32 a chunk at a time, so the BLAS
+    product runs without ever materializing a float32 copy of the matrix;
+    int8 rows are rescaled after the product.
+    """
+    if data.dtype == np.float32:
+        scores = data @ query
+    else:
+        scores = np.empty(len(data), dtype=np.float32)
+        for start in range(0, len(data), DOT_CHUNK_ROWS):
+            scores[start:start + DOT_CHUNK_ROWS] = data[start:start + DOT_CHUNK_ROWS].astype(np.float32) @ query
+    return scores if scale is None else scores * scale
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Persistent embeddings of portfolio item and gig descriptions.
+
+    Vectors are stored L2-normalized in the embeddings table, keyed by
+    (row id, content hash, model name), so cosine similarity is a single dot
+    product and a text is embedded once per model, not once per request.
+    Lookups go memory -> table -> model; newly computed vectors are
+    persisted. Writes to portfolio items and gigs embed the new text right
+    away when a model is configured; scripts/backfill_embeddings.py fills in
+    existing rows. Deleting an owner deletes its rows in the same transaction
+    (see the CRUD deletes), model or not.
+
+    Memory holds one vector per owner, for its latest text, kept in
+    ``precision`` (see quantize) and widened back to float32 when returned.
+    """
+
+    def __init__(self, precision: str = 'float32'):
+        quantize(np.zeros((0, 1)), precision)  # reject unknown precisions early
+        self.precision = precision
+        self.model_name: Optional[str] = None
+        self._encode: Optional[Callable[[List[str]], np.ndarray]] = None
+        self._vectors: Dict[str, Tuple[str, np.ndarray, Optional[np.ndarray]]] = {}  # owner -> hash, data, scale
+        self._lock = threading.Lock()
+
+    @property
+    def is_available(self) -> bool:
+        return self._encode is not None
+
+    def configure(self, model_name: str, encode: Callable[[List[str]], np.ndarray]) -> None:
+        """Use ``encode`` (texts -> one row per text) to embed texts missing from the table"""
+        with self._lock:
+            self.model_name = model_name
+            self._encode = encode
+            self._vectors = {}
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.asarray(self._encode(texts), dtype=np.float32).reshape(len(texts), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def vectors(self, db: Optional[Session], owner_type: str,
+                rows: Iterable[Tuple[str, Optional[str]]]) -> Dict[str, np.ndarray]:
+        """
+        Embeddings of ``(owner id, text)`` rows; rows without text are skipped.
+
+        With ``db`` None a session is opened only if some vector is not in memory.
+        """
+        if self.model_name is None:
+            return {}
+
+        texts = {owner_id: text for owner_id, text in rows if text}
+        hashes = {owner_id: content_hash(text) for owner_id, text in texts.items()}
+        result = {}
+        with self._lock:
+            for owner_id, digest in hashes.items():
+                stored = self._vectors.get(owner_id)
+                if stored is not None and stored[0] == digest:
+                    result[owner_id] = dequantize(*stored[1:])
+
+        missing = [owner_id for owner_id in hashes if owner_id not in result]
+        if missing:
+            own_session = db is None
+            if own_session:
+                db = SessionLocal()
+            try:
+                result.update(self._load_or_encode(db, owner_type, texts, hashes, missing))
+            finally:
+                if own_session:
+                    db.close()
+
+        # A new text replaces the owner's vector for its older text
+        with self._lock:
+            for owner_id in missing:
+                if owner_id in result:
+                    self._vectors[owner_id] = (hashes[owner_id], *quantize(result[owner_id], self.precision))
+        return result
+
+    def _load_or_encode(self, db: Session, owner_type: str, texts: Dict[str, str],
+                        hashes: Dict[str, str], missing: List[str]) -> Dict[str, np.ndarray]:
+        result = {}
+        # Stored rows count only if they were computed from the current text
+        for row in embedding.get_many(db, missing, self.model_name):
+            if hashes.get(row.owner_id) == row.content_hash:
+                result[row.owner_id] = np.frombuffer(row.vector, dtype=np.float32)
+
+        missing = [owner_id for owner_id in missing if owner_id not in result]
+        if missing and self.is_available:
+            encoded = self.encode([texts[owner_id] for owner_id in missing])
+            embedding.replace_many(db, [
+                {
+                    'owner_id': owner_id,
+                    'content_hash': hashes[owner_id],
+                    'model_name': self.model_name,
+                    'owner_type': owner_type,
+                    'dimensions': int(vector.shape[0]),
+                    'vector': vector.tobytes()
+                }
+                for owner_id, vector in zip(missing, encoded)
+            ])
+            result.update(zip(missing, encoded))
+        return result
+
+    def vector(self, db: Optional[Session], owner_type: str, owner_id: str, text: Optional[str]) -> Optional[np.ndarray]:
+        return self.vectors(db, owner_type, [(owner_id, text)]).get(owner_id)
+
+    def forget(self, owner_ids: Iterable[str]) -> None:
+        """Drop the in-memory vectors of deleted owners"""
+        with self._lock:
+            for owner_id in owner_ids:
+                self._vectors.pop(owner_id, None)
+
+    def _on_write(self, owner_type: str, event: str, owner_id: str, text: Optional[str]) -> None:
+        if event == "deleted":
+            self.forget([owner_id])
+            return
+        if not self.is_available:
+            return
+        db = SessionLocal()
+        try:
+            self.vector(db, owner_type, owner_id, text)
+        finally:
+            db.close()
+
+    def on_portfolio_item_write(self, event: str, item) -> None:
+        self._on_write("portfolio_item", event, item.id, item.description)
+
+    def on_gig_write(self, event: str, gig_obj) -> None:
+        self._on_write("gig", event, gig_obj.id, gig_obj.description)
+
+    def on_talent_write(self, event: str, talent_obj) -> None:
+        # Portfolio items deleted with their talent send no events of their own
+        if event == "deleted":
+            self.forget(item.id for item in talent_obj.portfolio_items)
+
+
+# Create instance
+embedding_store = EmbeddingStore(settings.embedding_precision)
+portfolio_item.add_listener(embedding_store.on_portfolio_item_write)
+gig.add_listener(embedding_store.on_gig_write)
+talent.add_listener(embedding_store.on_talent_write)
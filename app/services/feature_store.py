@@ -0,0 +1,314 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.models.models import Talent, Gig, PortfolioItem
+from app.crud.crud import talent, gig, portfolio_item
+from app.services.columnar import TalentColumns, GigColumns
+from app.services.skill_index import SkillIndex
+from app.services.gig_index import GigIndex
+from app.services.gazetteer import gazetteer, place_of
+from app.services.geo_index import GridIndex
+from app.services.tokens import tokens_of
+from app.services.term_index import PortfolioTermIndex
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SkillFeatures:
+    __slots__ = ('id', 'name', 'category')
+
+    def __init__(self, skill):
+        self.id = skill.id
+        self.name = skill.name
+        self.category = skill.category
+
+
+class PortfolioFeatures:
+    """Scoring-relevant attributes of a portfolio item, with its keywords and tags as token id sets"""
+    __slots__ = (
+        'id', 'talent_id', 'project_type', 'style_keywords', 'tags', 'description',
+        'style_keywords_tokens', 'tags_tokens'
+    )
+
+    def __init__(self, item: PortfolioItem):
+        self.id = item.id
+        self.talent_id = item.talent_id
+        self.project_type = item.project_type
+        self.style_keywords = item.style_keywords
+        self.tags = item.tags
+        self.description = item.description
+        self.style_keywords_tokens = tokens_of(item, 'style_keywords')
+        self.tags_tokens = tokens_of(item, 'tags')
+
+
+class TalentFeatures:
+    """
+    Scoring-relevant attributes of a talent.
+
+    Exposes the same attribute names as the Talent model, so the scalar
+    calculate_* methods and TalentColumns accept it in place of an ORM row.
+    ``place`` is the location resolved against the gazetteer when the record
+    is written. Instances are never mutated once stored; changes replace the
+    record.
+    """
+    __slots__ = (
+        'id', 'location', 'experience_years', 'hourly_rate', 'daily_rate',
+        'project_rate_min', 'project_rate_max', 'availability_status', 'rating',
+        'success_rate', 'skills', 'portfolio_items', 'place'
+    )
+
+    def __init__(self, talent_obj: Talent, portfolio_items: Optional[Tuple[PortfolioFeatures, ...]] = None):
+        self.id = talent_obj.id
+        self.location = talent_obj.location
+        self.place = gazetteer.resolve(talent_obj.location)
+        self.experience_years = talent_obj.experience_years
+        self.hourly_rate = talent_obj.hourly_rate
+        self.daily_rate = talent_obj.daily_rate
+        self.project_rate_min = talent_obj.project_rate_min
+        self.project_rate_max = talent_obj.project_rate_max
+        self.availability_status = getattr(talent_obj.availability_status, 'value', talent_obj.availability_status)
+        self.rating = talent_obj.rating
+        self.success_rate = talent_obj.success_rate
+        self.skills = tuple(SkillFeatures(s) for s in talent_obj.skills)
+        if portfolio_items is None:
+            portfolio_items = tuple(PortfolioFeatures(item) for item in talent_obj.portfolio_items)
+        self.portfolio_items = portfolio_items
+
+
+class GigFeatures:
+    """
+    Scoring-relevant attributes of a gig, with the same attribute names as the
+    Gig model plus its resolved ``place`` and its style preferences and
+    description as token id sets.
+    """
+    __slots__ = (
+        'id', 'category', 'location', 'is_remote', 'budget_min', 'budget_max',
+        'duration_days', 'style_preferences', 'description', 'experience_required',
+        'status', 'priority', 'required_skills', 'place',
+        'style_preferences_tokens', 'description_tokens'
+    )
+
+    def __init__(self, gig_obj: Gig):
+        self.id = gig_obj.id
+        self.category = gig_obj.category
+        self.location = gig_obj.location
+        self.place = gazetteer.resolve(gig_obj.location)
+        self.is_remote = gig_obj.is_remote
+        self.budget_min = gig_obj.budget_min
+        self.budget_max = gig_obj.budget_max
+        self.duration_days = gig_obj.duration_days
+        self.style_preferences = gig_obj.style_preferences
+        self.description = gig_obj.description
+        self.style_preferences_tokens = tokens_of(gig_obj, 'style_preferences')
+        self.description_tokens = tokens_of(gig_obj, 'description')
+        self.experience_required = gig_obj.experience_required
+        self.status = gig_obj.status
+        self.priority = gig_obj.priority
+        self.required_skills = tuple(SkillFeatures(s) for s in gig_obj.required_skills)
+
+
+class TalentFeatureStore:
+    """
+    Resident copy of the talent pool used for matching.
+
+    Built once from the Talent, Skill and PortfolioItem tables and kept in
+    sync through CRUD write listeners, so matching does not touch the database
+    for candidate data. ``version`` is bumped on every change; the columnar
+    snapshot is rebuilt lazily when it is stale. The inverted ``skill_index``
+    is maintained incrementally as talents' skills change, ``geo_index`` as
+    their resolved locations change and ``term_index`` as portfolio items are
+    created and deleted.
+
+    Writes made by other processes (other workers, scripts) are not seen
+    until the store is rebuilt.
+    """
+
+    def __init__(self):
+        self._talents: Dict[str, TalentFeatures] = {}
+        self.skill_index = SkillIndex()
+        self.geo_index = GridIndex(settings.geo_cell_degrees)
+        self.term_index = PortfolioTermIndex()
+        self._lock = threading.RLock()
+        self._columns: Optional[TalentColumns] = None
+        self._columns_version = -1
+        self.version = 0
+        self.is_loaded = False
+
+    def build(self, db: Session) -> None:
+        """Load every talent with its skills and portfolio items"""
+        talents = talent.query(db, profile="scoring").all()
+
+        with self._lock:
+            self._talents = {t.id: TalentFeatures(t) for t in talents}
+            self.skill_index = SkillIndex.from_talents(self._talents.values())
+            self.geo_index = GridIndex.from_points(
+                ((t.id, t.place.latitude, t.place.longitude) for t in self._talents.values()),
+                settings.geo_cell_degrees,
+            )
+            self.term_index = PortfolioTermIndex.from_items(
+                item for t in self._talents.values() for item in t.portfolio_items
+            )
+            self.is_loaded = True
+            self.version += 1
+        logger.info(f"Talent feature store loaded {len(talents)} talents")
+
+    def __len__(self) -> int:
+        return len(self._talents)
+
+    def get(self, talent_id: str) -> Optional[TalentFeatures]:
+        return self._talents.get(talent_id)
+
+    def columns(self) -> TalentColumns:
+        """Columnar snapshot of the current talent pool"""
+        with self._lock:
+            if self._columns_version != self.version:
+                self._columns = TalentColumns.from_talents(
+                    self._talents.values(), self.skill_index.copy(), self.term_index.copy()
+                )
+                self._columns_version = self.version
+            return self._columns
+
+    def nearby(self, db: Session, latitude: float, longitude: float, radius_km: float) -> List[Tuple[str, float]]:
+        """Talents within ``radius_km`` of a point as (talent id, distance in km), nearest first"""
+        with self._lock:
+            if self.is_loaded:
+                return self.geo_index.within(latitude, longitude, radius_km)
+        # Not loaded: index the talents' locations for this query only
+        places = ((row.id, place_of(row)) for row in talent.get_locations(db))
+        index = GridIndex.from_points(((id, p.latitude, p.longitude) for id, p in places), settings.geo_cell_degrees)
+        return index.within(latitude, longitude, radius_km)
+
+    def upsert_talent(self, talent_obj: Talent) -> None:
+        with self._lock:
+            features = TalentFeatures(talent_obj)
+            self._talents[talent_obj.id] = features
+            self.skill_index.add(features.id, features.skills)
+            self.geo_index.add(features.id, features.place.latitude, features.place.longitude)
+            for item in features.portfolio_items:
+                self.term_index.add(item)
+            self.version += 1
+
+    def remove_talent(self, talent_id: str) -> None:
+        with self._lock:
+            features = self._talents.pop(talent_id, None)
+            if features is not None:
+                self.skill_index.remove(talent_id)
+                self.geo_index.remove(talent_id)
+                for item in features.portfolio_items:
+                    self.term_index.remove(item.id)
+                self.version += 1
+
+    def add_portfolio_item(self, item: PortfolioItem) -> None:
+        with self._lock:
+            features = self._talents.get(item.talent_id)
+            if features is not None:
+                item_features = PortfolioFeatures(item)
+                portfolio_items = features.portfolio_items + (item_features,)
+                self._talents[item.talent_id] = TalentFeatures(features, portfolio_items)
+                self.term_index.add(item_features)
+                self.version += 1
+
+    def remove_portfolio_item(self, item: PortfolioItem) -> None:
+        with self._lock:
+            features = self._talents.get(item.talent_id)
+            if features is not None:
+                portfolio_items = tuple(p for p in features.portfolio_items if p.id != item.id)
+                self._talents[item.talent_id] = TalentFeatures(features, portfolio_items)
+                self.term_index.remove(item.id)
+                self.version += 1
+
+    def on_talent_write(self, event: str, talent_obj: Talent) -> None:
+        if not self.is_loaded:
+            return
+        if event == "deleted":
+            self.remove_talent(talent_obj.id)
+        else:
+            self.upsert_talent(talent_obj)
+
+    def on_portfolio_item_write(self, event: str, item: PortfolioItem) -> None:
+        if not self.is_loaded:
+            return
+        if event == "deleted":
+            self.remove_portfolio_item(item)
+        else:
+            self.add_portfolio_item(item)
+
+
+class GigFeatureStore:
+    """
+    Resident copy of the open gigs, used for reverse matching.
+
+    Only gigs with status "open" are held; a gig leaves the store when it is
+    closed or deleted. The inverted ``gig_index`` is maintained incrementally
+    and the columnar snapshot is rebuilt lazily per ``version``, as in
+    TalentFeatureStore.
+    """
+
+    def __init__(self):
+        self._gigs: Dict[str, GigFeatures] = {}
+        self.gig_index = GigIndex()
+        self._lock = threading.RLock()
+        self._columns: Optional[GigColumns] = None
+        self._columns_version = -1
+        self.version = 0
+        self.is_loaded = False
+
+    def build(self, db: Session) -> None:
+        """Load every open gig with its required skills"""
+        gigs = gig.get_open(db, profile="scoring")
+
+        with self._lock:
+            self._gigs = {g.id: GigFeatures(g) for g in gigs}
+            self.gig_index = GigIndex.from_gigs(self._gigs.values())
+            self.is_loaded = True
+            self.version += 1
+        logger.info(f"Gig feature store loaded {len(gigs)} open gigs")
+
+    def __len__(self) -> int:
+        return len(self._gigs)
+
+    def get(self, gig_id: str) -> Optional[GigFeatures]:
+        return self._gigs.get(gig_id)
+
+    def columns(self) -> GigColumns:
+        """Columnar snapshot of the current open gigs"""
+        with self._lock:
+            if self._columns_version != self.version:
+                self._columns = GigColumns.from_gigs(self._gigs.values(), self.gig_index.copy())
+                self._columns_version = self.version
+            return self._columns
+
+    def upsert_gig(self, gig_obj: Gig) -> None:
+        if gig_obj.status != "open":
+            self.remove_gig(gig_obj.id)
+            return
+        with self._lock:
+            features = GigFeatures(gig_obj)
+            self._gigs[gig_obj.id] = features
+            self.gig_index.add(features)
+            self.version += 1
+
+    def remove_gig(self, gig_id: str) -> None:
+        with self._lock:
+            if self._gigs.pop(gig_id, None) is not None:
+                self.gig_index.remove(gig_id)
+                self.version += 1
+
+    def on_gig_write(self, event: str, gig_obj: Gig) -> None:
+        if not self.is_loaded:
+            return
+        if event == "deleted":
+            self.remove_gig(gig_obj.id)
+        else:
+            self.upsert_gig(gig_obj)
+
+
+# Create instances
+talent_store = TalentFeatureStore()
+talent.add_listener(talent_store.on_talent_write)
+portfolio_item.add_listener(talent_store.on_portfolio_item_write)
+
+gig_store = GigFeatureStore()
+gig.add_listener(gig_store.on_gig_write)
@@ -0,0 +1,138 @@
+import csv
+import math
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+# Bundled offline gazetteer: countries, regions (states) and cities with coordinates
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'gazetteer.csv')
+
+# Longest place name, in tokens, tried when scanning a location string
+MAX_NAME_TOKENS = 4
+
+# Aliases this short are codes ("UP", "CA", "WA") that double as common words,
+# so they only count when they make up a whole comma-separated part of the text
+MAX_CODE_LENGTH = 2
+
+
+class Place(NamedTuple):
+    """
+    A location resolved against the gazetteer.
+
+    Codes are gazetteer ids (countries use ISO 3166 numeric codes); 0 means
+    not resolved at that level. A region-only place ("Goa") has city_code 0,
+    an unresolved one has every code 0 and NaN coordinates.
+    """
+    city_code: int
+    region_code: int
+    country_code: int
+    latitude: float
+    longitude: float
+
+    @property
+    def is_known(self) -> bool:
+        return self.country_code > 0
+
+
+UNKNOWN_PLACE = Place(0, 0, 0, math.nan, math.nan)
+
+
+def normalize(text: str) -> List[str]:
+    return re.findall(r"[^\W_]+", text.lower())
+
+
+class Gazetteer:
+    """
+    Offline place-name resolver.
+
+    ``resolve`` scans a free-text location for the longest known names (city,
+    region or country names and their aliases) and returns the most specific
+    place found, with its region and country filled in from the hierarchy.
+    Short codes only match on their own ("Lucknow, UP" or "UP", not "Looking
+    up Mumbai"). Results are memoized per distinct string, so every location
+    is resolved once per process.
+    """
+
+    def __init__(self, path: str = GAZETTEER_PATH):
+        self._entries: Dict[Tuple[str, int], Tuple[int, float, float]] = {}  # (kind, id) -> parent, lat, lon
+        self._names: Dict[str, List[Tuple[str, int]]] = {}
+        self._codes: Set[str] = set()
+        self._cache: Dict[str, Place] = {}
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                key = (row['kind'], int(row['id']))
+                self._entries[key] = (int(row['parent_id']), float(row['latitude']), float(row['longitude']))
+                names = [row['name']] + [alias for alias in row['aliases'].split('|') if alias]
+                for name in names:
+                    self._names.setdefault(' '.join(normalize(name)), []).append(key)
+                self._codes.update(
+                    alias.lower() for alias in names[1:]
+                    if len(alias) <= MAX_CODE_LENGTH and normalize(alias) == [alias.lower()]
+                )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _place(self, kind: str, entry_id: int) -> Place:
+        parent, latitude, longitude = self._entries[(kind, entry_id)]
+        if kind == 'city':
+            region = parent
+            country = self._entries[('region', region)][0]
+            return Place(entry_id, region, country, latitude, longitude)
+        if kind == 'region':
+            return Place(0, entry_id, parent, latitude, longitude)
+        return Place(0, 0, entry_id, latitude, longitude)
+
+    def resolve(self, text: Optional[str]) -> Place:
+        if not text:
+            return UNKNOWN_PLACE
+        place = self._cache.get(text)
+        if place is None:
+            place = self._cache[text] = self._resolve(text)
+        return place
+
+    def _resolve(self, text: str) -> Place:
+        tokens, standalone = [], set()  # standalone: tokens that are a whole comma-separated part
+        for part in text.split(','):
+            part_tokens = normalize(part)
+            if len(part_tokens) == 1:
+                standalone.add(len(tokens))
+            tokens.extend(part_tokens)
+        found = []  # places matching each name found, in text order
+        i = 0
+        while i < len(tokens):
+            for length in range(min(MAX_NAME_TOKENS, len(tokens) - i), 0, -1):
+                name = ' '.join(tokens[i:i + length])
+                if name in self._codes and i not in standalone:
+                    continue
+                matches = self._names.get(name)
+                if matches:
+                    found.append(matches)
+                    i += length
+                    break
+            else:
+                i += 1
+        if not found:
+            return UNKNOWN_PLACE
+
+        # Prefer a place the other names agree with ("Hyderabad, Telangana"), then the most specific
+        groups = [[self._place(*key) for key in matches] for matches in found]
+        codes = [{code for place in group for code in place[:3] if code} for group in groups]
+        places = []
+        for g, group in enumerate(groups):
+            for place in group:
+                support = sum(bool({place.region_code, place.country_code} & codes[other])
+                              for other in range(len(groups)) if other != g)
+                places.append((-support, place.city_code == 0, place.region_code == 0, place))
+        places.sort(key=lambda entry: entry[:3])
+        return places[0][3]
+
+
+def place_of(obj) -> Place:
+    """Resolved place of a talent or gig: precomputed when it has one, else resolved from its location"""
+    place = getattr(obj, 'place', None)
+    return place if place is not None else gazetteer.resolve(obj.location)
+
+
+# Create instance
+gazetteer = Gazetteer()
@@ -0,0 +1,105 @@
+import math
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+
+# Mean Earth radius used for great-circle distances
+EARTH_RADIUS_KM = 6371.0088
+
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km between points given in degrees; broadcasts over arrays"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GridIndex:
+    """
+    Spatial index of points bucketed into a lat/lon grid.
+
+    Each point lives in the ``cell_degrees`` x ``cell_degrees`` cell holding
+    its coordinates. A radius query visits only the cells overlapping the
+    circle's bounding box (wrapping at the antimeridian, widening to every
+    longitude near the poles) and computes exact great-circle distances for
+    the points in them, so its cost follows the number of nearby points
+    rather than the size of the index.
+    """
+
+    def __init__(self, cell_degrees: float = 0.5):
+        self.cell_degrees = cell_degrees
+        self._columns = int(round(360.0 / cell_degrees))
+        self._all_columns = range(-(self._columns // 2), self._columns - self._columns // 2)
+        self._cells: Dict[Tuple[int, int], Dict[str, None]] = {}
+        self._points: Dict[str, Tuple[float, float, Tuple[int, int]]] = {}
+
+    @classmethod
+    def from_points(cls, points: Iterable[Tuple[str, float, float]], cell_degrees: float = 0.5) -> "GridIndex":
+        index = cls(cell_degrees)
+        for point_id, latitude, longitude in points:
+            index.add(point_id, latitude, longitude)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _column(self, column: int) -> int:
+        """Column index wrapped into [-180, 180) degrees"""
+        return (column - self._all_columns.start) % self._columns + self._all_columns.start
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return (int(math.floor(latitude / self.cell_degrees)),
+                self._column(int(math.floor(longitude / self.cell_degrees))))
+
+    def add(self, point_id: str, latitude: float, longitude: float) -> None:
+        """Index a point, replacing any previous one with the same id; NaN coordinates are not indexed"""
+        self.remove(point_id)
+        if math.isnan(latitude) or math.isnan(longitude):
+            return
+        cell = self._cell(latitude, longitude)
+        self._cells.setdefault(cell, {})[point_id] = None
+        self._points[point_id] = (latitude, longitude, cell)
+
+    def remove(self, point_id: str) -> None:
+        point = self._points.pop(point_id, None)
+        if point is None:
+            return
+        members = self._cells[point[2]]
+        del members[point_id]
+        if not members:
+            del self._cells[point[2]]
+
+    def cells_within(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[int, int]]:
+        """Non-empty cells overlapping the bounding box of the circle"""
+        lat_span = radius_km / KM_PER_DEGREE
+        lat_low, lat_high = max(latitude - lat_span, -90.0), min(latitude + lat_span, 90.0)
+        rows = range(int(math.floor(lat_low / self.cell_degrees)), int(math.floor(lat_high / self.cell_degrees)) + 1)
+
+        # A circle is widest at the box edge farthest from the equator
+        widest = max(abs(lat_low), abs(lat_high))
+        lon_span = 180.0 if widest >= 89.9 else lat_span / math.cos(math.radians(widest))
+        if lon_span >= 180.0:
+            columns = None
+        else:
+            first = int(math.floor((longitude - lon_span) / self.cell_degrees))
+            last = int(math.floor((longitude + lon_span) / self.cell_degrees))
+            columns = {self._column(c) for c in range(first, last + 1)}
+
+        # Scan whichever is smaller: the box's cells or the occupied cells
+        box_size = len(rows) * (self._columns if columns is None else len(columns))
+        if box_size <= len(self._cells):
+            return [(row, column) for row in rows for column in (self._all_columns if columns is None else columns)
+                    if (row, column) in self._cells]
+        return [cell for cell in self._cells if cell[0] in rows and (columns is None or cell[1] in columns)]
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[str, float]]:
+        """Points within ``radius_km`` of the center as (id, distance in km), nearest first"""
+        ids = [point_id for cell in self.cells_within(latitude, longitude, radius_km) for point_id in self._cells[cell]]
+        if not ids:
+            return []
+        coordinates = np.array([self._points[point_id][:2] for point_id in ids], dtype=np.float64)
+        distances = haversine_km(latitude, longitude, coordinates[:, 0], coordinates[:, 1])
+        inside = np.flatnonzero(distances <= radius_km)
+        order = inside[np.argsort(distances[inside], kind='stable')]
+        return [(ids[i], float(distances[i])) for i in order]
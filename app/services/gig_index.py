@@ -0,0 +1,159 @@
+import math
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from app.services.skill_index import bitset_to_array
+from app.services.tokens import tokens_of
+
+
+# Budget bands are powers of two of budget_max: band b holds budgets in [2**b, 2**(b+1))
+NO_BUDGET_BAND = -1
+
+# Index fields: each maps a key to the bitset of gigs having it
+FIELDS = (
+    'category',        # gig.category, lowercased
+    'skill_name',      # required skill names, lowercased
+    'skill_category',  # required skill categories, lowercased
+    'style_token',     # token ids of gig.style_preferences
+    'description_token',  # token ids of gig.description
+    'budget_band',     # budget_band(gig.budget_max)
+    'remote',          # gig.is_remote
+)
+
+
+def budget_band(budget: Optional[float]) -> int:
+    if not budget or budget < 1:
+        return NO_BUDGET_BAND
+    return int(math.floor(math.log2(budget)))
+
+
+def bitset_from_positions(positions: Sequence[int], size: int) -> int:
+    """Build a Python int bitset with the given positions set"""
+    if not len(positions):
+        return 0
+    bits = np.zeros(size, dtype=bool)
+    bits[np.asarray(positions, dtype=np.int64)] = True
+    return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+
+def gig_keys(gig) -> Dict[str, Tuple]:
+    """Index keys of a gig for every field"""
+    return {
+        'category': (gig.category.lower(),) if gig.category else (),
+        'skill_name': tuple({s.name.lower() for s in gig.required_skills}),
+        'skill_category': tuple({s.category.lower() for s in gig.required_skills}),
+        'style_token': tuple(tokens_of(gig, 'style_preferences')),
+        'description_token': tuple(tokens_of(gig, 'description')),
+        'budget_band': (budget_band(gig.budget_max),),
+        'remote': (bool(gig.is_remote),),
+    }
+
+
+class GigIndex:
+    """
+    Inverted index over open gigs, the gig-side counterpart of SkillIndex.
+
+    Every indexed gig owns a bit position; for each field in FIELDS a key
+    maps to a Python int with the bits of the gigs having that key set.
+    Reverse matching reads skill overlap, category and token matches for a
+    talent straight off these bitsets, and candidate filters (category,
+    required skill, remote flag, budget band) are ANDs of them, so closed
+    gigs are never looked at and no gig's text is re-tokenized per query.
+    """
+
+    def __init__(self):
+        self._positions: Dict[str, int] = {}
+        self._free: List[int] = []
+        self.size = 0  # highest position handed out + 1
+        self._bitsets: Dict[str, Dict] = {field: {} for field in FIELDS}
+        self._gig_keys: Dict[str, Dict[str, Tuple]] = {}
+
+    @classmethod
+    def from_gigs(cls, gigs: Iterable) -> "GigIndex":
+        """Bulk build; bitsets are packed once per key instead of grown bit by bit"""
+        index = cls()
+        postings: Dict[str, Dict] = {field: {} for field in FIELDS}
+        for position, g in enumerate(gigs):
+            index._positions[g.id] = position
+            keys = gig_keys(g)
+            index._gig_keys[g.id] = keys
+            for field, field_keys in keys.items():
+                for key in field_keys:
+                    postings[field].setdefault(key, []).append(position)
+        index.size = len(index._positions)
+        for field, by_key in postings.items():
+            index._bitsets[field] = {
+                key: bitset_from_positions(positions, index.size) for key, positions in by_key.items()
+            }
+        return index
+
+    def copy(self) -> "GigIndex":
+        """Point-in-time copy; bitsets are immutable ints so this is cheap."""
+        index = GigIndex()
+        index._positions = dict(self._positions)
+        index._free = list(self._free)
+        index.size = self.size
+        index._bitsets = {field: dict(by_key) for field, by_key in self._bitsets.items()}
+        index._gig_keys = dict(self._gig_keys)
+        return index
+
+    def position(self, gig_id: str) -> Optional[int]:
+        return self._positions.get(gig_id)
+
+    def add(self, gig) -> None:
+        """Index a gig, replacing any previous entry for it"""
+        self.remove(gig.id, release=False)
+
+        position = self._positions.get(gig.id)
+        if position is None:
+            position = self._free.pop() if self._free else self.size
+            self._positions[gig.id] = position
+            self.size = max(self.size, position + 1)
+
+        bit = 1 << position
+        keys = gig_keys(gig)
+        for field, field_keys in keys.items():
+            by_key = self._bitsets[field]
+            for key in field_keys:
+                by_key[key] = by_key.get(key, 0) | bit
+        self._gig_keys[gig.id] = keys
+
+    def remove(self, gig_id: str, release: bool = True) -> None:
+        position = self._positions.get(gig_id)
+        if position is None:
+            return
+
+        clear = ~(1 << position)
+        for field, field_keys in self._gig_keys.pop(gig_id, {}).items():
+            by_key = self._bitsets[field]
+            for key in field_keys:
+                by_key[key] &= clear
+
+        if release:
+            del self._positions[gig_id]
+            self._free.append(position)
+
+    def bitset(self, field: str, key) -> int:
+        return self._bitsets[field].get(key, 0)
+
+    def any_of(self, field: str, keys: Iterable) -> int:
+        """Gigs having at least one of the keys"""
+        bitset = 0
+        for key in keys:
+            bitset |= self._bitsets[field].get(key, 0)
+        return bitset
+
+    def budget_at_least(self, budget: float) -> int:
+        """Gigs whose budget band may reach ``budget``; exact filtering is left to the caller"""
+        lowest = budget_band(budget)
+        return self.any_of('budget_band', (band for band in self._bitsets['budget_band'] if band >= lowest))
+
+    def count_bits(self, bitsets: Iterable[int]) -> np.ndarray:
+        """Number of the given bitsets each position is set in"""
+        counts = np.zeros(self.size, dtype=np.int64)
+        for bitset in bitsets:
+            if bitset:
+                counts += bitset_to_array(bitset, self.size)
+        return counts
+
+    def to_mask(self, bitset: int) -> np.ndarray:
+        return bitset_to_array(bitset, self.size)
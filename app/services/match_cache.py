@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+from app.core.config import settings
+from app.crud.crud import talent, gig, skill, portfolio_item
+from app.schemas.schemas import MatchCacheStats
+
+
+class MatchResultCache:
+    """
+    Size-bounded LRU record of which gigs' stored match results are current.
+
+    Every run rewrites a gig's stored rows, so one entry per gig is kept: the
+    key of the run that produced them (gig updated_at, talent-pool version,
+    engine, limit, filters). A find-matches call with the same key is served
+    from the stored rows without scoring or writing. Writes to talents,
+    skills and portfolio items bump ``pool_version`` and clear the cache;
+    writes to a gig drop that gig's entry.
+
+    Like the feature stores, writes made by other processes are not seen.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Hashable]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.pool_version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, gig_id: str, key: Hashable) -> bool:
+        """Whether the gig's stored results were produced by a run with ``key``"""
+        with self._lock:
+            if self._entries.get(gig_id) == key:
+                self._entries.move_to_end(gig_id)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def store(self, gig_id: str, key: Hashable) -> None:
+        with self._lock:
+            self._entries[gig_id] = key
+            self._entries.move_to_end(gig_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_gig(self, gig_id: str) -> None:
+        with self._lock:
+            if self._entries.pop(gig_id, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_pool(self) -> None:
+        with self._lock:
+            self.pool_version += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def on_pool_write(self, event: str, obj: Any) -> None:
+        self.invalidate_pool()
+
+    def on_gig_write(self, event: str, gig_obj: Any) -> None:
+        self.invalidate_gig(gig_obj.id)
+
+    def stats(self) -> MatchCacheStats:
+        with self._lock:
+            return MatchCacheStats(
+                size=len(self._entries),
+                max_size=self.max_size,
+                pool_version=self.pool_version,
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                invalidations=self.invalidations
+            )
+
+
+# Create instance
+match_cache = MatchResultCache(settings.match_cache_size)
+talent.add_listener(match_cache.on_pool_write)
+skill.add_listener(match_cache.on_pool_write)
+portfolio_item.add_listener(match_cache.on_pool_write)
+gig.add_listener(match_cache.on_gig_write)
@@ -1,11 +1,23 @@
 import time
 import math
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+import heapq
+import numpy as np
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from sqlalchemy.orm import Session
-from geopy.distance import geodesic
+from app.core.config import settings
 from app.models.models import Talent, Gig, MatchResult
-from app.crud.crud import talent, gig, match_result
-from app.schemas.schemas import MatchResponse, MatchResultResponse, MatchScoreBreakdown
+from app.crud.crud import talent, gig, match_result, match_run
+from app.schemas.schemas import MatchResponse, MatchResultResponse, MatchScoreBreakdown, MatchStats
+from app.services.columnar import TalentColumns, GigColumns, AVAILABLE, BUSY, UNAVAILABLE, top_k_rows
+from app.services.feature_store import talent_store, gig_store, GigFeatures
+from app.services.parallel import scoring_pool
+from app.services.match_cache import match_cache
+from app.services.embeddings import embedding_store, quantize, quantized_dot
+from app.services.gazetteer import Place, gazetteer, place_of
+from app.services.geo_index import haversine_km
+from app.services.tokens import tokens_of
+from app.services.ann_index import portfolio_index
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +35,11 @@ class MatchmakingEngine:
             'rating': 0.10
         }
         
+        # Maximum value of each deferred component, used for upper-bound pruning
+        self.deferred_score_max = {
+            'portfolio': 10.0
+        }
+        
     def calculate_location_score(self, talent_location: str, gig_location: Optional[str], is_remote: bool) -> float:
         """Calculate location match score"""
         if is_remote:
@@ -31,16 +48,29 @@ class MatchmakingEngine:
         if not gig_location:
             return 5.0  # Neutral score if no location specified
         
-        # Simple string matching for location (in production, use geocoding)
-        if talent_location.lower() in gig_location.lower() or gig_location.lower() in talent_location.lower():
-            return 10.0
-        elif self._is_same_state_or_region(talent_location, gig_location):
+        return self.calculate_place_score(gazetteer.resolve(talent_location), gazetteer.resolve(gig_location))
+    
+    def calculate_place_score(self, talent_place: Place, gig_place: Place) -> float:
+        """Location score of two places resolved against the gazetteer"""
+        if not talent_place.is_known or not gig_place.is_known:
+            return 4.0  # Unresolved location: treat as same country
+        
+        if talent_place[:3] == gig_place[:3]:
+            return 10.0  # Same place at the precision given
+        elif settings.location_half_life_km > 0:
+            return float(self.calculate_distance_scores(talent_place.latitude, talent_place.longitude, gig_place))
+        elif talent_place.region_code and talent_place.region_code == gig_place.region_code:
             return 7.0
-        elif self._is_same_country(talent_location, gig_location):
+        elif talent_place.country_code == gig_place.country_code:
             return 4.0
         else:
             return 1.0
     
+    def calculate_distance_scores(self, latitude, longitude, place: Place) -> np.ndarray:
+        """Location score decaying from 10 towards 1 with great-circle distance, halving every location_half_life_km"""
+        distance = haversine_km(latitude, longitude, place.latitude, place.longitude)
+        return 1.0 + 9.0 * np.exp2(-distance / settings.location_half_life_km)
+    
     def calculate_budget_score(self, talent: Talent, gig: Gig) -> float:
         """Calculate budget compatibility score"""
         if not gig.budget_min or not gig.budget_max:
@@ -144,6 +174,8 @@ class MatchmakingEngine:
         
         portfolio_score = 0.0
         max_items = min(len(talent.portfolio_items), 5)  # Consider up to 5 items
+        gig_keywords = tokens_of(gig, 'style_preferences')
+        gig_words = tokens_of(gig, 'description')
         
         for item in talent.portfolio_items[:max_items]:
             item_score = 0.0
@@ -154,20 +186,12 @@ class MatchmakingEngine:
                     item_score += 3.0
             
             # Style keywords match
-            if item.style_keywords and gig.style_preferences:
-                item_keywords = set(item.style_keywords.lower().split(','))
-                gig_keywords = set(gig.style_preferences.lower().split())
-                
-                if item_keywords.intersection(gig_keywords):
-                    item_score += 2.0
+            if not gig_keywords.isdisjoint(tokens_of(item, 'style_keywords')):
+                item_score += 2.0
             
             # Tags match
-            if item.tags and gig.description:
-                item_tags = set(item.tags.lower().split(','))
-                gig_words = set(gig.description.lower().split())
-                
-                if item_tags.intersection(gig_words):
-                    item_score += 1.0
+            if not gig_words.isdisjoint(tokens_of(item, 'tags')):
+                item_score += 1.0
             
             portfolio_score += item_score
         
@@ -181,20 +205,27 @@ class MatchmakingEngine:
         # Scale 0-5 rating to 0-10 score
         return talent.rating * 2
     
-    def calculate_match_score(self, talent: Talent, gig: Gig) -> Tuple[float, MatchScoreBreakdown]:
-        """Calculate comprehensive match score"""
-        scores = {
+    def calculate_immediate_scores(self, talent: Talent, gig: Gig) -> Dict[str, float]:
+        """Components that are cheap to evaluate for every candidate"""
+        return {
             'location': self.calculate_location_score(talent.location, gig.location, gig.is_remote),
             'budget': self.calculate_budget_score(talent, gig),
             'skills': self.calculate_skills_score(talent, gig),
             'experience': self.calculate_experience_score(talent, gig),
             'availability': self.calculate_availability_score(talent),
-            'portfolio': self.calculate_portfolio_score(talent, gig),
             'rating': self.calculate_rating_score(talent)
         }
-        
+    
+    def calculate_deferred_scores(self, talent: Talent, gig: Gig, db: Optional[Session] = None) -> Dict[str, float]:
+        """Costly components, evaluated only for candidates that can still rank; ``db`` serves any lookups"""
+        return {
+            'portfolio': self.calculate_portfolio_score(talent, gig)
+        }
+    
+    def combine_scores(self, scores: Dict[str, float], talent: Talent, gig: Gig) -> float:
+        """Weighted total of component scores plus priority and success-rate bonuses"""
         # Calculate weighted score
-        total_score = sum(scores[key] * self.score_weights[key] for key in scores)
+        total_score = sum(scores[key] * self.score_weights[key] for key in self.score_weights)
         
         # Apply priority bonus
         priority_bonus = {'low': 0, 'medium': 0.5, 'high': 1.0}
@@ -206,9 +237,19 @@ class MatchmakingEngine:
         elif talent.success_rate > 0.8:
             total_score += 0.3
         
-        total_score = min(total_score, 10.0)
+        return min(total_score, 10.0)
+    
+    def upper_bound_score(self, immediate_scores: Dict[str, float], talent: Talent, gig: Gig) -> float:
+        """
+        Highest total_score reachable given the immediate components.
         
-        score_breakdown = MatchScoreBreakdown(
+        Every deferred component is taken at its maximum. Float addition and
+        min() are monotonic, so the bound is never below the exact total.
+        """
+        return self.combine_scores({**immediate_scores, **self.deferred_score_max}, talent, gig)
+    
+    def _score_breakdown(self, scores: Dict[str, float]) -> MatchScoreBreakdown:
+        return MatchScoreBreakdown(
             location_score=scores['location'],
             budget_score=scores['budget'],
             skill_score=scores['skills'],
@@ -217,8 +258,357 @@ class MatchmakingEngine:
             portfolio_score=scores['portfolio'],
             rating_score=scores['rating']
         )
+    
+    def calculate_match_score(self, talent: Talent, gig: Gig,
+                              db: Optional[Session] = None) -> Tuple[float, MatchScoreBreakdown]:
+        """Calculate comprehensive match score"""
+        scores = self.calculate_immediate_scores(talent, gig)
+        scores.update(self.calculate_deferred_scores(talent, gig, db))
+        
+        return self.combine_scores(scores, talent, gig), self._score_breakdown(scores)
+    
+    def calculate_location_scores(self, columns: TalentColumns, gig: Gig) -> np.ndarray:
+        """Vectorized location score: integer comparisons of gazetteer codes"""
+        if gig.is_remote:
+            return np.full(columns.size, 10.0)
+        if not gig.location:
+            return np.full(columns.size, 5.0)
+        return self.calculate_place_scores(columns, place_of(gig))
+    
+    def calculate_place_scores(self, columns, place: Place) -> np.ndarray:
+        """
+        Vectorized calculate_place_score of many places against one place.
+
+        ``columns`` is a TalentColumns or GigColumns: places come from its
+        gazetteer code and coordinate arrays.
+        """
+        city_code, region_code, country_code = columns.city_code, columns.region_code, columns.country_code
+        if not place.is_known:
+            return np.full(len(country_code), 4.0)
+        conditions = [
+            country_code == 0,
+            (city_code == place.city_code) & (region_code == place.region_code) & (country_code == place.country_code)
+        ]
+        if settings.location_half_life_km > 0:
+            distance_scores = self.calculate_distance_scores(columns.latitude, columns.longitude, place)
+            return np.select(conditions, [4.0, 10.0], default=distance_scores)
+        return np.select(
+            conditions + [
+                (region_code != 0) & (region_code == place.region_code),
+                country_code == place.country_code
+            ],
+            [4.0, 10.0, 7.0, 4.0],
+            default=1.0
+        )
+    
+    def calculate_budget_scores(self, columns: TalentColumns, gig: Gig) -> np.ndarray:
+        """Vectorized calculate_budget_score"""
+        if not gig.budget_min or not gig.budget_max:
+            return np.full(columns.size, 5.0)
+        
+        gig_budget_avg = (gig.budget_min + gig.budget_max) / 2
+        
+        # One candidate rate per rate type, NaN where the talent has none
+        with np.errstate(invalid='ignore'):
+            candidates = np.full((columns.size, 3), np.nan)
+            if gig.duration_days:
+                hourly = columns.hourly_rate
+                candidates[:, 0] = np.where(hourly != 0, hourly * 8 * gig.duration_days, np.nan)
+                daily = columns.daily_rate
+                candidates[:, 1] = np.where(daily != 0, daily * gig.duration_days, np.nan)
+            rate_min, rate_max = columns.project_rate_min, columns.project_rate_max
+            candidates[:, 2] = np.where(
+                (rate_min != 0) & (rate_max != 0), (rate_min + rate_max) / 2, np.nan
+            )
+        
+        # Use the rate that's closest to the gig budget (first one on ties)
+        distance = np.abs(candidates - gig_budget_avg)
+        has_rate = ~np.isnan(distance).all(axis=1)
+        distance[np.isnan(distance)] = np.inf
+        best_rate = candidates[np.arange(columns.size), distance.argmin(axis=1)]
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = best_rate / gig_budget_avg
+        scores = np.select(
+            [(0.8 <= ratio) & (ratio <= 1.2), (0.6 <= ratio) & (ratio <= 1.4), (0.4 <= ratio) & (ratio <= 1.6)],
+            [10.0, 7.0, 4.0],
+            default=1.0
+        )
+        return np.where(has_rate, scores, 5.0)
+    
+    def calculate_skills_scores(self, columns: TalentColumns, gig: Gig) -> np.ndarray:
+        """Vectorized calculate_skills_score using the inverted skill index"""
+        if not gig.required_skills:
+            return np.full(columns.size, 5.0)
+        
+        required_skills = {skill.name.lower() for skill in gig.required_skills}
+        required_categories = {skill.category.lower() for skill in gig.required_skills}
+        
+        # Per talent, the number of required names/categories whose bitset has its bit set
+        index = columns.skill_index
+        matching_skills = index.count_bits(index.name_bitset(name) for name in required_skills)
+        matching_categories = index.count_bits(index.category_bitset(c) for c in required_categories)
+        
+        skill_match_ratio = matching_skills[columns.index_rows] / len(required_skills)
+        category_match = matching_categories[columns.index_rows] / len(required_categories)
+        
+        scores = np.minimum(skill_match_ratio * 10 + category_match * 2, 10.0)
+        return np.where(columns.has_skills, scores, 0.0)
+    
+    def calculate_experience_scores(self, columns: TalentColumns, gig: Gig) -> np.ndarray:
+        """Vectorized calculate_experience_score"""
+        if not gig.experience_required:
+            return np.full(columns.size, 5.0)
+        
+        experience_mapping = {
+            'junior': (0, 2),
+            'mid': (2, 5),
+            'senior': (5, 100)
+        }
+        
+        required_min, required_max = experience_mapping.get(gig.experience_required, (0, 100))
+        years = columns.experience_years
+        
+        return np.select(
+            [(required_min <= years) & (years <= required_max), years >= required_min],
+            [10.0, 7.0],
+            default=np.maximum(0, 10 - (required_min - years) * 2).astype(np.float64)
+        )
+    
+    def calculate_availability_scores(self, columns: TalentColumns) -> np.ndarray:
+        """Vectorized calculate_availability_score"""
+        return np.select(
+            [columns.availability == AVAILABLE, columns.availability == BUSY],
+            [10.0, 3.0],
+            default=0.0
+        )
+    
+    def calculate_portfolio_scores(self, columns: TalentColumns, gig: Gig,
+                                   rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Vectorized calculate_portfolio_score over the flattened portfolio items"""
+        # Items of talents outside ``rows`` are skipped and score 0
+        items = None if rows is None else rows[columns.item_talent]
+        hit_items = columns.portfolio_hits(gig)
+        item_scores = np.zeros(len(columns.item_talent))
+        
+        # Project type, style keywords and tags matches
+        item_scores += np.where(hit_items['project_type'], 3.0, 0.0)
+        item_scores += np.where(hit_items['style_keywords'], 2.0, 0.0)
+        item_scores += np.where(hit_items['tags'], 1.0, 0.0)
         
-        return total_score, score_breakdown
+        if items is not None:
+            item_scores[~items] = 0.0
+        portfolio_score = np.bincount(columns.item_talent, weights=item_scores, minlength=columns.size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = np.minimum(portfolio_score / columns.portfolio_count, 10.0)
+        return np.where(columns.portfolio_count > 0, scores, 0.0)
+    
+    def portfolio_candidates(self, columns: TalentColumns, gig: Gig) -> np.ndarray:
+        """
+        Row mask of talents with a scored portfolio item matching the gig's
+        terms, from the term index. Every other talent's portfolio score is 0.
+        """
+        hit_items = columns.portfolio_hits(gig)
+        hit = hit_items['project_type'] | hit_items['style_keywords'] | hit_items['tags']
+        candidates = np.zeros(columns.size, dtype=bool)
+        candidates[columns.item_talent[hit]] = True
+        return candidates
+    
+    def deferred_score_upper_bounds(self, columns: TalentColumns, gig: Gig) -> Dict[str, Any]:
+        """Maximum of each deferred component for every row of ``columns``"""
+        candidates = self.portfolio_candidates(columns, gig)
+        return {'portfolio': np.where(candidates, self.deferred_score_max['portfolio'], 0.0)}
+    
+    def calculate_rating_scores(self, columns: TalentColumns) -> np.ndarray:
+        """Vectorized calculate_rating_score"""
+        return np.where(columns.rating == 0, 5.0, columns.rating * 2)
+    
+    def calculate_talent_score_columns(self, columns: TalentColumns) -> Dict[str, np.ndarray]:
+        """Immediate components that do not depend on the gig, shareable across gigs"""
+        return {
+            'availability': self.calculate_availability_scores(columns),
+            'rating': self.calculate_rating_scores(columns)
+        }
+    
+    def calculate_immediate_score_columns(self, columns: TalentColumns, gig: Gig,
+                                          talent_scores: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """Vectorized calculate_immediate_scores, reusing ``talent_scores`` when given"""
+        if talent_scores is None:
+            talent_scores = self.calculate_talent_score_columns(columns)
+        return {
+            'location': self.calculate_location_scores(columns, gig),
+            'budget': self.calculate_budget_scores(columns, gig),
+            'skills': self.calculate_skills_scores(columns, gig),
+            'experience': self.calculate_experience_scores(columns, gig),
+            **talent_scores
+        }
+    
+    def calculate_deferred_score_columns(self, columns: TalentColumns, gig: Gig, rows: Optional[np.ndarray] = None,
+                                         db: Optional[Session] = None) -> Dict[str, np.ndarray]:
+        """Vectorized calculate_deferred_scores, restricted to ``rows`` (a row mask) when given"""
+        return {
+            'portfolio': self.calculate_portfolio_scores(columns, gig, rows)
+        }
+    
+    def combine_score_columns(self, scores: Dict[str, np.ndarray], columns: TalentColumns, gig: Gig) -> np.ndarray:
+        """Vectorized combine_scores"""
+        # Accumulate in the same order as the scalar path so results are bit-identical
+        total_scores = np.zeros(columns.size)
+        for key in self.score_weights:
+            total_scores = total_scores + scores[key] * self.score_weights[key]
+        
+        # Apply priority bonus
+        priority_bonus = {'low': 0, 'medium': 0.5, 'high': 1.0}
+        total_scores = total_scores + priority_bonus.get(gig.priority, 0)
+        
+        # Apply success rate bonus
+        total_scores = total_scores + np.select(
+            [columns.success_rate > 0.9, columns.success_rate > 0.8], [0.5, 0.3], default=0.0
+        )
+        
+        return np.minimum(total_scores, 10.0)
+    
+    def calculate_match_scores(self, columns: TalentColumns, gig: Gig,
+                               db: Optional[Session] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Vectorized calculate_match_score for every talent in ``columns``"""
+        scores = self.calculate_immediate_score_columns(columns, gig)
+        scores.update(self.calculate_deferred_score_columns(columns, gig, db=db))
+        
+        return self.combine_score_columns(scores, columns, gig), scores
+    
+    def calculate_gig_location_scores(self, talent: Talent, columns: GigColumns) -> np.ndarray:
+        """Location score of ``talent`` for every gig"""
+        place_scores = self.calculate_place_scores(columns, place_of(talent))
+        return np.where(columns.is_remote, 10.0, np.where(columns.has_location, place_scores, 5.0))
+    
+    def calculate_gig_budget_scores(self, talent: Talent, columns: GigColumns) -> np.ndarray:
+        """Budget score of ``talent`` for every gig"""
+        gig_budget_avg = columns.budget_avg
+        duration = columns.duration_days
+        
+        # One candidate rate per rate type, NaN where the talent has none or the gig has no duration
+        candidates = np.full((columns.size, 3), np.nan)
+        if talent.hourly_rate:
+            candidates[:, 0] = np.where(duration != 0, talent.hourly_rate * 8 * duration, np.nan)
+        if talent.daily_rate:
+            candidates[:, 1] = np.where(duration != 0, talent.daily_rate * duration, np.nan)
+        if talent.project_rate_min and talent.project_rate_max:
+            candidates[:, 2] = (talent.project_rate_min + talent.project_rate_max) / 2
+        
+        # Use the rate that's closest to the gig budget (first one on ties)
+        with np.errstate(invalid='ignore'):
+            distance = np.abs(candidates - gig_budget_avg[:, None])
+        has_rate = ~np.isnan(candidates).all(axis=1)
+        distance[np.isnan(distance)] = np.inf
+        best_rate = candidates[np.arange(columns.size), distance.argmin(axis=1)]
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = best_rate / gig_budget_avg
+        scores = np.select(
+            [(0.8 <= ratio) & (ratio <= 1.2), (0.6 <= ratio) & (ratio <= 1.4), (0.4 <= ratio) & (ratio <= 1.6)],
+            [10.0, 7.0, 4.0],
+            default=1.0
+        )
+        return np.where(np.isnan(gig_budget_avg) | ~has_rate, 5.0, scores)
+    
+    def calculate_gig_skills_scores(self, talent: Talent, columns: GigColumns) -> np.ndarray:
+        """Skills score of ``talent`` for every gig, read off the gig index"""
+        index = columns.gig_index
+        talent_skills = {skill.name.lower() for skill in talent.skills}
+        talent_categories = {skill.category.lower() for skill in talent.skills}
+        
+        # Per gig, the number of the talent's names/categories among its required ones
+        matching_skills = index.count_bits(index.bitset('skill_name', name) for name in talent_skills)
+        matching_categories = index.count_bits(index.bitset('skill_category', c) for c in talent_categories)
+        
+        has_required = columns.required_skill_count > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            skill_match_ratio = matching_skills / columns.required_skill_count
+            category_match = matching_categories / columns.required_category_count
+            scores = np.minimum(skill_match_ratio * 10 + category_match * 2, 10.0)
+        return np.where(has_required, scores if talent_skills else 0.0, 5.0)
+    
+    def calculate_gig_experience_scores(self, talent: Talent, columns: GigColumns) -> np.ndarray:
+        """Experience score of ``talent`` for every gig"""
+        experience_mapping = {
+            'junior': (0, 2),
+            'mid': (2, 5),
+            'senior': (5, 100)
+        }
+        
+        # Score each distinct requirement once; -1 (no requirement) is neutral
+        years = talent.experience_years or 0
+        per_requirement = []
+        for requirement in columns.experience_vocab:
+            required_min, required_max = experience_mapping.get(requirement, (0, 100))
+            if required_min <= years <= required_max:
+                per_requirement.append(10.0)
+            elif years >= required_min:
+                per_requirement.append(7.0)
+            else:
+                per_requirement.append(float(max(0, 10 - (required_min - years) * 2)))
+        per_requirement.append(5.0)
+        return np.array(per_requirement)[columns.experience_code]
+    
+    def calculate_gig_portfolio_scores(self, talent: Talent, columns: GigColumns) -> np.ndarray:
+        """Portfolio score of ``talent`` for every gig, read off the gig index"""
+        if not talent.portfolio_items:
+            return np.zeros(columns.size)
+        
+        index = columns.gig_index
+        items = talent.portfolio_items[:5]  # Consider up to 5 items
+        portfolio_score = np.zeros(columns.size)
+        for item in items:
+            item_score = np.zeros(columns.size)
+            
+            # Project type match
+            if item.project_type:
+                item_score += np.where(columns.row_mask(index.bitset('category', item.project_type.lower())), 3.0, 0.0)
+            
+            # Style keywords match
+            keywords = tokens_of(item, 'style_keywords')
+            if keywords:
+                item_score += np.where(columns.row_mask(index.any_of('style_token', keywords)), 2.0, 0.0)
+            
+            # Tags match
+            tags = tokens_of(item, 'tags')
+            if tags:
+                item_score += np.where(columns.row_mask(index.any_of('description_token', tags)), 1.0, 0.0)
+            
+            portfolio_score = portfolio_score + item_score
+        
+        return np.minimum(portfolio_score / len(items), 10.0)
+    
+    def calculate_gig_match_scores(self, talent: Talent, columns: GigColumns) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """calculate_match_score of ``talent`` against every gig in ``columns``"""
+        n = columns.size
+        scores = {
+            'location': self.calculate_gig_location_scores(talent, columns),
+            'budget': self.calculate_gig_budget_scores(talent, columns),
+            'skills': self.calculate_gig_skills_scores(talent, columns),
+            'experience': self.calculate_gig_experience_scores(talent, columns),
+            'availability': np.full(n, self.calculate_availability_score(talent)),
+            'portfolio': self.calculate_gig_portfolio_scores(talent, columns),
+            'rating': np.full(n, float(self.calculate_rating_score(talent)))
+        }
+        
+        # Accumulate in the same order as combine_scores so results are bit-identical
+        total_scores = np.zeros(n)
+        for key in self.score_weights:
+            total_scores = total_scores + scores[key] * self.score_weights[key]
+        
+        # Apply priority bonus
+        priority_bonus = {'low': 0, 'medium': 0.5, 'high': 1.0}
+        per_priority = np.array([priority_bonus.get(p, 0) for p in columns.priority_vocab] or [0.0], dtype=np.float64)
+        total_scores = total_scores + per_priority[columns.priority_code]
+        
+        # Apply success rate bonus
+        if talent.success_rate > 0.9:
+            total_scores = total_scores + 0.5
+        elif talent.success_rate > 0.8:
+            total_scores = total_scores + 0.3
+        
+        return np.minimum(total_scores, 10.0), scores
     
     def generate_match_explanation(self, talent: Talent, gig: Gig, score_breakdown: MatchScoreBreakdown) -> str:
         """Generate human-readable match explanation"""
@@ -266,93 +656,534 @@ class MatchmakingEngine:
         
         return "; ".join(explanations) or "Basic compatibility"
     
-    def find_matches(self, db: Session, gig_id: str, limit: int = 10) -> List[MatchResult]:
-        """Find and score talent matches for a gig"""
-        start_time = time.time()
+    def _build_match_data(self, gig_obj: Gig, talent_obj: Talent, match_score: float,
+                          score_breakdown: MatchScoreBreakdown) -> Dict[str, Any]:
+        explanation = self.generate_match_explanation(talent_obj, gig_obj, score_breakdown)
         
-        # Get the gig
-        gig_obj = gig.get(db, gig_id)
-        if not gig_obj:
-            raise ValueError(f"Gig with id {gig_id} not found")
-        
-        # Get all available talents
-        talents = talent.get_multi(db, limit=1000)  # Get more talents for better matching
-        
-        # Score each talent
-        matches = []
-        for talent_obj in talents:
+        return {
+            'gig_id': gig_obj.id,
+            'talent_id': talent_obj.id,
+            'match_score': match_score,
+            'ranking': 0,  # Will be set later
+            'location_score': score_breakdown.location_score,
+            'budget_score': score_breakdown.budget_score,
+            'skill_score': score_breakdown.skill_score,
+            'experience_score': score_breakdown.experience_score,
+            'availability_score': score_breakdown.availability_score,
+            'portfolio_score': score_breakdown.portfolio_score,
+            'rating_score': score_breakdown.rating_score,
+            'match_explanation': explanation
+        }
+    
+    def _score_talents(self, talents: List[Talent], gig_obj: Gig, limit: int, stats: MatchStats,
+                       db: Optional[Session] = None) -> List[Tuple[float, Talent, MatchScoreBreakdown]]:
+        """Score talents one at a time, keeping only the best ``limit`` in a bounded heap"""
+        heap = []
+        for position, talent_obj in enumerate(talents):
             if talent_obj.availability_status == 'unavailable':
                 continue
+            stats.candidates_considered += 1
+            
+            # Skip the costly components when even their best case cannot beat
+            # the current k-th best score (or the 3.0 cut-off); ties lose to earlier talents
+            scores = self.calculate_immediate_scores(talent_obj, gig_obj)
+            threshold = heap[0][0] if len(heap) >= limit else 3.0
+            if self.upper_bound_score(scores, talent_obj, gig_obj) <= threshold:
+                stats.pruned_candidates += 1
+                continue
             
-            match_score, score_breakdown = self.calculate_match_score(talent_obj, gig_obj)
+            scores.update(self.calculate_deferred_scores(talent_obj, gig_obj, db))
+            match_score = self.combine_scores(scores, talent_obj, gig_obj)
             
             # Only include matches with score > 3.0
             if match_score > 3.0:
-                explanation = self.generate_match_explanation(talent_obj, gig_obj, score_breakdown)
-                
-                match_data = {
-                    'gig_id': gig_id,
-                    'talent_id': talent_obj.id,
-                    'match_score': match_score,
-                    'ranking': 0,  # Will be set later
-                    'location_score': score_breakdown.location_score,
-                    'budget_score': score_breakdown.budget_score,
-                    'skill_score': score_breakdown.skill_score,
-                    'experience_score': score_breakdown.experience_score,
-                    'availability_score': score_breakdown.availability_score,
-                    'portfolio_score': score_breakdown.portfolio_score,
-                    'rating_score': score_breakdown.rating_score,
-                    'match_explanation': explanation
-                }
-                
-                matches.append((match_score, match_data, talent_obj))
-        
-        # Sort by score descending
-        matches.sort(key=lambda x: x[0], reverse=True)
-        
-        # Clear existing matches for this gig
-        match_result.delete_by_gig(db, gig_id)
-        
-        # Save top matches
-        saved_matches = []
-        for i, (score, match_data, talent_obj) in enumerate(matches[:limit]):
-            match_data['ranking'] = i + 1
-            saved_match = match_result.create(db, match_data)
-            saved_matches.append(saved_match)
+                entry = (match_score, -position, talent_obj, scores)
+                if len(heap) < limit:
+                    heapq.heappush(heap, entry)
+                elif entry[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, entry)
+        
+        heap.sort(key=lambda entry: entry[:2], reverse=True)
+        return [(match_score, talent_obj, self._score_breakdown(scores)) for match_score, _, talent_obj, scores in heap]
+    
+    def _score_talents_vectorized(self, columns: TalentColumns, gig_obj: Gig, limit: int, stats: MatchStats,
+                                  candidates: Optional[np.ndarray] = None,
+                                  talent_scores: Optional[Dict[str, np.ndarray]] = None,
+                                  db: Optional[Session] = None
+                                  ) -> List[Tuple[float, Talent, MatchScoreBreakdown]]:
+        """Score the whole talent pool at once and select the best ``limit`` rows"""
+        selected = self._select_rows_vectorized(columns, gig_obj, limit, stats, candidates, talent_scores, db)
+        return [
+            (match_score, columns.talents[row], self._score_breakdown(scores))
+            for row, match_score, scores in selected
+        ]
+    
+    def _score_talents_parallel(self, columns: TalentColumns, gig_obj: Gig, limit: int, stats: MatchStats,
+                                require_skill_overlap: bool) -> List[Tuple[float, Talent, MatchScoreBreakdown]]:
+        """_score_talents_vectorized over shards of the pool in the scoring process pool"""
+        selected, considered, pruned = scoring_pool.score(
+            type(self).__name__, columns, GigFeatures(gig_obj), limit, require_skill_overlap
+        )
+        stats.candidates_considered += considered
+        stats.pruned_candidates += pruned
+        return [
+            (match_score, columns.talents[row], self._score_breakdown(scores))
+            for row, match_score, scores in selected
+        ]
+    
+    def _select_rows_vectorized(self, columns: TalentColumns, gig_obj: Gig, limit: int, stats: MatchStats,
+                                candidates: Optional[np.ndarray] = None,
+                                talent_scores: Optional[Dict[str, np.ndarray]] = None,
+                                db: Optional[Session] = None
+                                ) -> List[Tuple[int, float, Dict[str, float]]]:
+        """Best ``limit`` rows of ``columns`` as (row, total score, component scores)"""
+        eligible = columns.availability != UNAVAILABLE
+        if candidates is not None:
+            eligible &= candidates
+        stats.candidates_considered += int(eligible.sum())
+        
+        # Bound every total with the deferred components at their minimum (0) and maximum
+        scores = self.calculate_immediate_score_columns(columns, gig_obj, talent_scores)
+        lower_bounds = self.combine_score_columns({**scores, **dict.fromkeys(self.deferred_score_max, 0.0)}, columns, gig_obj)
+        upper_bounds = self.combine_score_columns(
+            {**scores, **self.deferred_score_upper_bounds(columns, gig_obj)}, columns, gig_obj
+        )
+        
+        # At least ``limit`` talents are sure to reach the k-th best lower bound,
+        # so nobody whose upper bound is below it can make the top k
+        keep = eligible & (upper_bounds > 3.0)
+        certain = lower_bounds[eligible & (lower_bounds > 3.0)]
+        if len(certain) >= limit:
+            keep &= upper_bounds >= np.partition(certain, len(certain) - limit)[len(certain) - limit]
+        stats.pruned_candidates += int(eligible.sum() - keep.sum())
+        
+        scores.update(self.calculate_deferred_score_columns(columns, gig_obj, keep, db))
+        total_scores = self.combine_score_columns(scores, columns, gig_obj)
+        
+        # Only include available matches with score > 3.0
+        return [
+            (int(i), float(total_scores[i]), {key: float(values[i]) for key, values in scores.items()})
+            for i in top_k_rows(total_scores, keep & (total_scores > 3.0), limit)
+        ]
+    
+    def skill_candidates(self, columns: TalentColumns, gig_obj: Gig) -> Optional[np.ndarray]:
+        """Row mask of talents sharing at least one required skill or skill category"""
+        if not gig_obj.required_skills:
+            return None  # every talent gets the neutral skills score
+        
+        bitset = columns.skill_index.candidates(
+            {skill.id for skill in gig_obj.required_skills},
+            {skill.category for skill in gig_obj.required_skills}
+        )
+        return columns.row_mask(bitset)
+    
+    def find_matches(self, db: Session, gig_id: str, limit: int = 10,
+                     vectorized: Optional[bool] = None,
+                     require_skill_overlap: bool = False,
+                     stats: Optional[MatchStats] = None,
+                     use_cache: bool = True) -> List[MatchResult]:
+        """Find and score talent matches for a gig, recording counters in ``stats`` if given"""
+        start_time = time.time()
+        
+        if vectorized is None:
+            vectorized = settings.vectorized_scoring
+        if stats is None:
+            stats = MatchStats()
+        
+        # Get the gig
+        gig_obj = gig.get(db, gig_id, profile="scoring")
+        if not gig_obj:
+            raise ValueError(f"Gig with id {gig_id} not found")
+        
+        # Nothing changed since the stored results were computed
+        cache_key = self._cache_key(gig_obj, limit, require_skill_overlap)
+        if use_cache and match_cache.lookup(gig_id, cache_key):
+            stats.cache_hit = True
+            return match_result.get_by_gig(db, gig_id, profile="with_talent")
+        
+        columns = self._load_columns(db)
+        rows = self._match_rows(columns, gig_obj, limit, vectorized, require_skill_overlap, stats, db=db)
+        
+        # Apply the changes to the stored matches in one transaction
+        match_run.stage(db, gig_id, type(self).__name__, limit, require_skill_overlap)
+        saved_matches, counts = match_result.sync_for_gig(db, gig_id, rows)
+        self._record_row_counts(stats, counts)
+        match_cache.store(gig_id, cache_key)
         
         processing_time = (time.time() - start_time) * 1000  # Convert to milliseconds
         logger.info(f"Found {len(saved_matches)} matches for gig {gig_id} in {processing_time:.2f}ms")
         
         return saved_matches
     
-    def _is_same_state_or_region(self, location1: str, location2: str) -> bool:
-        """Check if two locations are in the same state/region"""
-        # Simple implementation - in production, use geocoding service
-        common_states = ['mumbai', 'delhi', 'bangalore', 'hyderabad', 'pune', 'chennai', 'kolkata']
+    def find_matches_batch(self, db: Session, gig_ids: Optional[List[str]] = None, limit: int = 10,
+                           vectorized: Optional[bool] = None,
+                           require_skill_overlap: bool = False) -> List[Tuple[Gig, List[MatchResult], MatchStats, float]]:
+        """
+        Find matches for many gigs (every open gig when ``gig_ids`` is None).
+        
+        The talent pool is loaded once and its gig-independent components are
+        scored once; each gig then scores one row of the gigs x talents matrix
+        with its own pruning. All results are persisted in one transaction.
+        Returns (gig, saved matches, stats, scoring time in ms) per gig.
+        """
+        start_time = time.time()
+        
+        if vectorized is None:
+            vectorized = settings.vectorized_scoring
+        
+        if gig_ids is None:
+            gigs = gig.get_open(db, profile="scoring")
+        else:
+            gigs = gig.get_many(db, gig_ids, profile="scoring")
+            missing = set(gig_ids) - {g.id for g in gigs}
+            if missing:
+                raise ValueError(f"Gigs not found: {', '.join(sorted(missing))}")
+        
+        columns = self._load_columns(db)
+        talent_scores = self.calculate_talent_score_columns(columns) if vectorized else None
+        
+        rows_by_gig, stats_by_gig, timings, cache_keys = {}, {}, {}, {}
+        for gig_obj in gigs:
+            gig_start = time.time()
+            stats = stats_by_gig[gig_obj.id] = MatchStats()
+            cache_keys[gig_obj.id] = self._cache_key(gig_obj, limit, require_skill_overlap)
+            if match_cache.lookup(gig_obj.id, cache_keys[gig_obj.id]):
+                stats.cache_hit = True
+                timings[gig_obj.id] = (time.time() - gig_start) * 1000
+                continue
+            rows_by_gig[gig_obj.id] = self._match_rows(
+                columns, gig_obj, limit, vectorized, require_skill_overlap, stats, talent_scores, db
+            )
+            timings[gig_obj.id] = (time.time() - gig_start) * 1000
+            match_run.stage(db, gig_obj.id, type(self).__name__, limit, require_skill_overlap)
+        
+        saved_by_gig, counts_by_gig = match_result.sync_for_gigs(db, rows_by_gig)
+        hit_ids = [gig_obj.id for gig_obj in gigs if gig_obj.id not in rows_by_gig]
+        if hit_ids:
+            saved_by_gig.update(match_result.get_by_gigs(db, hit_ids, profile="with_talent"))
+        
+        results = []
+        for gig_obj in gigs:
+            stats = stats_by_gig[gig_obj.id]
+            if gig_obj.id in counts_by_gig:
+                self._record_row_counts(stats, counts_by_gig[gig_obj.id])
+                match_cache.store(gig_obj.id, cache_keys[gig_obj.id])
+            results.append((gig_obj, saved_by_gig[gig_obj.id], stats, timings[gig_obj.id]))
+        
+        processing_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+        logger.info(f"Matched {len(gigs)} gigs against {columns.size} talents in {processing_time:.2f}ms")
+        
+        return results
+    
+    def find_gigs_for_talent(self, db: Session, talent_id: str, limit: int = 10,
+                             category: Optional[str] = None,
+                             is_remote: Optional[bool] = None,
+                             min_budget: Optional[float] = None,
+                             require_skill_overlap: bool = False,
+                             stats: Optional[MatchStats] = None) -> List[Tuple[float, Any, MatchScoreBreakdown]]:
+        """
+        Live reverse matching: the best ``limit`` open gigs for a talent.
+        
+        Scores follow calculate_match_score exactly. Filters are resolved on
+        the open-gig index (category, required skill, remote flag, budget
+        band), and nothing is persisted. Returns (score, gig, breakdown) with
+        the gig being a GigFeatures record, or a Gig row when the gig store is
+        not loaded.
+        """
+        if stats is None:
+            stats = MatchStats()
+        
+        talent_obj = talent_store.get(talent_id) if talent_store.is_loaded else None
+        if talent_obj is None:
+            talent_obj = talent.get(db, talent_id, profile="scoring")
+        if not talent_obj:
+            raise ValueError(f"Talent with id {talent_id} not found")
+        
+        # Unavailable talents are never matched, as in find_matches
+        if talent_obj.availability_status == 'unavailable':
+            return []
+        
+        columns = self._load_gig_columns(db)
+        index = columns.gig_index
+        eligible = columns.active.copy()
+        if category is not None:
+            eligible &= columns.row_mask(index.bitset('category', category.lower()))
+        if is_remote is not None:
+            eligible &= columns.row_mask(index.bitset('remote', is_remote))
+        if min_budget is not None:
+            eligible &= columns.row_mask(index.budget_at_least(min_budget))
+            eligible &= columns.budget_max >= min_budget
+        if require_skill_overlap:
+            eligible &= self.gig_skill_overlap(talent_obj, columns)
+        stats.candidates_considered += int(eligible.sum())
+        
+        total_scores, scores = self.calculate_gig_match_scores(talent_obj, columns)
+        
+        # Only include matches with score > 3.0
+        matches = []
+        for i in top_k_rows(total_scores, eligible & (total_scores > 3.0), limit):
+            score_breakdown = self._score_breakdown({key: float(values[i]) for key, values in scores.items()})
+            matches.append((float(total_scores[i]), columns.gigs[i], score_breakdown))
+        
+        return matches
+    
+    def gig_skill_overlap(self, talent_obj: Talent, columns: GigColumns) -> np.ndarray:
+        """Row mask of gigs requiring at least one of the talent's skills or skill categories"""
+        index = columns.gig_index
+        return columns.row_mask(
+            index.any_of('skill_name', {s.name.lower() for s in talent_obj.skills})
+            | index.any_of('skill_category', {s.category.lower() for s in talent_obj.skills})
+        )
+    
+    def _open_runs(self, db: Session, columns: GigColumns) -> Dict[str, Any]:
+        """Match runs of this engine on open gigs; closed gigs keep their last results"""
+        return {
+            run.gig_id: run for run in match_run.get_all(db)
+            if run.engine == type(self).__name__ and columns.gig_index.position(run.gig_id) is not None
+        }
+    
+    def _rematch_candidate(self, db: Session, talent_id: str) -> Optional[Talent]:
+        """The changed talent, or None when it was deleted or is unavailable and so qualifies nowhere"""
+        talent_obj = talent_store.get(talent_id) if talent_store.is_loaded else None
+        if talent_obj is None:
+            talent_obj = talent.get(db, talent_id, profile="scoring")
+        if talent_obj is None or talent_obj.availability_status == 'unavailable':
+            return None
+        return talent_obj
+    
+    def rematch_talent(self, db: Session, talent_id: str, gig_ids: Iterable[str] = ()) -> Dict[str, int]:
+        """
+        Fold a changed talent into the stored top-k of every open gig this engine ran.
+        
+        The talent is scored against all open gigs at once and only the gigs
+        whose stored results it enters, moves within or leaves are written.
+        When it leaves a full top-k, or drops below its previous k-th score,
+        a talent outside the stored rows may now qualify, so that gig alone is
+        recomputed. Equal scores keep the stored talents ahead of the changed
+        one. ``gig_ids`` names gigs the talent was stored in whose rows are
+        already gone (a deleted talent); those are recomputed so the freed
+        slot is refilled. Returns counts of touched and recomputed gigs and
+        row changes.
+        """
+        counts = dict.fromkeys(('gigs_touched', 'gigs_recomputed', 'added', 'changed', 'unchanged', 'removed'), 0)
+        columns = self._load_gig_columns(db)
+        runs = self._open_runs(db, columns)
+        if not runs:
+            return counts
+        
+        talent_obj = self._rematch_candidate(db, talent_id)
+        if talent_obj is not None:
+            total_scores, scores = self.calculate_gig_match_scores(talent_obj, columns)
+            eligible = columns.active & (total_scores > 3.0)
+            overlap = self.gig_skill_overlap(talent_obj, columns)
+        else:
+            total_scores, scores = np.zeros(columns.size), {}
+            eligible = overlap = np.zeros(columns.size, dtype=bool)
+        
+        # Only gigs the talent is stored in or can now enter are loaded
+        current = {row.gig_id for row in match_result.get_by_talent(db, talent_id)}
+        vacated = set(gig_ids) - current
+        current |= vacated
+        summary = match_result.summary_by_gig(db, list(runs))
+        touched = {}
+        for gig_id, run in runs.items():
+            row = columns.gig_index.position(gig_id)
+            qualifies = bool(eligible[row]) and (not run.require_skill_overlap or bool(overlap[row]))
+            count, min_score = summary.get(gig_id, (0, None))
+            if gig_id in current or (qualifies and (count < run.match_limit or total_scores[row] > min_score)):
+                touched[gig_id] = (row, qualifies)
+        
+        stored_by_gig = match_result.get_by_gigs(db, list(touched))
+        talent_columns = None
+        for gig_id, (row, qualifies) in touched.items():
+            run = runs[gig_id]
+            gig_obj = columns.gigs[row]
+            stored = stored_by_gig[gig_id]
+            count, min_score = summary.get(gig_id, (0, None))
+            full = count >= run.match_limit
+            
+            if gig_id in vacated or (gig_id in current and full and (not qualifies or total_scores[row] < min_score)):
+                if talent_columns is None:
+                    talent_columns = self._load_columns(db)
+                rows = self._match_rows(
+                    talent_columns, gig_obj, run.match_limit, settings.vectorized_scoring,
+                    run.require_skill_overlap, MatchStats(), db=db
+                )
+                counts['gigs_recomputed'] += 1
+            else:
+                rows = [self._stored_match_data(r) for r in stored if r.talent_id != talent_id]
+                if qualifies:
+                    score_breakdown = self._score_breakdown({key: float(values[row]) for key, values in scores.items()})
+                    rows.append(self._build_match_data(gig_obj, talent_obj, float(total_scores[row]), score_breakdown))
+                rows.sort(key=lambda match_data: -match_data['match_score'])
+                rows = rows[:run.match_limit]
+                for i, match_data in enumerate(rows):
+                    match_data['ranking'] = i + 1
+            
+            gig_counts = match_result.diff_for_gig(db, gig_id, rows)
+            match_cache.invalidate_gig(gig_id)
+            counts['gigs_touched'] += 1
+            for key, value in gig_counts.items():
+                counts[key] += value
+        
+        db.commit()
+        return counts
+    
+    def rematch_gig(self, db: Session, gig_id: str) -> Optional[List[MatchResult]]:
+        """Recompute a changed gig's stored results with its last run's parameters, if it has any"""
+        run = match_run.get(db, gig_id)
+        gig_obj = gig.get(db, gig_id)
+        if run is None or gig_obj is None or gig_obj.status != "open":
+            return None
+        return self.find_matches(db, gig_id, run.match_limit, require_skill_overlap=run.require_skill_overlap)
+    
+    def _cache_key(self, gig_obj: Gig, limit: int, require_skill_overlap: bool) -> Tuple:
+        return (gig_obj.updated_at, match_cache.pool_version, type(self).__name__, limit, require_skill_overlap)
+    
+    def _stored_match_data(self, row: MatchResult) -> Dict[str, Any]:
+        """A stored match result in the shape _build_match_data produces"""
+        return {
+            'gig_id': row.gig_id,
+            'talent_id': row.talent_id,
+            'match_score': row.match_score,
+            'ranking': row.ranking,
+            'location_score': row.location_score,
+            'budget_score': row.budget_score,
+            'skill_score': row.skill_score,
+            'experience_score': row.experience_score,
+            'availability_score': row.availability_score,
+            'portfolio_score': row.portfolio_score,
+            'rating_score': row.rating_score,
+            'match_explanation': row.match_explanation
+        }
+    
+    def _load_gig_columns(self, db: Session) -> GigColumns:
+        # Open gigs come from the resident gig store when it is loaded
+        if gig_store.is_loaded:
+            return gig_store.columns()
+        return GigColumns.from_gigs(gig.get_open(db, profile="scoring"))
+    
+    def _load_columns(self, db: Session) -> TalentColumns:
+        # Candidates come from the resident feature store when it is loaded
+        if talent_store.is_loaded:
+            return talent_store.columns()
+        talents = talent.get_multi(db, limit=1000, profile="scoring")  # Get more talents for better matching
+        return TalentColumns.from_talents(talents)
+    
+    def _rank_talents(self, columns: TalentColumns, gig_obj: Gig, limit: int, vectorized: bool,
+                      require_skill_overlap: bool, stats: MatchStats,
+                      talent_scores: Optional[Dict[str, np.ndarray]] = None,
+                      db: Optional[Session] = None
+                      ) -> List[Tuple[float, Talent, MatchScoreBreakdown]]:
+        """Top ``limit`` matches of a gig in ``columns``, sorted by score descending"""
+        candidates = self.skill_candidates(columns, gig_obj) if require_skill_overlap else None
+        
+        if vectorized and scoring_pool.should_shard(columns):
+            return self._score_talents_parallel(columns, gig_obj, limit, stats, require_skill_overlap)
+        if vectorized:
+            return self._score_talents_vectorized(columns, gig_obj, limit, stats, candidates, talent_scores, db)
         
-        for state in common_states:
-            if state in location1.lower() and state in location2.lower():
-                return True
+        talents = columns.talents
+        if candidates is not None:
+            talents = [t for t, keep in zip(talents, candidates) if keep]
+        return self._score_talents(talents, gig_obj, limit, stats, db)
+    
+    def _match_rows(self, columns: TalentColumns, gig_obj: Gig, limit: int, vectorized: bool,
+                    require_skill_overlap: bool, stats: MatchStats,
+                    talent_scores: Optional[Dict[str, np.ndarray]] = None,
+                    db: Optional[Session] = None) -> List[Dict[str, Any]]:
+        """
+        Score a gig against ``columns`` and build the ranked MatchResult rows
+        for its top matches; embedding lookups go through ``db`` when given.
+        """
+        matches = self._rank_talents(
+            columns, gig_obj, limit, vectorized, require_skill_overlap, stats, talent_scores, db
+        )
         
-        return False
+        # Explain only the survivors
+        rows = []
+        for i, (match_score, talent_obj, score_breakdown) in enumerate(matches):
+            match_data = self._build_match_data(gig_obj, talent_obj, match_score, score_breakdown)
+            match_data['ranking'] = i + 1
+            rows.append(match_data)
+        return rows
     
-    def _is_same_country(self, location1: str, location2: str) -> bool:
-        """Check if two locations are in the same country"""
-        # Simple implementation - assume all locations are in India unless specified
-        return True
+    def _record_row_counts(self, stats: MatchStats, counts: Dict[str, int]) -> None:
+        stats.rows_added += counts['added']
+        stats.rows_changed += counts['changed']
+        stats.rows_unchanged += counts['unchanged']
+        stats.rows_removed += counts['removed']
 
 
 # AI-powered matching (optional enhancement)
 class AIMatchmakingEngine(MatchmakingEngine):
+    """
+    Matchmaking with semantic portfolio similarity.
+    
+    The sentence-transformers model is not loaded at import: ``start_loading``
+    loads it in a background thread (at startup when ``ai_model_preload`` is
+    set, otherwise on the first AI request) and ``use_embeddings`` becomes
+    True once it is ready. Until then the engine scores like the rule-based
+    engine.
+    """
+    
     def __init__(self):
         super().__init__()
         self.use_embeddings = False
+        self.model = None
+        self.model_name = 'all-MiniLM-L6-v2'
+        self._item_matrix: Optional[Tuple[TalentColumns, np.ndarray, Optional[np.ndarray], np.ndarray]] = None
+        self._load_lock = threading.Lock()
+        self._loader: Optional[threading.Thread] = None
+        self._loaded = threading.Event()  # set once loading finished, successfully or not
+        
+        # First stage of retrieve-then-rerank: plain rule-based scoring
+        self.retriever = MatchmakingEngine()
+    
+    @property
+    def model_status(self) -> str:
+        if self.use_embeddings:
+            return "ready"
+        if self._loaded.is_set():
+            return "unavailable"
+        return "loading" if self._loader is not None else "not_loaded"
+    
+    def start_loading(self) -> None:
+        """Load the model in a background thread, once"""
+        with self._load_lock:
+            if self._loader is None:
+                self._loader = threading.Thread(target=self._load_model, name="ai-model-loader", daemon=True)
+                self._loader.start()
+    
+    def ensure_model(self, timeout: Optional[float] = None) -> bool:
+        """
+        Start loading the model if needed and wait up to ``timeout`` seconds
+        (None waits until loading finishes); returns whether it is ready.
+        """
+        if not self.use_embeddings:
+            self.start_loading()
+            if timeout is None or timeout > 0:
+                self._loaded.wait(timeout)
+        return self.use_embeddings
+    
+    def _load_model(self) -> None:
+        start_time = time.time()
         try:
             from sentence_transformers import SentenceTransformer
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
+            self.model = SentenceTransformer(self.model_name)
+            embedding_store.configure(self.model_name, self.model.encode)
             self.use_embeddings = True
+            logger.info(f"Loaded {self.model_name} in {(time.time() - start_time) * 1000:.2f}ms")
         except ImportError:
             logger.warning("sentence-transformers not available, falling back to rule-based matching")
+        except Exception as e:
+            logger.error(f"Error loading {self.model_name}: {e}")
+        finally:
+            self._loaded.set()
+    
+    def _cache_key(self, gig_obj: Gig, limit: int, require_skill_overlap: bool) -> Tuple:
+        # Results computed before the model was ready are rule-based
+        return super()._cache_key(gig_obj, limit, require_skill_overlap) + (self.use_embeddings,)
     
     def calculate_semantic_similarity(self, text1: str, text2: str) -> float:
         """Calculate semantic similarity between two texts"""
@@ -360,38 +1191,253 @@ class AIMatchmakingEngine(MatchmakingEngine):
             return 0.0
         
         try:
-            embeddings = self.model.encode([text1, text2])
-            from sklearn.metrics.pairwise import cosine_similarity
-            similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
-            return float(similarity)
+            # Rows come back normalized, so cosine similarity is their dot product
+            embeddings = embedding_store.encode([text1, text2])
+            return float(np.dot(embeddings[0], embeddings[1]))
         except Exception as e:
             logger.error(f"Error calculating semantic similarity: {e}")
             return 0.0
     
-    def calculate_enhanced_portfolio_score(self, talent: Talent, gig: Gig) -> float:
+    def aggregate_semantic_scores(self, semantic_scores: List[float]) -> float:
+        if settings.semantic_aggregation == "max":
+            return max(semantic_scores)
+        return sum(semantic_scores) / len(semantic_scores)
+    
+    def calculate_enhanced_portfolio_score(self, talent: Talent, gig: Gig, db: Optional[Session] = None) -> float:
         """Enhanced portfolio scoring with AI"""
         base_score = super().calculate_portfolio_score(talent, gig)
         
         if not self.use_embeddings or not talent.portfolio_items:
             return base_score
         
-        # Semantic similarity bonus
+        # Semantic similarity bonus: stored embeddings are normalized, so cosine is a dot product
+        gig_vector = embedding_store.vector(db, "gig", gig.id, gig.description)
+        items = [item for item in talent.portfolio_items[:5] if item.description]
+        item_vectors = embedding_store.vectors(db, "portfolio_item", [(item.id, item.description) for item in items])
         semantic_scores = []
-        for item in talent.portfolio_items[:5]:
-            if item.description:
-                similarity = self.calculate_semantic_similarity(
-                    item.description,
-                    gig.description
-                )
-                semantic_scores.append(similarity * 5)  # Scale to 0-5
+        if gig_vector is not None:
+            for item in items:
+                if item.id in item_vectors:
+                    similarity = float(np.dot(item_vectors[item.id], gig_vector))
+                    semantic_scores.append(similarity * 5)  # Scale to 0-5
         
         if semantic_scores:
-            semantic_bonus = sum(semantic_scores) / len(semantic_scores)
+            # Dissimilar portfolios add nothing: deferred scores must not drop below
+            # the rule-based score, which the pruning lower bounds assume
+            semantic_bonus = max(self.aggregate_semantic_scores(semantic_scores), 0.0)
             return min(base_score + semantic_bonus, 10.0)
         
         return base_score
+    
+    def calculate_deferred_scores(self, talent: Talent, gig: Gig, db: Optional[Session] = None) -> Dict[str, float]:
+        return {
+            'portfolio': self.calculate_enhanced_portfolio_score(talent, gig, db)
+        }
+    
+    def portfolio_item_matrix(self, columns: TalentColumns,
+                              db: Optional[Session] = None) -> Tuple[np.ndarray, Optional[np.ndarray], np.ndarray]:
+        """
+        Embeddings of the scored portfolio items of ``columns``, stacked.
+        
+        Row i of the matrix is the normalized vector of item i of the
+        flattened item arrays (zeros where the item has no description or no
+        embedding), held in the embedding store's precision. Returned with
+        the per-row scales (None for float formats) and the mask of items
+        that have a vector. Built once per columns snapshot.
+        """
+        cached = self._item_matrix
+        if cached is not None and cached[0] is columns:
+            return cached[1:]
+        
+        vectors = embedding_store.vectors(db, "portfolio_item", zip(columns.item_ids, columns.item_descriptions))
+        dimensions = len(next(iter(vectors.values()))) if vectors else 0
+        matrix, scale = quantize(np.zeros((len(columns.item_ids), dimensions)), embedding_store.precision)
+        has_vector = np.zeros(len(columns.item_ids), dtype=bool)
+        for item_idx, item_id in enumerate(columns.item_ids):
+            vector = vectors.get(item_id)
+            if vector is not None:
+                row, row_scale = quantize(vector, embedding_store.precision)
+                matrix[item_idx] = row
+                if scale is not None:
+                    scale[item_idx] = row_scale
+                has_vector[item_idx] = True
+        
+        self._item_matrix = (columns, matrix, scale, has_vector)
+        return matrix, scale, has_vector
+    
+    def calculate_semantic_bonus_scores(self, columns: TalentColumns, gig: Gig, items: Optional[np.ndarray] = None,
+                                        db: Optional[Session] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized semantic bonus (0-5, negative similarity clamped to 0) of
+        every talent, and which talents have one.
+        
+        One matrix-vector product scores every embedded item against the gig
+        (on the quantized matrix when a lower precision is configured);
+        item scores are then aggregated per talent with bincount (mean) or
+        maximum.at (max). ``items`` restricts the work to a mask of items.
+        """
+        bonus = np.zeros(columns.size)
+        has_bonus = np.zeros(columns.size, dtype=bool)
+        gig_vector = embedding_store.vector(db, "gig", gig.id, gig.description)
+        if gig_vector is None or not columns.item_ids:
+            return bonus, has_bonus
+        
+        matrix, scale, has_vector = self.portfolio_item_matrix(columns, db)
+        scored = np.flatnonzero(has_vector if items is None else has_vector & items)
+        if not len(scored):
+            return bonus, has_bonus
+        
+        similarities = quantized_dot(matrix[scored], None if scale is None else scale[scored], gig_vector)
+        item_scores = similarities.astype(np.float64) * 5  # Scale to 0-5
+        item_rows = columns.item_talent[scored]
+        counts = np.bincount(item_rows, minlength=columns.size)
+        has_bonus = counts > 0
+        if settings.semantic_aggregation == "max":
+            best = np.full(columns.size, -np.inf)
+            np.maximum.at(best, item_rows, item_scores)
+            bonus[has_bonus] = best[has_bonus]
+        else:
+            sums = np.bincount(item_rows, weights=item_scores, minlength=columns.size)
+            bonus[has_bonus] = sums[has_bonus] / counts[has_bonus]
+        # Negative similarity earns no bonus, as in the scalar path
+        return np.maximum(bonus, 0.0), has_bonus
+    
+    def semantic_candidates(self, gig: Gig, n: int, db: Optional[Session] = None) -> List[str]:
+        """Ids of up to ``n`` talents with the portfolio items closest to the gig description, best first"""
+        if not self.use_embeddings or n <= 0:
+            return []
+        gig_vector = embedding_store.vector(db, "gig", gig.id, gig.description)
+        if gig_vector is None:
+            return []
+        if not portfolio_index.is_loaded:
+            portfolio_index.load_or_build(db)
+        return [talent_id for talent_id, _ in portfolio_index.nearest_owners(gig_vector, n)]
+    
+    def deferred_score_upper_bounds(self, columns: TalentColumns, gig: Gig) -> Dict[str, Any]:
+        # The semantic bonus can lift any talent's portfolio score, term hits or not
+        if self.use_embeddings:
+            return self.deferred_score_max
+        return super().deferred_score_upper_bounds(columns, gig)
+    
+    def calculate_deferred_score_columns(self, columns: TalentColumns, gig: Gig, rows: Optional[np.ndarray] = None,
+                                         db: Optional[Session] = None) -> Dict[str, np.ndarray]:
+        scores = super().calculate_deferred_score_columns(columns, gig, rows, db)
+        if not self.use_embeddings:
+            return scores
+        
+        items = None if rows is None else rows[columns.item_talent]
+        bonus, has_bonus = self.calculate_semantic_bonus_scores(columns, gig, items, db)
+        scores['portfolio'] = np.where(has_bonus, np.minimum(scores['portfolio'] + bonus, 10.0), scores['portfolio'])
+        return scores
+    
+    def rematch_talent(self, db: Session, talent_id: str, gig_ids: Iterable[str] = ()) -> Dict[str, int]:
+        """
+        Fold a changed talent into the stored results of every open gig this engine ran.
+        
+        Semantic scores are not computed gig-side, so the talent's exact score
+        is unknown here; instead every run it is stored in, or could enter
+        with its portfolio component at the maximum, is recomputed in full.
+        Without the model this engine scores like the rule-based one and the
+        incremental fold applies.
+        """
+        if not self.use_embeddings:
+            return super().rematch_talent(db, talent_id, gig_ids)
+        
+        counts = dict.fromkeys(('gigs_touched', 'gigs_recomputed', 'added', 'changed', 'unchanged', 'removed'), 0)
+        columns = self._load_gig_columns(db)
+        runs = self._open_runs(db, columns)
+        if not runs:
+            return counts
+        
+        talent_obj = self._rematch_candidate(db, talent_id)
+        if talent_obj is not None:
+            total_scores, scores = self.calculate_gig_match_scores(talent_obj, columns)
+            headroom = self.score_weights['portfolio'] * (self.deferred_score_max['portfolio'] - scores['portfolio'])
+            upper_bounds = np.minimum(total_scores + headroom, 10.0) + 1e-9  # margin for float rounding
+            eligible = columns.active & (upper_bounds > 3.0)
+            overlap = self.gig_skill_overlap(talent_obj, columns)
+        else:
+            upper_bounds = np.zeros(columns.size)
+            eligible = overlap = np.zeros(columns.size, dtype=bool)
+        
+        current = {row.gig_id for row in match_result.get_by_talent(db, talent_id)} | set(gig_ids)
+        summary = match_result.summary_by_gig(db, list(runs))
+        for gig_id, run in runs.items():
+            row = columns.gig_index.position(gig_id)
+            qualifies = bool(eligible[row]) and (not run.require_skill_overlap or bool(overlap[row]))
+            count, min_score = summary.get(gig_id, (0, None))
+            if gig_id in current or (qualifies and (count < run.match_limit or upper_bounds[row] > min_score)):
+                stats = MatchStats()
+                self.find_matches(db, gig_id, run.match_limit, require_skill_overlap=run.require_skill_overlap,
+                                  stats=stats, use_cache=False)
+                counts['gigs_touched'] += 1
+                counts['gigs_recomputed'] += 1
+                counts['added'] += stats.rows_added
+                counts['changed'] += stats.rows_changed
+                counts['unchanged'] += stats.rows_unchanged
+                counts['removed'] += stats.rows_removed
+        return counts
+    
+    def _rank_talents(self, columns: TalentColumns, gig_obj: Gig, limit: int, vectorized: bool,
+                      require_skill_overlap: bool, stats: MatchStats,
+                      talent_scores: Optional[Dict[str, np.ndarray]] = None,
+                      db: Optional[Session] = None
+                      ) -> List[Tuple[float, Talent, MatchScoreBreakdown]]:
+        """
+        Retrieve then rerank.
+        
+        The rule-based engine scores the whole pool and keeps a shortlist of
+        ``rerank_shortlist_size`` talents (at least ``limit``), to which the
+        portfolio ANN index adds up to ``semantic_candidate_count`` talents;
+        only the shortlist is rescored with semantic portfolio similarity.
+        Talents neither stage retrieves are never reranked, so larger
+        shortlists trade latency for recall. Stage sizes and timings go into
+        ``stats``.
+        """
+        if not self.use_embeddings:
+            return super()._rank_talents(
+                columns, gig_obj, limit, vectorized, require_skill_overlap, stats, talent_scores, db
+            )
+        
+        retrieve_start = time.time()
+        considered = stats.candidates_considered
+        shortlist = self.retriever._rank_talents(
+            columns, gig_obj, max(settings.rerank_shortlist_size, limit), vectorized,
+            require_skill_overlap, stats, talent_scores, db
+        )
+        stats.retrieve_candidates += stats.candidates_considered - considered
+        talents = [talent_obj for _, talent_obj, _ in shortlist]
+        
+        # Talents whose portfolio is semantically close join the shortlist even
+        # when their rule-based score left them out
+        shortlisted = {talent_obj.id for talent_obj in talents}
+        rows = columns.rows_of(
+            talent_id for talent_id in self.semantic_candidates(gig_obj, settings.semantic_candidate_count, db)
+            if talent_id not in shortlisted
+        )
+        eligible = columns.availability[rows] != UNAVAILABLE
+        candidates = self.skill_candidates(columns, gig_obj) if require_skill_overlap else None
+        if candidates is not None:
+            eligible &= candidates[rows]
+        talents.extend(columns.talents[row] for row in rows[eligible])
+        stats.semantic_candidates += int(eligible.sum())
+        stats.retrieve_time_ms += (time.time() - retrieve_start) * 1000
+        
+        rerank_start = time.time()
+        rerank_stats = MatchStats()
+        if vectorized:
+            shortlist_columns = TalentColumns.from_talents(talents, columns.skill_index, columns.term_index)
+            matches = self._score_talents_vectorized(shortlist_columns, gig_obj, limit, rerank_stats, db=db)
+        else:
+            matches = self._score_talents(talents, gig_obj, limit, rerank_stats, db)
+        stats.rerank_candidates += len(talents)
+        stats.rerank_time_ms += (time.time() - rerank_start) * 1000
+        return matches
 
 
 # Create instances
 rule_based_engine = MatchmakingEngine()
 ai_engine = AIMatchmakingEngine()
+
+# Engines by class name, for scoring worker processes
+engines = {type(engine).__name__: engine for engine in (rule_based_engine, ai_engine)}
@@ -0,0 +1,178 @@
+import pickle
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.services.columnar import TalentColumns
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Snapshots kept exported (parent) or attached (workers); older ones are released
+KEPT_SNAPSHOTS = 2
+
+
+class SharedColumns:
+    """
+    A TalentColumns snapshot exported to shared memory.
+
+    Every NumPy array gets its own block; everything else (vocabularies,
+    skill index, ids) is pickled once into one more block. Workers receive
+    only ``handle``, a small dict of block names, so the pool is copied once
+    per snapshot rather than pickled into every task. Talent objects stay in
+    the parent; workers report rows by position.
+    """
+
+    def __init__(self, columns: TalentColumns):
+        self.id = uuid.uuid4().hex
+        self._blocks: List[shared_memory.SharedMemory] = []
+        arrays, meta = {}, {}
+        for name, value in vars(columns).items():
+            if name == 'talents':
+                continue
+            if isinstance(value, np.ndarray):
+                block = self._block(max(value.nbytes, 1))
+                np.ndarray(value.shape, dtype=value.dtype, buffer=block.buf)[...] = value
+                arrays[name] = (block.name, value.dtype.str, value.shape)
+            else:
+                meta[name] = value
+        payload = pickle.dumps(meta, protocol=pickle.HIGHEST_PROTOCOL)
+        block = self._block(len(payload))
+        block.buf[:len(payload)] = payload
+        self.handle = {'id': self.id, 'arrays': arrays, 'meta': (block.name, len(payload))}
+
+    def _block(self, size: int) -> shared_memory.SharedMemory:
+        block = shared_memory.SharedMemory(create=True, size=size)
+        self._blocks.append(block)
+        return block
+
+    def release(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+# Worker side: snapshots attached by this process, most recent last
+_attached: Dict[str, Tuple[TalentColumns, List[shared_memory.SharedMemory]]] = {}
+
+
+def _attach(handle: Dict) -> TalentColumns:
+    attached = _attached.get(handle['id'])
+    if attached is not None:
+        return attached[0]
+
+    blocks = []
+    meta_name, meta_size = handle['meta']
+    block = shared_memory.SharedMemory(name=meta_name)
+    blocks.append(block)
+    columns = TalentColumns.__new__(TalentColumns)
+    columns.__dict__.update(pickle.loads(bytes(block.buf[:meta_size])))
+    for name, (block_name, dtype, shape) in handle['arrays'].items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        setattr(columns, name, np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf))
+    columns.talents = columns.ids  # rows are reported by position; talent objects stay in the parent
+
+    _attached[handle['id']] = (columns, blocks)
+    while len(_attached) > KEPT_SNAPSHOTS:
+        old_columns, old_blocks = _attached.pop(next(iter(_attached)))
+        del old_columns  # drop the array views before closing their blocks
+        for old_block in old_blocks:
+            try:
+                old_block.close()
+            except BufferError:
+                pass  # still referenced; released when the worker exits
+    return columns
+
+
+def score_shard(handle: Dict, engine_name: str, gig_features, start: int, stop: int, limit: int,
+                require_skill_overlap: bool) -> Tuple[List[Tuple[int, float, Dict[str, float]]], int, int]:
+    """
+    Worker entry point: top ``limit`` rows of one shard of the pool.
+
+    Returns (pool row, total score, component scores) for the shard's best
+    rows plus its candidates_considered and pruned_candidates counts.
+    """
+    from app.schemas.schemas import MatchStats
+    from app.services.matchmaking import engines
+
+    engine = engines[engine_name]
+    shard = _attach(handle).shard(start, stop)
+    stats = MatchStats()
+    candidates = engine.skill_candidates(shard, gig_features) if require_skill_overlap else None
+    selected = engine._select_rows_vectorized(shard, gig_features, limit, stats, candidates)
+    return [(start + row, score, scores) for row, score, scores in selected], \
+        stats.candidates_considered, stats.pruned_candidates
+
+
+class ShardedScoringPool:
+    """
+    Process pool that scores large talent pools in shards.
+
+    Configured by ``scoring_workers`` (0 disables it) and
+    ``parallel_scoring_threshold``, the pool size below which scoring stays
+    in-process. The executor and shared-memory snapshots are created lazily.
+    """
+
+    def __init__(self, workers: int = 0, threshold: int = 50000):
+        self.workers = workers
+        self.threshold = threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._exported: Dict[int, Tuple[TalentColumns, SharedColumns]] = {}
+        self._lock = threading.Lock()
+
+    def should_shard(self, columns: TalentColumns) -> bool:
+        return self.workers > 1 and columns.size >= self.threshold
+
+    def _export(self, columns: TalentColumns) -> Dict:
+        """Handle of the snapshot's shared copy, exporting it on first use"""
+        with self._lock:
+            exported = self._exported.get(id(columns))
+            if exported is None or exported[0] is not columns:
+                exported = self._exported[id(columns)] = (columns, SharedColumns(columns))
+                while len(self._exported) > KEPT_SNAPSHOTS:
+                    _, old = self._exported.pop(next(iter(self._exported)))
+                    old.release()
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return exported[1].handle
+
+    def score(self, engine_name: str, columns: TalentColumns, gig_features, limit: int,
+              require_skill_overlap: bool) -> Tuple[List[Tuple[int, float, Dict[str, float]]], int, int]:
+        """Score every shard in the pool and merge the per-shard top-k lists into the global top-k"""
+        handle = self._export(columns)
+        bounds = np.linspace(0, columns.size, self.workers + 1).astype(int)
+        futures = [
+            self._executor.submit(
+                score_shard, handle, engine_name, gig_features, int(start), int(stop), limit, require_skill_overlap
+            )
+            for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start
+        ]
+
+        selected, considered, pruned = [], 0, 0
+        for future in futures:
+            shard_selected, shard_considered, shard_pruned = future.result()
+            selected.extend(shard_selected)
+            considered += shard_considered
+            pruned += shard_pruned
+
+        # Same order as a single top_k_rows over the whole pool: score, then row
+        selected.sort(key=lambda entry: (-entry[1], entry[0]))
+        return selected[:limit], considered, pruned
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+            for _, shared in self._exported.values():
+                shared.release()
+            self._exported = {}
+
+
+# Create instance
+scoring_pool = ShardedScoringPool(settings.scoring_workers, settings.parallel_scoring_threshold)
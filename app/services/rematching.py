@@ -0,0 +1,42 @@
+from typing import Iterable
+from app.core.database import SessionLocal
+from app.crud.crud import match_run
+from app.services.matchmaking import engines, rule_based_engine
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Background tasks scheduled by the API when incremental re-matching is enabled.
+# Each opens its own session: the request's session is closed by the time they run.
+# Stored results are maintained by the engine that produced them (MatchRun.engine).
+
+def rematch_talent(talent_id: str, gig_ids: Iterable[str] = ()) -> None:
+    """
+    Fold a changed talent into the stored results of every open gig; for a
+    deleted talent, ``gig_ids`` are the gigs it was stored in
+    """
+    db = SessionLocal()
+    try:
+        for name, engine in engines.items():
+            counts = engine.rematch_talent(db, talent_id, gig_ids)
+            logger.info(f"Incremental rematch of talent {talent_id} ({name}): {counts}")
+    except Exception:
+        logger.exception(f"Incremental rematch of talent {talent_id} failed")
+    finally:
+        db.close()
+
+
+def rematch_gig(gig_id: str) -> None:
+    """Recompute the stored results of a changed gig"""
+    db = SessionLocal()
+    try:
+        run = match_run.get(db, gig_id)
+        engine = engines.get(run.engine, rule_based_engine) if run is not None else rule_based_engine
+        matches = engine.rematch_gig(db, gig_id)
+        if matches is not None:
+            logger.info(f"Incremental rematch of gig {gig_id}: {len(matches)} matches")
+    except Exception:
+        logger.exception(f"Incremental rematch of gig {gig_id} failed")
+    finally:
+        db.close()
@@ -0,0 +1,118 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+def bitset_to_array(bitset: int, size: int) -> np.ndarray:
+    """Expand a Python int bitset into a boolean array of ``size`` positions."""
+    raw = bitset.to_bytes((size + 7) // 8, 'little')
+    return np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder='little')[:size].astype(bool)
+
+
+class SkillIndex:
+    """
+    Inverted index from skill id and skill category to talent bitsets.
+
+    Every indexed talent owns a bit position; each skill id and each
+    (lowercased) category maps to a Python int with the bits of the talents
+    that have it set. Candidate generation is an OR over bitsets and overlap
+    counts for all talents are sums over the expanded bitsets, so neither
+    touches per-talent skill lists.
+    """
+
+    def __init__(self):
+        self._positions: Dict[str, int] = {}
+        self._free: List[int] = []
+        self.size = 0  # highest position handed out + 1
+        self._by_skill: Dict[str, int] = {}
+        self._by_category: Dict[str, int] = {}
+        self._ids_by_name: Dict[str, Set[str]] = {}
+        self._talent_keys: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+
+    @classmethod
+    def from_talents(cls, talents: Iterable) -> "SkillIndex":
+        index = cls()
+        for t in talents:
+            index.add(t.id, t.skills)
+        return index
+
+    def copy(self) -> "SkillIndex":
+        """Point-in-time copy; bitsets are immutable ints so this is cheap."""
+        index = SkillIndex()
+        index._positions = dict(self._positions)
+        index._free = list(self._free)
+        index.size = self.size
+        index._by_skill = dict(self._by_skill)
+        index._by_category = dict(self._by_category)
+        index._ids_by_name = {name: set(ids) for name, ids in self._ids_by_name.items()}
+        index._talent_keys = dict(self._talent_keys)
+        return index
+
+    def position(self, talent_id: str) -> Optional[int]:
+        return self._positions.get(talent_id)
+
+    def add(self, talent_id: str, skills: Sequence) -> None:
+        """Index a talent's skills, replacing any previous entry for it"""
+        self.remove(talent_id, release=False)
+
+        position = self._positions.get(talent_id)
+        if position is None:
+            position = self._free.pop() if self._free else self.size
+            self._positions[talent_id] = position
+            self.size = max(self.size, position + 1)
+
+        bit = 1 << position
+        skill_ids = tuple({s.id for s in skills})
+        categories = tuple({s.category.lower() for s in skills})
+        for s in skills:
+            self._ids_by_name.setdefault(s.name.lower(), set()).add(s.id)
+        for skill_id in skill_ids:
+            self._by_skill[skill_id] = self._by_skill.get(skill_id, 0) | bit
+        for category in categories:
+            self._by_category[category] = self._by_category.get(category, 0) | bit
+        self._talent_keys[talent_id] = (skill_ids, categories)
+
+    def remove(self, talent_id: str, release: bool = True) -> None:
+        position = self._positions.get(talent_id)
+        if position is None:
+            return
+
+        clear = ~(1 << position)
+        skill_ids, categories = self._talent_keys.pop(talent_id, ((), ()))
+        for skill_id in skill_ids:
+            self._by_skill[skill_id] &= clear
+        for category in categories:
+            self._by_category[category] &= clear
+
+        if release:
+            del self._positions[talent_id]
+            self._free.append(position)
+
+    def skill_bitset(self, skill_id: str) -> int:
+        return self._by_skill.get(skill_id, 0)
+
+    def category_bitset(self, category: str) -> int:
+        return self._by_category.get(category.lower(), 0)
+
+    def name_bitset(self, name: str) -> int:
+        """Talents having any skill whose lowercased name is ``name``"""
+        bitset = 0
+        for skill_id in self._ids_by_name.get(name, ()):
+            bitset |= self._by_skill.get(skill_id, 0)
+        return bitset
+
+    def candidates(self, skill_ids: Iterable[str] = (), categories: Iterable[str] = ()) -> int:
+        """Talents sharing at least one of the skills or categories"""
+        bitset = 0
+        for skill_id in skill_ids:
+            bitset |= self.skill_bitset(skill_id)
+        for category in categories:
+            bitset |= self.category_bitset(category)
+        return bitset
+
+    def count_bits(self, bitsets: Iterable[int]) -> np.ndarray:
+        """Number of the given bitsets each position is set in"""
+        counts = np.zeros(self.size, dtype=np.int64)
+        for bitset in bitsets:
+            if bitset:
+                counts += bitset_to_array(bitset, self.size)
+        return counts
@@ -0,0 +1,137 @@
+import numpy as np
+from typing import Any, Dict, Iterable, List, Tuple
+from app.services.tokens import tokens_of
+
+# Portfolio item fields indexed, with the gig text each is matched against
+FIELDS = (
+    'project_type',    # item.project_type lowercased, against gig.category
+    'style_keywords',  # token ids, against the tokens of gig.style_preferences
+    'tags',            # token ids, against the tokens of gig.description
+)
+
+
+def item_terms(item) -> Dict[str, Tuple]:
+    """Index terms of a portfolio item for every field"""
+    return {
+        'project_type': (item.project_type.lower(),) if item.project_type else (),
+        'style_keywords': tuple(tokens_of(item, 'style_keywords')),
+        'tags': tuple(tokens_of(item, 'tags')),
+    }
+
+
+def gig_terms(gig) -> Dict[str, Tuple]:
+    """Terms of a gig to look up in each field"""
+    return {
+        'project_type': (gig.category.lower(),) if gig.category else (),
+        'style_keywords': tuple(tokens_of(gig, 'style_preferences')),
+        'tags': tuple(tokens_of(gig, 'description')),
+    }
+
+
+class PortfolioTermIndex:
+    """
+    Inverted index from portfolio terms to portfolio items.
+
+    Every indexed item owns a position, like talents in SkillIndex; for each
+    field in FIELDS a term maps to a posting list, a NumPy array of the
+    positions of the items having it. ``hit_masks`` answers which items
+    match a gig on each field of the portfolio score with one lookup per gig
+    term, so neither candidate generation nor the portfolio component scans
+    every talent's items.
+
+    Posting arrays are replaced, never modified in place, so ``copy`` can
+    share them with the snapshot it returns.
+    """
+
+    def __init__(self):
+        self._positions: Dict[str, int] = {}
+        self._free: List[int] = []
+        self.size = 0  # highest position handed out + 1
+        self._postings: Dict[str, Dict[Any, np.ndarray]] = {field: {} for field in FIELDS}
+        self._item_terms: Dict[str, Dict[str, Tuple]] = {}
+
+    @classmethod
+    def from_items(cls, items: Iterable) -> "PortfolioTermIndex":
+        index = cls()
+        postings: Dict[str, Dict[Any, List[int]]] = {field: {} for field in FIELDS}
+        for item in items:
+            if item.id in index._positions:
+                continue
+            position = index._positions[item.id] = index.size
+            index.size += 1
+            terms = index._item_terms[item.id] = item_terms(item)
+            for field, keys in terms.items():
+                for key in keys:
+                    postings[field].setdefault(key, []).append(position)
+        for field, lists in postings.items():
+            index._postings[field] = {key: np.array(positions, dtype=np.int64) for key, positions in lists.items()}
+        return index
+
+    def copy(self) -> "PortfolioTermIndex":
+        """Point-in-time copy; posting arrays are shared"""
+        index = PortfolioTermIndex()
+        index._positions = dict(self._positions)
+        index._free = list(self._free)
+        index.size = self.size
+        index._postings = {field: dict(postings) for field, postings in self._postings.items()}
+        index._item_terms = dict(self._item_terms)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._item_terms)
+
+    def position(self, item_id: str) -> int:
+        """Position of an item; -1 when it is not indexed"""
+        return self._positions.get(item_id, -1)
+
+    def add(self, item) -> None:
+        """Index a portfolio item, replacing any previous entry for it"""
+        self.remove(item.id, release=False)
+
+        position = self._positions.get(item.id)
+        if position is None:
+            position = self._free.pop() if self._free else self.size
+            self._positions[item.id] = position
+            self.size = max(self.size, position + 1)
+
+        terms = self._item_terms[item.id] = item_terms(item)
+        for field, keys in terms.items():
+            postings = self._postings[field]
+            for key in keys:
+                posting = postings.get(key)
+                postings[key] = np.array([position], dtype=np.int64) if posting is None else np.append(posting, position)
+
+    def remove(self, item_id: str, release: bool = True) -> None:
+        position = self._positions.get(item_id)
+        if position is None:
+            return
+
+        for field, keys in self._item_terms.pop(item_id, {}).items():
+            postings = self._postings[field]
+            for key in keys:
+                posting = postings[key][postings[key] != position]
+                if len(posting):
+                    postings[key] = posting
+                else:
+                    del postings[key]
+
+        if release:
+            del self._positions[item_id]
+            self._free.append(position)
+
+    def hit_masks(self, gig) -> Dict[str, np.ndarray]:
+        """
+        Per field, a boolean mask over positions of the items matching the gig
+        on it. Masks have one extra, always False, entry at the end, so that
+        indexing them with position -1 (not indexed) reads as no hit.
+        """
+        masks = {}
+        for field, keys in gig_terms(gig).items():
+            postings = self._postings[field]
+            mask = np.zeros(self.size + 1, dtype=bool)
+            for key in keys:
+                posting = postings.get(key)
+                if posting is not None:
+                    mask[posting] = True
+            masks[field] = mask
+        return masks
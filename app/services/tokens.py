@@ -0,0 +1,58 @@
+import re
+import threading
+from typing import Dict, FrozenSet, List, Optional
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Lowercased word tokens of ``text``.
+
+    Commas, whitespace and punctuation all separate tokens, so the comma
+    lists of portfolio items ("pastel tones, minimal") and the free text of
+    gigs ("minimal shots in pastel tones") yield comparable tokens.
+    """
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class TokenVocabulary:
+    """
+    Process-wide interning of tokens into integer ids.
+
+    Ids are handed out in first-seen order and never reused, so token sets
+    computed at different times (when an item or gig is written, or when a
+    gig is scored) compare as plain integer sets. Ids are only meaningful
+    within the process that assigned them.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def id(self, token: str) -> int:
+        token_id = self._ids.get(token)
+        if token_id is None:
+            with self._lock:
+                token_id = self._ids.setdefault(token, len(self._ids))
+        return token_id
+
+    def ids(self, text: Optional[str]) -> FrozenSet[int]:
+        """Ids of the distinct tokens of ``text``"""
+        return frozenset(self.id(token) for token in tokenize(text))
+
+
+def tokens_of(obj, field: str) -> FrozenSet[int]:
+    """
+    Token ids of a text field of a portfolio item or gig: precomputed as
+    ``<field>_tokens`` on feature records, tokenized from the text otherwise.
+    """
+    tokens = getattr(obj, f'{field}_tokens', None)
+    return tokens if tokens is not None else vocabulary.ids(getattr(obj, field))
+
+
+# Create instance
+vocabulary = TokenVocabulary()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script to compute and store embeddings for every portfolio item and gig description.
+
+Rows whose stored embedding already matches their current text and model are
+skipped, so the script can be re-run after model changes or bulk imports.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal, engine
+from app.models.models import Base, PortfolioItem, Gig
+from app.services.embeddings import embedding_store
+from app.services.matchmaking import ai_engine
+
+# Create tables
+Base.metadata.create_all(bind=engine)
+
+BATCH_SIZE = 256
+
+
+def backfill(db, model, owner_type, text_column):
+    """Embed every row of ``model`` in batches; returns the number of rows with text"""
+    total = 0
+    offset = 0
+    while True:
+        rows = db.query(model.id, text_column).order_by(model.id).offset(offset).limit(BATCH_SIZE).all()
+        if not rows:
+            return total
+        vectors = embedding_store.vectors(db, owner_type, rows)
+        total += len(vectors)
+        offset += len(rows)
+        print(f"{owner_type}: {offset} rows scanned, {total} embedded")
+
+
+def backfill_embeddings():
+    if not ai_engine.ensure_model():
+        print("sentence-transformers is not installed; nothing to do")
+        return
+
+    db = SessionLocal()
+    try:
+        items = backfill(db, PortfolioItem, "portfolio_item", PortfolioItem.description)
+        gigs = backfill(db, Gig, "gig", Gig.description)
+        print(f"\nEmbeddings up to date for model {embedding_store.model_name}")
+        print(f"Portfolio items: {items}")
+        print(f"Gigs: {gigs}")
+    except Exception as e:
+        print(f"Error backfilling embeddings: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_embeddings()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the IVF-flat portfolio ANN index against brute-force search.
+
+Builds the index over a synthetic corpus of clustered, normalized vectors
+(the shape of sentence embeddings of portfolio descriptions) and reports,
+for several probe counts, recall@k of the nearest vectors and of the
+nearest owners (talents) together with the query latency of both methods.
+"""
+
+import argparse
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.services.ann_index import IVFFlatIndex
+
+
+def synthetic_corpus(rng, items, dimensions, topics, items_per_owner):
+    """Normalized vectors drawn around ``topics`` random directions, grouped into owners"""
+    centers = rng.normal(size=(topics, dimensions))
+    vectors = centers[rng.integers(0, topics, items)] + 0.6 * rng.normal(size=(items, dimensions))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    owners = [f"talent-{i // items_per_owner}" for i in range(items)]
+    return vectors.astype(np.float32), owners
+
+
+def brute_force_owners(vectors, owners, query, n):
+    result, seen = [], set()
+    for i in np.argsort(-(vectors @ query), kind='stable'):
+        if owners[i] not in seen:
+            seen.add(owners[i])
+            result.append(owners[i])
+            if len(result) == n:
+                break
+    return result
+
+
+def benchmark(args):
+    rng = np.random.default_rng(args.seed)
+    vectors, owners = synthetic_corpus(rng, args.items, args.dimensions, args.topics, args.items_per_owner)
+    ids = [f"item-{i}" for i in range(args.items)]
+    queries, _ = synthetic_corpus(rng, args.queries, args.dimensions, args.topics, 1)
+
+    start = time.time()
+    index = IVFFlatIndex(lists=args.lists)
+    index.build(ids, owners, vectors)
+    print(f"Built {len(index.centroids)} lists over {args.items} vectors of {args.dimensions} dims "
+          f"in {time.time() - start:.2f}s")
+
+    start = time.time()
+    exact_items = [set(np.argsort(-(vectors @ q), kind='stable')[:args.k]) for q in queries]
+    exact_owners = [set(brute_force_owners(vectors, owners, q, args.k)) for q in queries]
+    brute_ms = (time.time() - start) * 1000 / (2 * args.queries)
+    print(f"Brute force: {brute_ms:.2f} ms/query\n")
+
+    print(f"{'probes':>6} {'recall@k items':>15} {'recall@k owners':>16} {'ms/query':>9} {'speedup':>8}")
+    for probes in args.probes:
+        item_hits = owner_hits = 0
+        start = time.time()
+        for q, items, talents in zip(queries, exact_items, exact_owners):
+            found = index.search(q, args.k, probes)
+            item_hits += len(items & {int(item_id[5:]) for item_id, _ in found})
+            found_owners = index.nearest_owners(q, args.k, probes)
+            owner_hits += len(talents & {owner for owner, _ in found_owners})
+        ann_ms = (time.time() - start) * 1000 / (2 * args.queries)
+        print(f"{probes:>6} {item_hits / (args.k * args.queries):>15.3f} "
+              f"{owner_hits / (args.k * args.queries):>16.3f} {ann_ms:>9.2f} {brute_ms / ann_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--dimensions", type=int, default=384)  # all-MiniLM-L6-v2
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--items-per-owner", type=int, default=5)
+    parser.add_argument("--lists", type=int, default=0, help="0 uses sqrt(items)")
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    benchmark(parser.parse_args())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the in-memory embedding precisions (float32, float16, int8).
+
+Quantizes a synthetic corpus of normalized vectors shaped like
+all-MiniLM-L6-v2 portfolio embeddings and reports, per precision, the
+memory held, the throughput of scoring the whole corpus against a query
+and the ranking drift against float32: recall of the float32 top-k and
+the largest similarity error.
+"""
+
+import argparse
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.services.embeddings import PRECISIONS, quantize, quantized_dot
+
+
+def synthetic_corpus(rng, items, dimensions, topics):
+    """Normalized vectors drawn around ``topics`` random directions"""
+    centers = rng.normal(size=(topics, dimensions))
+    vectors = centers[rng.integers(0, topics, items)] + 0.6 * rng.normal(size=(items, dimensions))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def top_k(scores, k):
+    return np.argsort(-scores, kind='stable')[:k]
+
+
+def benchmark(args):
+    rng = np.random.default_rng(args.seed)
+    vectors = synthetic_corpus(rng, args.items, args.dimensions, args.topics)
+    queries = synthetic_corpus(rng, args.queries, args.dimensions, args.topics)
+    exact = [vectors @ q for q in queries]
+    exact_top = [set(top_k(scores, args.k)) for scores in exact]
+
+    print(f"{args.items} vectors of {args.dimensions} dims, {args.queries} queries, k={args.k}\n")
+    print(f"{'precision':>9} {'memory MB':>10} {'saved':>6} {'queries/s':>10} "
+          f"{'vs f32':>7} {'recall@k':>9} {'max error':>10}")
+    baseline_bytes = baseline_qps = None
+    for precision in PRECISIONS:
+        data, scale = quantize(vectors, precision)
+        nbytes = data.nbytes + (scale.nbytes if scale is not None else 0)
+
+        start = time.time()
+        results = [quantized_dot(data, scale, q) for q in queries]
+        qps = args.queries / (time.time() - start)
+
+        if baseline_bytes is None:
+            baseline_bytes, baseline_qps = nbytes, qps
+        recall = np.mean([len(expected & set(top_k(scores, args.k))) / args.k
+                          for expected, scores in zip(exact_top, results)])
+        error = max(float(np.abs(scores - expected).max()) for scores, expected in zip(results, exact))
+        print(f"{precision:>9} {nbytes / 2**20:>10.1f} {1 - nbytes / baseline_bytes:>6.0%} "
+              f"{qps:>10.1f} {qps / baseline_qps:>6.2f}x {recall:>9.3f} {error:>10.2e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=200000)
+    parser.add_argument("--dimensions", type=int, default=384)  # all-MiniLM-L6-v2
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    benchmark(parser.parse_args())
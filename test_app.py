@@ -7,6 +7,64 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+def _temp_session():
+    """Session on a fresh in-memory database, so tests that write leave the app database alone."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.core.database import Base
+    from app.core.fulltext import setup_fulltext
+    
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    setup_fulltext(engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+def _seed_pool(db, rng, talents=60, gigs=8):
+    """Random clients, skills, talents with portfolios and open gigs; coarse values so scores tie often."""
+    from app.crud.crud import client, talent, skill, gig, portfolio_item
+    from app.schemas.schemas import ClientCreate, SkillCreate, TalentCreate, GigCreate, PortfolioItemCreate
+    
+    locations = ['Mumbai', 'Pune', 'Delhi', 'Goa', 'Bangalore', 'Hyderabad, Telangana', 'London, UK']
+    words = ['candid', 'wedding', 'portrait', 'studio', 'fashion', 'editorial', 'travel', 'food']
+    skills = [skill.create(db, SkillCreate(name=f"pool-skill-{i}", category=f"category-{i % 3}")) for i in range(6)]
+    owner = client.create(db, ClientCreate(name="Pool client", email=f"pool-client-{rng.random()}@example.com"))
+    
+    talent_objs = []
+    for i in range(talents):
+        talent_obj = talent.create(db, TalentCreate(
+            name=f"pool-talent-{i}", email=f"pool-talent{i}-{rng.random()}@example.com",
+            location=rng.choice(locations), experience_years=rng.randint(0, 12),
+            hourly_rate=rng.choice([None, 20.0, 50.0, 100.0, 150.0]),
+            daily_rate=rng.choice([None, 400.0, 800.0]),
+            availability_status=rng.choice(['available', 'available', 'busy', 'unavailable']),
+            skill_ids=[s.id for s in rng.sample(skills, rng.randint(0, 3))]
+        ))
+        for j in range(rng.randint(0, 3)):
+            portfolio_item.create(db, PortfolioItemCreate(
+                title=f"work-{j}", description=' '.join(rng.sample(words, 3)),
+                project_type=rng.choice(['photography', 'videography']),
+                tags=' '.join(rng.sample(words, 2)), style_keywords=' '.join(rng.sample(words, 2))
+            ), talent_obj.id)
+        talent_obj.rating = rng.choice([0.0, 3.5, 4.0, 5.0])
+        talent_obj.success_rate = rng.choice([0.5, 0.9, 1.0])
+        talent_objs.append(talent_obj)
+    db.commit()
+    
+    gig_objs = [
+        gig.create(db, GigCreate(
+            client_id=owner.id, title=f"pool-gig-{i}", description=' '.join(rng.sample(words, 4)),
+            category=rng.choice(['photography', 'videography']), location=rng.choice(locations),
+            is_remote=rng.random() < 0.2, budget_min=rng.choice([None, 50.0, 300.0]),
+            budget_max=rng.choice([None, 150.0, 1000.0]), duration_days=rng.choice([None, 1, 3]),
+            style_preferences=' '.join(rng.sample(words, 2)),
+            experience_required=rng.choice([None, 'junior', 'mid', 'senior']),
+            required_skill_ids=[s.id for s in rng.sample(skills, rng.randint(0, 2))]
+        ))
+        for i in range(gigs)
+    ]
+    return talent_objs, gig_objs
+
 def test_imports():
     """Test that all imports work correctly."""
     try:
@@ -84,6 +142,912 @@ def test_matching_algorithm():
         print(f"❌ Matching algorithm error: {e}")
         return False
 
+def test_vectorized_scoring():
+    """Test that vectorized scoring matches the scalar scoring path, scores and top matches."""
+    import random
+    from app.crud.crud import gig
+    from app.services.matchmaking import rule_based_engine, MatchStats
+    
+    db = _temp_session()
+    try:
+        _seed_pool(db, random.Random(11), talents=80, gigs=10)
+        columns = rule_based_engine._load_columns(db)
+        assert len(columns.talents) == 80
+        for sample_gig in gig.get_open(db, profile="scoring"):
+            total_scores, _ = rule_based_engine.calculate_match_scores(columns, sample_gig)
+            for i, talent_obj in enumerate(columns.talents):
+                score, _ = rule_based_engine.calculate_match_score(talent_obj, sample_gig)
+                assert score == total_scores[i], f"Score mismatch for talent {talent_obj.id}"
+            for limit in (1, 5, 20):
+                scalar = rule_based_engine._score_talents(columns.talents, sample_gig, limit, MatchStats())
+                vectorized = rule_based_engine._score_talents_vectorized(columns, sample_gig, limit, MatchStats())
+                assert [(score, t.id) for score, t, _ in scalar] == [(score, t.id) for score, t, _ in vectorized], \
+                    f"Top {limit} of gig {sample_gig.id} differs between paths"
+    finally:
+        db.close()
+    print("✅ Vectorized scores and top matches agree with scalar scoring")
+    return True
+
+def test_ai_vectorized_scoring():
+    """Test that AI scoring agrees between the scalar and vectorized paths, opposite portfolios included."""
+    import numpy as np
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.core.database import Base
+    from app.models.models import Talent, Gig, PortfolioItem
+    from app.services import matchmaking
+    from app.services.columnar import TalentColumns
+    from app.services.embeddings import EmbeddingStore
+    from app.services.matchmaking import AIMatchmakingEngine, MatchStats
+    
+    # Fixed embeddings: t0's portfolio points away from the gig, t1's along it
+    vectors = {'wedding shoot': [1.0, 0.0], 'studio portraits': [-1.0, 0.0], 'beach weddings': [1.0, 0.0]}
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    store = EmbeddingStore()
+    store.configure('test-model', lambda texts: np.array([vectors[text] for text in texts]))
+    
+    sample_gig = Gig(id='gig', title='Wedding', description='wedding shoot', category='photography',
+                     location='Mumbai', is_remote=False, budget_min=100, budget_max=200, priority='low',
+                     style_preferences='candid', experience_required='mid', required_skills=[])
+    talents = [
+        Talent(id='t0', name='t0', location='Mumbai', experience_years=5, hourly_rate=150, rating=5.0,
+               success_rate=0.95, availability_status='available', skills=[],
+               portfolio_items=[PortfolioItem(id='p0', talent_id='t0', title='p0', description='studio portraits')]),
+        Talent(id='t1', name='t1', location='Mumbai', experience_years=5, hourly_rate=150, rating=0.5,
+               success_rate=0.95, availability_status='busy', skills=[],
+               portfolio_items=[PortfolioItem(id='p1', talent_id='t1', title='p1', description='beach weddings',
+                                              project_type='photography', style_keywords='candid')]),
+    ]
+    
+    previous_store = matchmaking.embedding_store
+    matchmaking.embedding_store = store
+    try:
+        ai = AIMatchmakingEngine()
+        ai.use_embeddings = True
+        store.vectors(db, 'gig', [(sample_gig.id, sample_gig.description)])
+        store.vectors(db, 'portfolio_item', [(t.portfolio_items[0].id, t.portfolio_items[0].description) for t in talents])
+        
+        columns = TalentColumns.from_talents(talents)
+        total_scores, _ = ai.calculate_match_scores(columns, sample_gig)
+        for i, talent_obj in enumerate(talents):
+            score, _ = ai.calculate_match_score(talent_obj, sample_gig)
+            assert abs(score - total_scores[i]) < 1e-9, f"Score mismatch for talent {talent_obj.id}"
+        
+        # Pruning must not drop the talent the exhaustive path ranks first
+        scalar = [talent_obj.id for _, talent_obj, _ in ai._score_talents(talents, sample_gig, 1, MatchStats())]
+        selected = ai._select_rows_vectorized(columns, sample_gig, 1, MatchStats())
+        assert scalar == [columns.talents[row].id for row, _, _ in selected], "Top match differs between paths"
+    finally:
+        matchmaking.embedding_store = previous_store
+        db.close()
+    print("✅ AI scalar and vectorized scores agree, negative similarity included")
+    return True
+
+def test_incremental_rematching():
+    """Test that incremental rematching after random talent writes matches a full recompute."""
+    import random
+    from app.crud.crud import client, talent, skill, gig, match_result
+    from app.schemas.schemas import ClientCreate, SkillCreate, TalentCreate, TalentUpdate, GigCreate
+    from app.services.matchmaking import rule_based_engine, MatchStats
+    
+    rng = random.Random(7)
+    locations = ['Mumbai', 'Pune', 'Delhi', 'Goa', 'Bangalore']
+    db = _temp_session()
+    try:
+        skills = [skill.create(db, SkillCreate(name=f"skill-{i}", category=f"category-{i % 3}")) for i in range(6)]
+        owner = client.create(db, ClientCreate(name="Client", email="client@example.com"))
+        
+        def random_fields():
+            return dict(
+                location=rng.choice(locations), experience_years=rng.randint(0, 12),
+                hourly_rate=float(rng.randint(20, 200)), availability_status=rng.choice(['available', 'busy', 'unavailable']),
+                skill_ids=[s.id for s in rng.sample(skills, rng.randint(0, 3))]
+            )
+        
+        talents = [
+            talent.create(db, TalentCreate(name=f"talent-{i}", email=f"talent{i}@example.com", **random_fields()))
+            for i in range(40)
+        ]
+        gigs = [
+            gig.create(db, GigCreate(
+                client_id=owner.id, title=f"gig-{i}", description="shoot", category="photography",
+                location=rng.choice(locations), budget_min=50.0, budget_max=float(rng.randint(60, 250)),
+                experience_required=rng.choice(['junior', 'mid', 'senior']),
+                required_skill_ids=[s.id for s in rng.sample(skills, 2)]
+            ))
+            for i in range(6)
+        ]
+        for i, gig_obj in enumerate(gigs):
+            rule_based_engine.find_matches(db, gig_obj.id, limit=5, require_skill_overlap=i % 2 == 1, use_cache=False)
+        
+        def assert_matches_full_recompute():
+            columns = rule_based_engine._load_columns(db)
+            for gig_obj in gigs:
+                run = rule_based_engine._open_runs(db, rule_based_engine._load_gig_columns(db))[gig_obj.id]
+                gig_obj = gig.get(db, gig_obj.id, profile="scoring")
+                expected = rule_based_engine._match_rows(
+                    columns, gig_obj, run.match_limit, True, run.require_skill_overlap, MatchStats()
+                )
+                stored = match_result.get_by_gig(db, gig_obj.id)
+                # Tied talents may be stored in either order, so compare scores
+                assert sorted(r.match_score for r in stored) == sorted(r['match_score'] for r in expected), \
+                    f"Stored matches of gig {gig_obj.id} differ from a full recompute"
+                for row in stored:
+                    score, _ = rule_based_engine.calculate_match_score(talent.get(db, row.talent_id), gig_obj)
+                    assert row.match_score == score, f"Stale score for talent {row.talent_id}"
+        
+        for _ in range(60):
+            talent_obj = rng.choice(talents)
+            fields = random_fields()
+            talent.update(db, talent_obj, TalentUpdate(**{key: fields[key] for key in rng.sample(list(fields), 2)}))
+            rule_based_engine.rematch_talent(db, talent_obj.id)
+            assert_matches_full_recompute()
+        
+        # A deleted talent's slots are refilled from the rest of the pool
+        for talent_obj in rng.sample(talents, 5):
+            gig_ids = [row.gig_id for row in match_result.get_by_talent(db, talent_obj.id)]
+            talent.delete(db, talent_obj.id)
+            talents.remove(talent_obj)
+            rule_based_engine.rematch_talent(db, talent_obj.id, gig_ids)
+            assert_matches_full_recompute()
+    finally:
+        db.close()
+    print("✅ Incremental rematching matches full recomputes")
+    return True
+
+def test_match_cache():
+    """Test that repeated find-matches calls are served from the cache until the talent pool changes."""
+    from app.crud.crud import client, talent, gig
+    from app.schemas.schemas import ClientCreate, TalentCreate, TalentUpdate, GigCreate
+    from app.services.matchmaking import rule_based_engine, MatchStats
+    
+    db = _temp_session()
+    try:
+        owner = client.create(db, ClientCreate(name="Client", email="cache-client@example.com"))
+        talent_obj = talent.create(db, TalentCreate(
+            name="Talent", email="cache-talent@example.com", location="Mumbai",
+            experience_years=4, hourly_rate=80.0
+        ))
+        gig_obj = gig.create(db, GigCreate(
+            client_id=owner.id, title="Shoot", description="shoot", category="photography",
+            location="Mumbai", budget_min=50.0, budget_max=150.0, experience_required="mid"
+        ))
+        
+        def run():
+            stats = MatchStats()
+            matches = rule_based_engine.find_matches(db, gig_obj.id, limit=5, stats=stats)
+            return stats.cache_hit, [(m.talent_id, m.match_score) for m in matches]
+        
+        first_hit, first = run()
+        assert not first_hit, "First find-matches call should compute the matches"
+        second_hit, second = run()
+        assert second_hit, "Identical find-matches call should be a cache hit"
+        assert second == first, "Cached matches differ from the computed ones"
+        
+        talent.update(db, talent_obj, TalentUpdate(location="Delhi", experience_years=0))
+        third_hit, third = run()
+        assert not third_hit, "Find-matches after a talent update should miss the cache"
+        assert third != first, "Matches were not recomputed after the talent update"
+    finally:
+        db.close()
+    print("✅ Match cache hits on repeats and misses after talent writes")
+    return True
+
+def test_cursor_pagination():
+    """Test that following X-Next-Cursor returns every row once, in order, across equal sort keys."""
+    from datetime import datetime
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine, inspect, text
+    from app.main import app
+    from app.core.config import settings
+    from app.core.database import Base, get_db, create_missing_indexes
+    from app.core.pagination import NEXT_CURSOR_HEADER
+    from app.crud.crud import client, talent, gig
+    from app.models.models import Client, Talent
+    from app.schemas.schemas import ClientCreate, TalentCreate, GigCreate, TalentSearchFilter, GigSearchFilter
+    
+    db = _temp_session()
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        bios = ["Portrait photographer", "Portrait and wedding photographer", "Wedding films", "Portrait portrait studio"]
+        for i in range(11):
+            owner = client.create(db, ClientCreate(name=f"client-{i}", email=f"page-client{i}@example.com"))
+            talent.create(db, TalentCreate(
+                name=f"talent-{i}", email=f"page-talent{i}@example.com", location="Mumbai", bio=bios[i % 4]
+            ))
+            gig.create(db, GigCreate(
+                client_id=owner.id, title=f"gig-{i}", description=bios[i % 4], category="photography",
+                location="Mumbai", budget_min=50.0, budget_max=150.0, experience_required="mid"
+            ))
+        # Most rows share a timestamp, and text ranks tie between equal bios, so pages must break ties on id
+        shared, later = datetime(2024, 1, 1, 12, 0, 0, 123456), datetime(2024, 1, 2, 9, 30)
+        for model in (Client, Talent):
+            rows = db.query(model).all()
+            for i, row in enumerate(rows):
+                row.created_at = later if i % 4 == 3 else shared
+        db.commit()
+        
+        api = TestClient(app)
+        
+        def walk(method, path, body=None):
+            seen, cursor = [], None
+            while True:
+                params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+                response = api.request(method, f"{settings.api_v1_str}/{path}", params=params, json=body)
+                assert response.status_code == 200, response.text
+                seen.extend(row["id"] for row in response.json())
+                cursor = response.headers.get(NEXT_CURSOR_HEADER)
+                if not cursor:
+                    return seen
+                assert len(seen) <= 100, f"Cursor walk over {path} does not terminate"
+        
+        for path, model in (("clients/", Client), ("talents/", Talent)):
+            expected = [row.id for row in db.query(model).order_by(model.created_at, model.id)]
+            assert walk("GET", path) == expected, f"Cursor walk over {path} skipped, repeated or reordered rows"
+        
+        for search_text in ("portrait", "wedding"):
+            expected = [row.id for row in talent.search(db, TalentSearchFilter(text=search_text))]
+            found = walk("POST", "talents/search", {"text": search_text})
+            assert found == expected, f"Text search walk over talents for {search_text!r} differs"
+            expected = [row.id for row in gig.search(db, GigSearchFilter(text=search_text))]
+            found = walk("POST", "gigs/search", {"text": search_text})
+            assert found == expected, f"Text search walk over gigs for {search_text!r} differs"
+        
+        response = api.get(f"{settings.api_v1_str}/clients/", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400, "Invalid cursor should be rejected"
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        db.close()
+    
+    # Databases from before the keyset indexes get them at startup
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for table in ("clients", "talents", "skills", "gigs"):
+            connection.execute(text(f"DROP INDEX ix_{table}_created_at_id"))
+    create_missing_indexes(engine)
+    create_missing_indexes(engine)
+    for table in ("clients", "talents", "skills", "gigs"):
+        assert f"ix_{table}_created_at_id" in {index["name"] for index in inspect(engine).get_indexes(table)}
+    print("✅ Cursor pagination returns every row once, in order")
+    return True
+
+def test_geo_matching():
+    """Test place resolution, radius lookups and distance-decayed location scores."""
+    import random
+    import numpy as np
+    from app.core.config import settings
+    from app.services.gazetteer import gazetteer
+    from app.services.geo_index import GridIndex, haversine_km
+    from app.services.matchmaking import rule_based_engine
+    
+    mumbai, hyderabad = gazetteer.resolve("Mumbai"), gazetteer.resolve("Hyderabad")
+    assert mumbai.city_code and hyderabad.city_code, "Gazetteer cities did not resolve"
+    assert gazetteer.resolve("Looking up Mumbai") == mumbai, "Common word resolved as a region code"
+    assert gazetteer.resolve("Pick up in Goa") == gazetteer.resolve("Goa"), "Common word resolved as a region code"
+    assert not gazetteer.resolve("Set up near the coast").is_known, "Common word resolved as a region code"
+    assert gazetteer.resolve("Hyderabad, Telangana") == hyderabad
+    assert gazetteer.resolve("Lucknow, UP").region_code == gazetteer.resolve("Uttar Pradesh").region_code
+    assert gazetteer.resolve("Austin, TX").region_code == gazetteer.resolve("Texas").region_code
+    assert gazetteer.resolve("UK").country_code == gazetteer.resolve("United Kingdom").country_code
+    assert not gazetteer.resolve("Atlantis").is_known
+    print("✅ Gazetteer resolves names and codes")
+    
+    # Radius lookups agree with brute force, including across the antimeridian and near the poles
+    rng = random.Random(3)
+    points = [(f"p{i}", rng.uniform(-89.0, 89.0), rng.uniform(-180.0, 180.0)) for i in range(2000)]
+    points += [(f"c{i}", 19.0 + rng.uniform(-1, 1), 72.8 + rng.uniform(-1, 1)) for i in range(300)]
+    points += [(f"d{i}", rng.uniform(-5, 5), rng.choice([-1, 1]) * rng.uniform(178.0, 180.0)) for i in range(200)]
+    index = GridIndex.from_points(points)
+    latitudes = np.array([p[1] for p in points])
+    longitudes = np.array([p[2] for p in points])
+    for latitude, longitude, radius_km in [(19.076, 72.8777, 50.0), (0.0, 179.9, 400.0), (88.0, 10.0, 800.0),
+                                           (-30.0, -60.0, 1500.0), (19.076, 72.8777, 0.0)]:
+        distances = haversine_km(latitude, longitude, latitudes, longitudes)
+        expected = sorted((distances[i], points[i][0]) for i in np.flatnonzero(distances <= radius_km))
+        found = index.within(latitude, longitude, radius_km)
+        assert sorted(point_id for point_id, _ in found) == sorted(point_id for _, point_id in expected), \
+            f"Radius lookup around ({latitude}, {longitude}) differs from brute force"
+        assert [km for _, km in found] == sorted(km for _, km in found), "Radius lookup not nearest first"
+    print("✅ Grid index radius lookups match brute force")
+    
+    # Location scores halve their distance above 1 every half-life
+    half_life = settings.location_half_life_km
+    settings.location_half_life_km = 100.0
+    try:
+        north = np.array([mumbai.latitude + km / 111.195 for km in (0.0, 100.0, 200.0, 5000.0)])
+        scores = rule_based_engine.calculate_distance_scores(north, np.full(4, mumbai.longitude), mumbai)
+        assert np.allclose(scores[:3], [10.0, 5.5, 3.25], atol=1e-3), f"Unexpected decay: {scores}"
+        assert 1.0 <= scores[3] < 1.001, "Far locations should score the floor"
+    finally:
+        settings.location_half_life_km = half_life
+    print("✅ Location scores decay with distance")
+    return True
+
+def test_match_query_count():
+    """Test that a match run issues the same number of SQL statements whatever the talent count."""
+    import random
+    from sqlalchemy import event
+    from app.services.matchmaking import rule_based_engine
+    
+    def statements_per_run(talent_count):
+        db = _temp_session()
+        statements = []
+        
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        try:
+            _, gigs = _seed_pool(db, random.Random(5), talents=talent_count, gigs=3)
+            event.listen(db.get_bind(), "before_cursor_execute", count)
+            counts = []
+            for vectorized in (True, False):
+                for gig_obj in gigs:
+                    db.expire_all()
+                    statements.clear()
+                    matches = rule_based_engine.find_matches(db, gig_obj.id, limit=10, vectorized=vectorized,
+                                                             use_cache=False)
+                    # What the match response serializes must be loaded already
+                    for match in matches:
+                        [skill.name for skill in match.talent.skills]
+                    counts.append(len(statements))
+            return counts
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", count)
+            db.close()
+    
+    small, large = statements_per_run(5), statements_per_run(50)
+    assert small == large, f"Statements per match run grow with the talent pool: {small} vs {large}"
+    print(f"✅ Match runs issue {large[0]} SQL statements at 5 and 50 talents alike")
+    return True
+
+def test_match_result_sync():
+    """Test that syncing stored matches writes only the rows that changed, updating them in place."""
+    import random
+    from sqlalchemy import event
+    from app.crud.crud import gig, match_result
+    from app.models.models import MatchResult
+    from app.services.matchmaking import rule_based_engine, MatchStats
+    
+    db = _temp_session()
+    writes = []
+    
+    def count_writes(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split()[0].upper() in ('INSERT', 'UPDATE', 'DELETE'):
+            writes.append(statement)
+    
+    event.listen(db.get_bind(), "before_cursor_execute", count_writes)
+    try:
+        talents, gigs = _seed_pool(db, random.Random(9), talents=40, gigs=1)
+        gig_obj = gig.get(db, gigs[0].id, profile="scoring")
+        columns = rule_based_engine._load_columns(db)
+        rows = rule_based_engine._match_rows(columns, gig_obj, 6, True, False, MatchStats())
+        assert len(rows) == 6, "Seeded pool should fill the match list"
+        
+        saved, counts = match_result.sync_for_gig(db, gig_obj.id, rows)
+        assert counts == {'added': 6, 'changed': 0, 'unchanged': 0, 'removed': 0}, counts
+        ids = {row.talent_id: row.id for row in saved}
+        
+        # An identical rerun writes nothing
+        writes.clear()
+        saved, counts = match_result.sync_for_gig(db, gig_obj.id, [dict(row) for row in rows])
+        assert counts == {'added': 0, 'changed': 0, 'unchanged': 6, 'removed': 0}, counts
+        assert not writes, f"Unchanged rerun wrote to the database: {writes}"
+        
+        # Changed rows are updated in place, dropped ones deleted, new ones inserted
+        matched = {row['talent_id'] for row in rows}
+        newcomer = next(t for t in talents if t.id not in matched)
+        changed = [dict(row) for row in rows[:4]]
+        changed[0], changed[1] = {**changed[1], 'ranking': 1}, {**changed[0], 'ranking': 2}
+        changed[2]['match_score'] += 0.5
+        changed.append({**rows[5], 'talent_id': newcomer.id, 'ranking': 5})
+        writes.clear()
+        saved, counts = match_result.sync_for_gig(db, gig_obj.id, changed)
+        assert counts == {'added': 1, 'changed': 3, 'unchanged': 1, 'removed': 2}, counts
+        assert len(writes) == 3, f"Expected one delete, update and insert statement: {writes}"
+        
+        stored = {row.talent_id: row for row in db.query(MatchResult).filter(MatchResult.gig_id == gig_obj.id)}
+        assert set(stored) == {row['talent_id'] for row in changed}, "Stored talents differ from the synced rows"
+        for row in changed:
+            for field, value in row.items():
+                assert getattr(stored[row['talent_id']], field) == value, f"{field} not synced"
+            if row['talent_id'] in ids:
+                assert stored[row['talent_id']].id == ids[row['talent_id']], "Changed row was replaced, not updated"
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", count_writes)
+        db.close()
+    print("✅ Match result sync writes only changed rows")
+    return True
+
+def test_ai_embedding_session():
+    """Test that AI match runs look embeddings up through the caller's session, never their own."""
+    import random
+    import numpy as np
+    from app.crud.crud import gig
+    from app.models.models import Embedding
+    from app.services import matchmaking, embeddings, ann_index
+    from app.services.embeddings import EmbeddingStore
+    from app.services.matchmaking import AIMatchmakingEngine
+    
+    vocabulary = ['candid', 'wedding', 'portrait', 'studio', 'fashion', 'editorial', 'travel', 'food']
+    
+    def encode(texts):
+        return np.array([[1.0] + [text.split().count(word) for word in vocabulary] for text in texts])
+    
+    def no_session():
+        raise AssertionError("Scoring opened its own database session")
+    
+    db = _temp_session()
+    store = EmbeddingStore()
+    store.configure('test-model', encode)
+    previous = matchmaking.embedding_store, embeddings.SessionLocal, ann_index.SessionLocal
+    matchmaking.embedding_store, embeddings.SessionLocal, ann_index.SessionLocal = store, no_session, no_session
+    try:
+        _, gigs = _seed_pool(db, random.Random(13), talents=30, gigs=3)
+        ai = AIMatchmakingEngine()
+        ai.use_embeddings = True
+        for vectorized in (True, False):
+            for gig_obj in gigs:
+                ai.find_matches(db, gig_obj.id, limit=5, vectorized=vectorized, use_cache=False)
+            store._vectors.clear()
+        sample_gig = gig.get(db, gigs[0].id, profile="scoring")
+        for talent_obj in ai._load_columns(db).talents:
+            ai.calculate_match_score(talent_obj, sample_gig, db)
+        assert db.query(Embedding).count() > 0, "Embeddings were not stored in the caller's database"
+    finally:
+        matchmaking.embedding_store, embeddings.SessionLocal, ann_index.SessionLocal = previous
+        db.close()
+    print("✅ AI scoring looks embeddings up through the caller's session")
+    return True
+
+def test_talent_deletion():
+    """Test that deleting a talent removes its portfolio items and what is derived from them."""
+    import random
+    import numpy as np
+    from sqlalchemy import text
+    from app.crud.crud import talent, gig, portfolio_item
+    from app.models.models import PortfolioItem, Embedding
+    from app.services.embeddings import embedding_store
+    
+    db = _temp_session()
+    previous = embedding_store.model_name, embedding_store._encode, embedding_store._vectors
+    try:
+        talents, gigs = _seed_pool(db, random.Random(17), talents=10, gigs=2)
+        owners = [t for t in talents if t.portfolio_items]
+        doomed, kept = owners[:2], owners[2]
+        items = [(item.id, item.description) for talent_obj in owners for item in talent_obj.portfolio_items]
+        
+        # Embed everything, then unload the model: deletes must clean up regardless
+        embedding_store.configure('test-model', lambda texts: np.ones((len(texts), 3)))
+        embedding_store.vectors(db, 'portfolio_item', items)
+        embedding_store.vectors(db, 'gig', [(g.id, g.description) for g in gigs])
+        embedding_store._encode = None
+        
+        # A changed text replaces the owner's cached vector instead of adding one
+        cached = len(embedding_store._vectors)
+        embedding_store._encode = lambda texts: np.ones((len(texts), 3))
+        embedding_store.vector(db, 'gig', gigs[1].id, 'rewritten description')
+        embedding_store._encode = None
+        assert len(embedding_store._vectors) == cached, "Stale vectors kept for an older text"
+        
+        lone_item = kept.portfolio_items[0].id
+        removed = [item.id for talent_obj in doomed for item in talent_obj.portfolio_items] + [lone_item, gigs[0].id]
+        for talent_obj in doomed:
+            assert talent.delete(db, talent_obj.id) is not None
+        portfolio_item.delete(db, lone_item)
+        gig.delete(db, gigs[0].id)
+        
+        assert db.query(PortfolioItem).filter(PortfolioItem.id.in_(removed)).count() == 0, \
+            "Portfolio items outlived their talent"
+        assert db.query(Embedding).filter(Embedding.owner_id.in_(removed)).count() == 0, \
+            "Embeddings of deleted owners remain"
+        assert db.query(Embedding).count() == len(items) + len(gigs) - len(removed), "Unrelated embeddings deleted"
+        assert not set(removed) & set(embedding_store._vectors), "Cached vectors of deleted owners remain"
+        indexed = {row[0] for row in db.execute(text("SELECT talent_id FROM talent_search_rows"))}
+        assert indexed == {t.id for t in talents} - {t.id for t in doomed}, "Search rows of deleted talents remain"
+    finally:
+        embedding_store.model_name, embedding_store._encode, embedding_store._vectors = previous
+        db.close()
+    print("✅ Deleting a talent, portfolio item or gig removes its embeddings")
+    return True
+
+def test_ann_index_removals():
+    """Test that the portfolio ANN index drops deleted talents and items, deletes during its build included."""
+    import os
+    import random
+    import tempfile
+    import numpy as np
+    from app.crud.crud import talent, portfolio_item
+    from app.services import ann_index
+    from app.services.ann_index import PortfolioIndex
+    from app.services.embeddings import EmbeddingStore
+    
+    vocabulary = ['candid', 'wedding', 'portrait', 'studio', 'fashion', 'editorial', 'travel', 'food']
+    store = EmbeddingStore()
+    store.configure('test-model', lambda texts: np.array(
+        [[1.0] + [text.split().count(word) for word in vocabulary] for text in texts]
+    ))
+    
+    db = _temp_session()
+    previous_store = ann_index.embedding_store
+    ann_index.embedding_store = store
+    try:
+        talents, _ = _seed_pool(db, random.Random(19), talents=30, gigs=1)
+        owners = [t for t in talents if t.portfolio_items]
+        with tempfile.TemporaryDirectory() as directory:
+            index = PortfolioIndex(os.path.join(directory, 'portfolio.npz'), lists=4)
+            
+            # A talent deleted after the build read its items, before the index is loaded
+            during_build = owners[0]
+            embed = store.vectors
+            
+            def embed_then_delete(*args):
+                vectors = embed(*args)
+                if not index.is_loaded and talent.get(db, during_build.id) is not None:
+                    talent.delete(db, during_build.id)
+                    index.on_talent_write("deleted", during_build)
+                return vectors
+            
+            store.vectors = embed_then_delete
+            index.load_or_build(db)
+            store.vectors = embed
+            assert index.is_loaded
+            
+            # Deletes on the loaded index, whatever the embedding model's state
+            store._encode = None
+            talent.delete(db, owners[1].id)
+            index.on_talent_write("deleted", owners[1])
+            item = owners[2].portfolio_items[0]
+            portfolio_item.delete(db, item.id)
+            index.on_portfolio_item_write("deleted", item)
+            
+            entries = index.entries()
+            indexed_owners = {owner for owner, _ in entries.values()}
+            assert during_build.id not in indexed_owners, "Talent deleted during the build is still indexed"
+            assert owners[1].id not in indexed_owners, "Deleted talent is still indexed"
+            assert item.id not in entries, "Deleted portfolio item is still indexed"
+            assert owners[3].id in indexed_owners, "Unrelated talents were dropped"
+            query = np.ones(len(vocabulary) + 1, dtype=np.float32) / np.sqrt(len(vocabulary) + 1)
+            found = {owner for owner, _ in index.nearest_owners(query, len(talents), probes=4)}
+            assert not found & {during_build.id, owners[1].id}, "Deleted talents returned by the index"
+    finally:
+        ann_index.embedding_store = previous_store
+        db.close()
+    print("✅ ANN index drops deleted talents and portfolio items")
+    return True
+
+def test_sharded_scoring():
+    """Test that scoring in shards across worker processes matches in-process scoring."""
+    import random
+    from app.crud.crud import gig
+    from app.services import matchmaking
+    from app.services.matchmaking import rule_based_engine, MatchStats
+    from app.services.parallel import ShardedScoringPool
+    
+    db = _temp_session()
+    pool = ShardedScoringPool(workers=2, threshold=10)
+    previous_pool = matchmaking.scoring_pool
+    matchmaking.scoring_pool = pool
+    try:
+        _seed_pool(db, random.Random(23), talents=120, gigs=6)
+        columns = rule_based_engine._load_columns(db)
+        assert pool.should_shard(columns)
+        for gig_obj in gig.get_open(db, profile="scoring"):
+            for limit in (1, 7, 30):
+                for require_skill_overlap in (False, True):
+                    sharded_stats, local_stats = MatchStats(), MatchStats()
+                    sharded = rule_based_engine._rank_talents(
+                        columns, gig_obj, limit, True, require_skill_overlap, sharded_stats
+                    )
+                    candidates = rule_based_engine.skill_candidates(columns, gig_obj) if require_skill_overlap else None
+                    local = rule_based_engine._score_talents_vectorized(columns, gig_obj, limit, local_stats, candidates)
+                    assert [(score, t.id, b) for score, t, b in sharded] == [(score, t.id, b) for score, t, b in local], \
+                        f"Sharded top {limit} of gig {gig_obj.id} differs from in-process scoring"
+                    assert sharded_stats.candidates_considered == local_stats.candidates_considered
+    finally:
+        matchmaking.scoring_pool = previous_pool
+        pool.shutdown()
+        db.close()
+    print("✅ Sharded scoring matches in-process scoring")
+    return True
+
+def test_pruned_top_k():
+    """Test that upper-bound pruning leaves the top matches of an exhaustive sorted scan unchanged, ties included."""
+    import random
+    from app.crud.crud import gig
+    from app.services.matchmaking import rule_based_engine, MatchStats
+    
+    db = _temp_session()
+    try:
+        _seed_pool(db, random.Random(29), talents=150, gigs=10)
+        columns = rule_based_engine._load_columns(db)
+        pruned = tied_cutoffs = 0
+        for gig_obj in gig.get_open(db, profile="scoring"):
+            total_scores, _ = rule_based_engine.calculate_match_scores(columns, gig_obj)
+            eligible = [row for row, t in enumerate(columns.talents)
+                        if t.availability_status != 'unavailable' and total_scores[row] > 3.0]
+            # Stable sort: equal scores keep pool order
+            full_scan = sorted(eligible, key=lambda row: -total_scores[row])
+            for limit in (1, 3, 10, 25, 200):
+                expected = [(float(total_scores[row]), columns.talents[row].id) for row in full_scan[:limit]]
+                if len(full_scan) > limit and total_scores[full_scan[limit - 1]] == total_scores[full_scan[limit]]:
+                    tied_cutoffs += 1
+                for vectorized in (True, False):
+                    stats = MatchStats()
+                    if vectorized:
+                        matches = rule_based_engine._score_talents_vectorized(columns, gig_obj, limit, stats)
+                    else:
+                        matches = rule_based_engine._score_talents(columns.talents, gig_obj, limit, stats)
+                    assert [(score, t.id) for score, t, _ in matches] == expected, \
+                        f"Pruned top {limit} of gig {gig_obj.id} differs from a full scan (vectorized={vectorized})"
+                    pruned += stats.pruned_candidates
+        assert pruned > 0, "Nothing was pruned, so the test proves nothing"
+        assert tied_cutoffs > 0, "No top-k cut fell inside a tie"
+    finally:
+        db.close()
+    print(f"✅ Pruned top matches equal a full scan ({tied_cutoffs} cuts inside ties)")
+    return True
+
+def test_batch_matching():
+    """Test that batch matching returns the same matches as matching each gig on its own."""
+    import random
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.core.config import settings
+    from app.core.database import get_db
+    from app.crud.crud import gig
+    from app.services.match_cache import match_cache
+    from app.services.matchmaking import rule_based_engine
+    
+    db = _temp_session()
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        _, gig_objs = _seed_pool(db, random.Random(31), talents=80, gigs=8)
+        open_ids = [g.id for g in gig.get_open(db)]
+        
+        def per_gig(gig_ids, limit, vectorized, require_skill_overlap):
+            return {
+                gig_id: [(m.talent_id, m.match_score) for m in rule_based_engine.find_matches(
+                    db, gig_id, limit, vectorized, require_skill_overlap, use_cache=False
+                )]
+                for gig_id in gig_ids
+            }
+        
+        for gig_ids in (None, [g.id for g in gig_objs[::3]]):
+            for limit in (1, 5, 20):
+                for vectorized in (True, False):
+                    for require_skill_overlap in (False, True):
+                        match_cache.invalidate_pool()
+                        batch = rule_based_engine.find_matches_batch(
+                            db, gig_ids, limit, vectorized, require_skill_overlap
+                        )
+                        assert [g.id for g, _, _, _ in batch] == (gig_ids or open_ids)
+                        found = {g.id: [(m.talent_id, m.match_score) for m in matches] for g, matches, _, _ in batch}
+                        assert found == per_gig(gig_ids or open_ids, limit, vectorized, require_skill_overlap), \
+                            f"Batch top {limit} differs from per-gig matching (vectorized={vectorized})"
+        
+        try:
+            rule_based_engine.find_matches_batch(db, [gig_objs[0].id, "missing-gig"])
+            assert False, "Batch matching with an unknown gig should fail"
+        except ValueError:
+            pass
+        
+        api = TestClient(app)
+        url = f"{settings.api_v1_str}/matching/find-matches/batch"
+        match_cache.invalidate_pool()
+        response = api.post(url, json={"gig_ids": [gig_objs[0].id, gig_objs[1].id], "limit": 5})
+        assert response.status_code == 200, response.text
+        expected = per_gig([gig_objs[0].id, gig_objs[1].id], 5, None, False)
+        for result in response.json()["results"]:
+            found = [(m["talent_id"], m["match_score"]) for m in result["matches"]]
+            assert found == expected[result["gig_id"]], f"Batch endpoint result for gig {result['gig_id']} differs"
+        
+        response = api.post(url, json={"gig_ids": [gig_objs[0].id, "missing-gig"]})
+        assert response.status_code == 404, "Batch endpoint should reject unknown gigs"
+        assert "missing-gig" in response.json()["detail"]
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        db.close()
+    print("✅ Batch matching equals per-gig matching")
+    return True
+
+def test_reverse_matching():
+    """Test that reverse matching scores every open gig exactly as forward scoring does."""
+    import random
+    from app.crud.crud import talent, gig
+    from app.services import matchmaking
+    from app.services.feature_store import GigFeatureStore
+    from app.services.matchmaking import rule_based_engine
+    
+    db = _temp_session()
+    previous_store = matchmaking.gig_store
+    try:
+        talent_objs, _ = _seed_pool(db, random.Random(37), talents=40, gigs=25)
+        gig_rows = {g.id: g for g in gig.get_open(db, profile="scoring")}
+        compared = 0
+        # Gig columns from the database and from a loaded gig store
+        for store_loaded in (False, True):
+            matchmaking.gig_store = GigFeatureStore()
+            if store_loaded:
+                matchmaking.gig_store.build(db)
+            columns = rule_based_engine._load_gig_columns(db)
+            for talent_obj in talent_objs:
+                talent_obj = talent.get(db, talent_obj.id, profile="scoring")
+                total_scores, _ = rule_based_engine.calculate_gig_match_scores(talent_obj, columns)
+                forward = {}
+                for i in columns.active.nonzero()[0]:
+                    gig_obj = gig_rows[columns.gigs[i].id]
+                    forward[gig_obj.id] = rule_based_engine.calculate_match_score(talent_obj, gig_obj)
+                    assert total_scores[i] == forward[gig_obj.id][0], \
+                        f"Reverse score of talent {talent_obj.id} for gig {gig_obj.id} differs from forward scoring"
+                    compared += 1
+                
+                for category in (None, 'photography'):
+                    # Stable sort over gig rows: equal scores keep row order, as top_k_rows does
+                    eligible = [columns.gigs[i].id for i in columns.active.nonzero()[0]
+                                if forward[columns.gigs[i].id][0] > 3.0
+                                and category in (None, gig_rows[columns.gigs[i].id].category)]
+                    if talent_obj.availability_status == 'unavailable':
+                        eligible = []
+                    full_scan = sorted(eligible, key=lambda gig_id: -forward[gig_id][0])
+                    for limit in (1, 3, 20, 50):
+                        found = rule_based_engine.find_gigs_for_talent(db, talent_obj.id, limit, category=category)
+                        assert [(score, g.id, breakdown) for score, g, breakdown in found] == \
+                            [(forward[gig_id][0], gig_id, forward[gig_id][1]) for gig_id in full_scan[:limit]], \
+                            f"Reverse top {limit} of talent {talent_obj.id} differs from forward scoring"
+        assert len(gig_rows) == 25 and compared == 2 * 40 * 25
+    finally:
+        matchmaking.gig_store = previous_store
+        db.close()
+    print("✅ Reverse match scores equal forward scores")
+    return True
+
+def test_fulltext_sync():
+    """Test that the search tables follow inserts, updates and deletes, and that any search text is safe."""
+    from sqlalchemy import text
+    from app.core.fulltext import rebuild_fulltext
+    from app.crud.crud import client, talent, gig, portfolio_item
+    from app.models.models import PortfolioItem
+    from app.schemas.schemas import (
+        ClientCreate, TalentCreate, TalentUpdate, GigCreate, GigUpdate, PortfolioItemCreate,
+        TalentSearchFilter, GigSearchFilter
+    )
+    
+    db = _temp_session()
+    try:
+        def talents_for(search_text):
+            return {t.name for t in talent.search(db, TalentSearchFilter(text=search_text))}
+        
+        def gigs_for(search_text):
+            return {g.title for g in gig.search(db, GigSearchFilter(text=search_text))}
+        
+        def search_rows():
+            return (
+                sorted(db.execute(text(
+                    "SELECT r.talent_id, s.name, s.bio, s.portfolio FROM talent_search s "
+                    "JOIN talent_search_rows r ON r.rowid = s.rowid"
+                )).all()),
+                sorted(db.execute(text(
+                    "SELECT r.gig_id, s.title, s.description, s.style_preferences, s.deliverables FROM gig_search s "
+                    "JOIN gig_search_rows r ON r.rowid = s.rowid"
+                )).all())
+            )
+        
+        alice = talent.create(db, TalentCreate(
+            name="Alice", email="fts-alice@example.com", location="Mumbai", bio="Wedding photographer"
+        ))
+        bob = talent.create(db, TalentCreate(name="Bob", email="fts-bob@example.com", location="Pune", bio="Food stylist"))
+        assert talents_for("wedding") == {"Alice"} and talents_for("food") == {"Bob"}
+        
+        talent.update(db, alice, TalentUpdate(bio="Underwater photographer"))
+        assert talents_for("wedding") == set() and talents_for("underwater") == {"Alice"}
+        
+        item = portfolio_item.create(db, PortfolioItemCreate(
+            title="Reef series", description="Coral reefs", project_type="photography", tags="ocean"
+        ), bob.id)
+        assert talents_for("coral") == {"Bob"} and talents_for("ocean") == {"Bob"}
+        
+        # Edits made outside the CRUD layer are picked up too; moving an item refreshes both talents
+        db.query(PortfolioItem).filter(PortfolioItem.id == item.id).update({"talent_id": alice.id, "tags": "lagoon"})
+        db.commit()
+        assert talents_for("coral") == {"Alice"} and talents_for("lagoon") == {"Alice"} and talents_for("ocean") == set()
+        
+        portfolio_item.delete(db, item.id)
+        assert talents_for("coral") == set()
+        talent.delete(db, bob.id)
+        assert talents_for("food") == set()
+        
+        owner = client.create(db, ClientCreate(name="Client", email="fts-client@example.com"))
+        shoot = gig.create(db, GigCreate(
+            client_id=owner.id, title="Launch shoot", description="Product launch", category="photography",
+            location="Mumbai", style_preferences="minimal", deliverables="edited stills"
+        ))
+        assert gigs_for("launch") == {"Launch shoot"} and gigs_for("stills") == {"Launch shoot"}
+        gig.update(db, shoot, GigUpdate(description="Gallery opening"))
+        assert gigs_for("product") == set() and gigs_for("gallery") == {"Launch shoot"}
+        
+        # After every kind of write the tables hold what a full rebuild produces
+        synced = search_rows()
+        rebuild_fulltext(db.get_bind())
+        assert search_rows() == synced, "Search tables drifted from their source rows"
+        
+        gig.delete(db, shoot.id)
+        talent.delete(db, alice.id)
+        assert search_rows() == ([], []), "Deleted rows remain in the search tables"
+        
+        # Quotes, operators and syntax characters are never passed to the full-text engine as query syntax
+        talent.create(db, TalentCreate(name="Near", email="fts-near@example.com", location="Goa", bio="AND or NOT"))
+        for search_text in ('"', "'", '"unterminated', "AND OR NOT", "foo*", "(a", "NEAR(x y)",
+                            "'; DROP TABLE talents; --", "bio:near", "^start", "a + b", "-", "***"):
+            talent.search(db, TalentSearchFilter(text=search_text))
+            gig.search(db, GigSearchFilter(text=search_text))
+        assert talents_for("AND OR NOT") == {"Near"}, "Operator words should be searched as plain words"
+        assert talents_for('"') == set()
+    finally:
+        db.close()
+    print("✅ Full-text search tables stay in sync and accept any search text")
+    return True
+
+def test_embedding_quantization():
+    """Test that float16 and int8 embeddings score within tolerance of float32, zero vectors included."""
+    import numpy as np
+    from app.services import embeddings
+    from app.services.embeddings import EmbeddingStore, quantize, dequantize, quantized_dot
+    
+    rng = np.random.default_rng(41)
+    vectors = rng.normal(size=(500, 384)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors[13] = 0.0
+    query = vectors[7]
+    exact = vectors @ query
+    
+    previous_chunk = embeddings.DOT_CHUNK_ROWS
+    embeddings.DOT_CHUNK_ROWS = 64  # several chunks, the last one partial
+    try:
+        for precision, tolerance in (('float32', 1e-6), ('float16', 2e-3), ('int8', 2e-2)):
+            data, scale = quantize(vectors, precision)
+            assert data.dtype == np.dtype(precision) and (scale is None) == (precision != 'int8')
+            assert np.abs(dequantize(data, scale) - vectors).max() < tolerance, f"{precision} round trip is off"
+            scores = quantized_dot(data, scale, query)
+            assert scores.dtype == np.float32 and scores.shape == (500,)
+            assert np.abs(scores - exact).max() < tolerance, f"{precision} similarities drift from float32"
+            assert int(np.argmax(scores)) == 7, f"{precision} changes the nearest vector"
+            assert scores[13] == 0.0, f"Zero vector should score 0 in {precision}"
+            if scale is not None:
+                assert scale[13] == 1.0 and not data[13].any(), "Zero vector should quantize to zeros with scale 1"
+            
+            # Single vectors, as the ANN index quantizes them on insert
+            single, single_scale = quantize(np.zeros(384), precision)
+            assert not dequantize(single, single_scale).any()
+    finally:
+        embeddings.DOT_CHUNK_ROWS = previous_chunk
+    
+    # Vectors held in memory come back as float32 close to the encoded ones
+    db = _temp_session()
+    try:
+        store = EmbeddingStore('int8')
+        store.configure('test-model', lambda texts: vectors[[int(text) for text in texts]])
+        rows = [(f"item-{i}", str(i)) for i in range(20)]
+        encoded = store.vectors(db, 'portfolio_item', rows)
+        cached = store.vectors(None, 'portfolio_item', rows)
+        for owner_id, vector in cached.items():
+            assert vector.dtype == np.float32
+            assert np.abs(vector - encoded[owner_id]).max() < 2e-2, f"Cached vector of {owner_id} is off"
+    finally:
+        db.close()
+    
+    for make in (lambda: quantize(vectors, 'bogus'), lambda: quantize(vectors, 'float64'), lambda: EmbeddingStore('bogus')):
+        try:
+            make()
+            assert False, "Unknown precision should be rejected"
+        except ValueError:
+            pass
+    print("✅ Quantized embeddings stay within tolerance of float32")
+    return True
+
 def main():
     """Run all tests."""
     print("🧪 Testing Talent Matchmaking Engine")
@@ -100,6 +1064,57 @@ def main():
     print("\n3. Testing matching algorithm...")
     success &= test_matching_algorithm()
     
+    print("\n4. Testing vectorized scoring...")
+    success &= test_vectorized_scoring()
+    
+    print("\n5. Testing AI vectorized scoring...")
+    success &= test_ai_vectorized_scoring()
+    
+    print("\n6. Testing incremental rematching...")
+    success &= test_incremental_rematching()
+    
+    print("\n7. Testing match cache...")
+    success &= test_match_cache()
+    
+    print("\n8. Testing cursor pagination...")
+    success &= test_cursor_pagination()
+    
+    print("\n9. Testing geographic matching...")
+    success &= test_geo_matching()
+    
+    print("\n10. Testing match query count...")
+    success &= test_match_query_count()
+    
+    print("\n11. Testing match result sync...")
+    success &= test_match_result_sync()
+    
+    print("\n12. Testing AI embedding sessions...")
+    success &= test_ai_embedding_session()
+    
+    print("\n13. Testing talent deletion...")
+    success &= test_talent_deletion()
+    
+    print("\n14. Testing ANN index removals...")
+    success &= test_ann_index_removals()
+    
+    print("\n15. Testing sharded scoring...")
+    success &= test_sharded_scoring()
+    
+    print("\n16. Testing pruned top matches...")
+    success &= test_pruned_top_k()
+    
+    print("\n17. Testing batch matching...")
+    success &= test_batch_matching()
+    
+    print("\n18. Testing reverse matching...")
+    success &= test_reverse_matching()
+    
+    print("\n19. Testing full-text search sync...")
+    success &= test_fulltext_sync()
+    
+    print("\n20. Testing embedding quantization...")
+    success &= test_embedding_quantization()
+    
     print("\n" + "=" * 50)
     if success:
         print("🎉 All tests passed! The application is ready to use.")